@@ -0,0 +1,410 @@
+"""Benchmarks for the Blender side of Blender.nvim.
+
+Starts Blender.nvim against a stand-in for Neovim and measures notification
+latency, script run overhead, addon reload time and send throughput. Blender
+is either real (``--blender PATH``, run headless as a worker) or the stub bpy
+modules from ``benchmarks.stubs``, which exercise the timer-driven GUI path.
+
+    python -m benchmarks [--blender PATH] [--quick] [--output results.json]
+                         [--baseline baseline.json] [--save-baseline PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .addons import touch_leaf, write_addon
+from .nvim_stub import StubNvim
+
+root = Path(__file__).parent.parent
+
+ACK_SCRIPT = """\
+from blender_nvim.rpc import NvimRpc
+
+NvimRpc.get_instance().send({"type": "bench_ack"})
+"""
+
+SEND_SCRIPT = """\
+from blender_nvim.rpc import NvimRpc
+
+rpc = NvimRpc.get_instance()
+for i in range({count}):
+    rpc.send({{"type": "bench_msg", "i": i}})
+rpc.send({{"type": "bench_ack"}})
+"""
+
+
+def histogram_metric(hist: Dict[str, Any]):
+    """A metric from one of the histograms returned by the trace_stats request"""
+    return {
+        "value": hist["p50"],
+        "unit": "s",
+        "better": "lower",
+        "p95": hist["p95"],
+        "p99": hist["p99"],
+        "max": hist["max"],
+        "samples": hist["count"],
+    }
+
+
+def summarize(samples: List[float], unit: str = "s", better: str = "lower"):
+    ordered = sorted(samples)
+    return {
+        "value": statistics.median(ordered),
+        "unit": unit,
+        "better": better,
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "min": ordered[0],
+        "max": ordered[-1],
+        "samples": len(ordered),
+    }
+
+
+class Session:
+    """One Blender process connected to a stand-in Neovim"""
+
+    def __init__(self, blender: Optional[str], addons: Dict[str, str], workdir: str):
+        self.worker = blender is not None
+        self.nvim = StubNvim()
+        self.log_path = os.path.join(workdir, "blender.log")
+        self._jobs = 0
+        env = dict(
+            os.environ,
+            BLENDER_NVIM_RPC_SOCKET=self.nvim.address,
+            BLENDER_NVIM_ADDONS_TO_LOAD=json.dumps(
+                [
+                    {"load_dir": path, "module_name": name}
+                    for name, path in addons.items()
+                ]
+            ),
+            BLENDER_NVIM_TASK_ID="1",
+            BLENDER_NVIM_ENABLE_DAP="no",
+            BLENDER_NVIM_WORKER="yes" if self.worker else "no",
+            BLENDER_NVIM_WORKER_RESET="none",
+            # keep the addon links out of the user's real scripts directory
+            BLENDER_USER_SCRIPTS=os.path.join(workdir, "scripts"),
+        )
+        if blender is not None:
+            cmd = [
+                blender,
+                "--factory-startup",
+                "--background",
+                "--python",
+                str(root / "launcher.py"),
+            ]
+        else:
+            cmd = [sys.executable, "-m", "benchmarks.stub_blender"]
+        self._log = open(self.log_path, "w")
+        self.proc = subprocess.Popen(
+            cmd, cwd=root, env=env, stdout=self._log, stderr=subprocess.STDOUT
+        )
+
+    def start(self, timeout: float = 120.0):
+        start = time.perf_counter()
+        self.nvim.accept(timeout)
+        _, setup = self.nvim.wait_for_type("setup", timeout)
+        if self.worker:
+            timings = setup["startup_timings"]
+        else:
+            _, complete = self.nvim.wait_for_type("startup_complete", timeout)
+            timings = complete["startup_timings"]
+        self.blender_version = setup["blender_version"]
+        return {"total": timings["total"], "wall": time.perf_counter() - start}
+
+    def run_source(self, source: str, name: str = "bench"):
+        """Run ``source`` the way ``:BlenderRun`` / the worker pool do"""
+        if self.worker:
+            self._jobs += 1
+            # a fixed name lets the worker reuse the compiled code
+            self.nvim.notify(
+                "job",
+                {"job_id": self._jobs, "source": source, "path": f"<nvim:{name}>"},
+            )
+        else:
+            self.nvim.notify("run_source", {"source": source, "name": name})
+
+    def run_file(self, path: str):
+        if self.worker:
+            self._jobs += 1
+            self.nvim.notify("job", {"job_id": self._jobs, "path": path})
+        else:
+            self.nvim.notify("run", {"path": path})
+
+    def wait_done(self, timeout: float = 30.0):
+        received, msg = self.nvim.wait_for_type(
+            "job_done" if self.worker else "bench_ack", timeout
+        )
+        if self.worker and not msg["ok"]:
+            raise RuntimeError(f"Job failed: {msg['error']}")
+        return received
+
+    @property
+    def run_handler(self):
+        return "job" if self.worker else "run_source"
+
+    def trace_stats(self) -> Dict[str, Any]:
+        return self.nvim.request("trace_stats", {})
+
+    def reset_traces(self):
+        self.nvim.notify("trace_reset", {})
+        # trace_reset runs on the session thread, a request is handled after it
+        self.trace_stats()
+
+    def stop(self, timeout: float = 10.0):
+        try:
+            self.nvim.notify("stop", {})
+            self.proc.wait(timeout)
+        except Exception:
+            self.proc.kill()
+            self.proc.wait()
+        finally:
+            self.nvim.close()
+            self._log.close()
+
+
+def bench_latency(session: Session, iterations: int):
+    """Round trip of a trivial script, and where the time goes inside Blender"""
+    source = ACK_SCRIPT if not session.worker else "pass"
+    session.run_source(source)
+    session.wait_done()  # compile once, the cached code is reused afterwards
+    session.reset_traces()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        session.run_source(source)
+        samples.append(session.wait_done() - start)
+
+    stages = session.trace_stats()["handlers"].get(session.run_handler, {})
+    results = {"notify_roundtrip": summarize(samples)}
+    for stage, metric in (("dequeued", "notify_to_exec"), ("finished", "script_run")):
+        if stages.get(stage, {}).get("count"):
+            results[metric] = histogram_metric(stages[stage])
+    return results
+
+
+def bench_request(session: Session, iterations: int):
+    """Round trip of requests answered off and on Blender's main thread"""
+    requests = (
+        ("request_worker", "trace_stats", {}),
+        ("request_main_thread", "query", {"path": "window_managers", "limit": 1}),
+    )
+    results = {}
+    for metric, name, params in requests:
+        session.nvim.request(name, params)
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            session.nvim.request(name, params)
+            samples.append(time.perf_counter() - start)
+        results[metric] = summarize(samples)
+    return results
+
+
+def bench_script_file(session: Session, workdir: str, iterations: int):
+    """Overhead of running a script from disk, including the stat check"""
+    path = os.path.join(workdir, "bench_script.py")
+    with open(path, "w") as fs:
+        fs.write(ACK_SCRIPT if not session.worker else "pass\n")
+    session.run_file(path)
+    session.wait_done()
+    session.reset_traces()
+    for _ in range(iterations):
+        session.run_file(path)
+        session.wait_done()
+    handler = "job" if session.worker else "run"
+    stages = session.trace_stats()["handlers"].get(handler, {})
+    if not stages.get("finished", {}).get("count"):
+        return {}
+    return {"script_run_file": histogram_metric(stages["finished"])}
+
+
+def bench_reload(session: Session, addons: Dict[str, str], repeats: int):
+    results = {}
+    for name, path in addons.items():
+        num_modules = int(name.rsplit("_", 1)[1])
+        for incremental in (False, True):
+            durations, roundtrips, modules = [], [], 0
+            # the first incremental reload is a full one that starts tracking
+            # the addon, it is not measured
+            for i in range(-1 if incremental else 0, repeats):
+                if incremental:
+                    touch_leaf(path, num_modules, i)
+                start = time.perf_counter()
+                session.nvim.notify(
+                    "reload", {"names": [name], "incremental": incremental}
+                )
+                received, msg = session.nvim.wait_for_type("addons_updated", 120.0)
+                (addon,) = msg["addons"]
+                if not addon["ok"]:
+                    raise RuntimeError(f"Reload of {name} failed: {addon['error']}")
+                if i < 0:
+                    continue
+                durations.append(addon["duration"])
+                roundtrips.append(received - start)
+                modules = addon["reloaded_modules"]
+            kind = "incremental" if incremental else "full"
+            results[f"reload_{kind}_{num_modules}"] = dict(
+                summarize(durations),
+                roundtrip=statistics.median(roundtrips),
+                reloaded_modules=modules,
+            )
+    return results
+
+
+def bench_send(session: Session, count: int, repeats: int):
+    """Messages per second from Blender to Neovim through the outbox"""
+    source = SEND_SCRIPT.format(count=count)
+    samples, batches = [], []
+    for _ in range(repeats):
+        session.nvim.discard("bench_msg")
+        first_batch = session.nvim.batches
+        start = time.perf_counter()
+        session.run_source(source, name="bench_send")
+        last = 0.0
+        for _ in range(count):
+            last, _ = session.nvim.wait_for_type("bench_msg", 60.0)
+        session.wait_done()
+        samples.append(count / (last - start))
+        batches.append(session.nvim.batches - first_batch)
+    return {
+        "send_throughput": dict(
+            summarize(samples, unit="msg/s", better="higher"),
+            messages=count,
+            batches=statistics.median(batches),
+        )
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    workdir = tempfile.mkdtemp(prefix="blender-nvim-bench-")
+    addon_root = os.path.join(workdir, "addons_src")
+    addons = {
+        f"bench_addon_{n}": write_addon(addon_root, f"bench_addon_{n}", n)
+        for n in args.addon_sizes
+    }
+    iterations = 20 if args.quick else args.iterations
+    repeats = 2 if args.quick else args.repeats
+
+    session = Session(args.blender, addons, workdir)
+    results: Dict[str, Any] = {}
+    try:
+        startup = session.start()
+        results["startup"] = {
+            "value": startup["total"],
+            "unit": "s",
+            "better": "lower",
+            "wall": startup["wall"],
+        }
+        results.update(bench_latency(session, iterations))
+        results.update(bench_request(session, iterations))
+        results.update(bench_script_file(session, workdir, iterations))
+        results.update(bench_reload(session, addons, repeats))
+        results.update(bench_send(session, 1000 if args.quick else 10000, repeats))
+    except Exception:
+        print(f"Benchmark failed, see {session.log_path}", file=sys.stderr)
+        raise
+    finally:
+        session.stop()
+
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "mode": "blender" if args.blender else "stub",
+            "blender_version": session.blender_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float):
+    """Print the change of every metric against the baseline, return regressions"""
+    regressions = []
+    if current["meta"]["mode"] != baseline["meta"]["mode"]:
+        print(
+            f"WARNING: comparing {current['meta']['mode']} results against a "
+            f"{baseline['meta']['mode']} baseline",
+            file=sys.stderr,
+        )
+    header = f"{'metric':<28}{'baseline':>14}{'current':>14}{'change':>10}"
+    print(header, file=sys.stderr)
+    for name, metric in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            row = f"{name:<28}{'-':>14}{metric['value']:>14.6g}{'new':>10}"
+            print(row, file=sys.stderr)
+            continue
+        change = metric["value"] / base["value"] - 1 if base["value"] else 0.0
+        worse = -change if metric["better"] == "higher" else change
+        flag = ""
+        if worse > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<28}{base['value']:>14.6g}{metric['value']:>14.6g}"
+            f"{change:>+10.1%}{flag}",
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--blender", help="Blender executable, stub bpy if omitted")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--addon-sizes", type=int, nargs="+", default=[10, 100, 1000], metavar="N"
+    )
+    parser.add_argument("--output", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare the results against this file")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Save as baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative slowdown reported as a regression (default: 0.2)",
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory")
+    args = parser.parse_args(argv)
+
+    data = run(args)
+    output = json.dumps(data, indent=2)
+    if args.output:
+        with open(args.output, "w") as fs:
+            fs.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fs:
+            fs.write(output)
+
+    if args.baseline:
+        with open(args.baseline) as fs:
+            baseline = json.load(fs)
+        regressions = compare(data, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Synthetic addons used by the reload benchmarks"""
+
+import os
+
+MODULE_TEMPLATE = """\
+{imports}
+
+VALUE = {index}
+
+
+class Thing{index}:
+    def __init__(self):
+        self.values = [VALUE * i for i in range(16)]
+
+    def total(self):
+        return sum(self.values)
+
+
+def compute(n):
+    return [Thing{index}().total() + i for i in range(n)]
+"""
+
+INIT_TEMPLATE = """\
+bl_info = {{"name": "{name}", "blender": (2, 80, 0), "category": "Development"}}
+
+from . import {modules}
+
+registered = False
+
+
+def register():
+    global registered
+    registered = True
+
+
+def unregister():
+    global registered
+    registered = False
+"""
+
+
+def module_name(index: int):
+    return f"mod_{index}"
+
+
+def write_addon(root: str, name: str, num_modules: int):
+    """Write an addon package of ``num_modules`` modules and return its path.
+
+    Each module imports its parent in a binary tree, so the import graph is
+    wide rather than one deep chain, much like real addons.
+    """
+    path = os.path.join(root, name)
+    os.makedirs(path, exist_ok=True)
+    for i in range(num_modules):
+        imports = f"from . import {module_name((i - 1) // 2)}" if i else ""
+        with open(os.path.join(path, f"{module_name(i)}.py"), "w") as fs:
+            fs.write(MODULE_TEMPLATE.format(imports=imports, index=i))
+    with open(os.path.join(path, "__init__.py"), "w") as fs:
+        modules = ", ".join(module_name(i) for i in range(num_modules))
+        fs.write(INIT_TEMPLATE.format(name=name, modules=modules))
+    return path
+
+
+def touch_leaf(path: str, num_modules: int, revision: int):
+    """Change the contents of the last module, which no other module imports"""
+    leaf = os.path.join(path, f"{module_name(num_modules - 1)}.py")
+    with open(leaf, "a") as fs:
+        fs.write(f"\nREVISION = {revision}\n")
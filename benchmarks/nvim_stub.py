@@ -0,0 +1,185 @@
+"""A local msgpack-rpc server that stands in for Neovim.
+
+It answers the handshake pynvim makes on attach and collects the messages
+Blender.nvim delivers through ``require("blender.rpc").handle_batch``, so the
+benchmarks can drive the Blender side exactly as the Lua plugin does.
+"""
+
+import itertools
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import msgpack
+
+REQUEST, RESPONSE, NOTIFICATION = 0, 1, 2
+
+# pynvim uses nvim_execute_lua when the API info doesn't list nvim_exec_lua
+EXEC_LUA = ("nvim_exec_lua", "nvim_execute_lua")
+
+API_INFO = {
+    "version": {
+        "major": 0,
+        "minor": 10,
+        "patch": 0,
+        "api_level": 12,
+        "api_compatible": 0,
+        "api_prerelease": False,
+    },
+    "types": {
+        "Buffer": {"id": 0, "prefix": "nvim_buf_"},
+        "Window": {"id": 1, "prefix": "nvim_win_"},
+        "Tabpage": {"id": 2, "prefix": "nvim_tabpage_"},
+    },
+    "functions": [],
+    "ui_events": [],
+    "ui_options": [],
+    "error_types": {},
+}
+
+
+class StubNvim:
+    """Accepts one Blender connection and records the messages it sends"""
+
+    channel_id = 1
+
+    _server: socket.socket
+    _conn: Optional[socket.socket]
+    _messages: Deque[Tuple[float, Dict[str, Any]]]
+    _responses: Dict[int, Tuple[Any, Any]]
+
+    def __init__(self):
+        self.address = os.path.join(
+            tempfile.mkdtemp(prefix="blender-nvim-bench-"), "nvim.sock"
+        )
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.address)
+        self._server.listen(1)
+        self._conn = None
+        self._write_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._messages = deque()
+        self._responses = {}
+        self._msgids = itertools.count()
+        self.batches = 0
+        self.closed = False
+
+    def accept(self, timeout: float):
+        self._server.settimeout(timeout)
+        self._conn, _ = self._server.accept()
+        self._server.close()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _write(self, msg: List[Any]):
+        assert self._conn is not None
+        data = msgpack.packb(msg)
+        with self._write_lock:
+            self._conn.sendall(data)
+
+    def _read(self):
+        assert self._conn is not None
+        unpacker = msgpack.Unpacker(raw=False)
+        while True:
+            data = self._conn.recv(65536)
+            if not data:
+                break
+            unpacker.feed(data)
+            for msg in unpacker:
+                self._dispatch(msg)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def _dispatch(self, msg: List[Any]):
+        if msg[0] == REQUEST:
+            _, msgid, method, args = msg
+            method = _decode(method)
+            if method == "nvim_get_api_info":
+                self._write([RESPONSE, msgid, None, [self.channel_id, API_INFO]])
+            elif method in EXEC_LUA:
+                self._on_lua(args)
+                self._write([RESPONSE, msgid, None, None])
+            else:
+                self._write([RESPONSE, msgid, [0, f"Not supported: {method}"], None])
+        elif msg[0] == RESPONSE:
+            _, msgid, error, result = msg
+            with self._cond:
+                self._responses[msgid] = (error, result)
+                self._cond.notify_all()
+        elif msg[0] == NOTIFICATION and _decode(msg[1]) in EXEC_LUA:
+            self._on_lua(msg[2])
+
+    def _on_lua(self, args: List[Any]):
+        code, lua_args = args
+        code = _decode(code)
+        now = time.perf_counter()
+        if "handle_batch" in code:
+            messages = lua_args[0]
+        else:
+            messages = [lua_args[0]]
+        with self._cond:
+            self.batches += 1
+            self._messages.extend((now, msg) for msg in messages)
+            self._cond.notify_all()
+
+    def notify(self, method: str, data: Any):
+        self._write([NOTIFICATION, method, [data]])
+
+    def request(self, method: str, data: Any, timeout: float = 10.0):
+        msgid = next(self._msgids)
+        self._write([REQUEST, msgid, method, [data]])
+        with self._cond:
+            if not self._cond.wait_for(lambda: msgid in self._responses, timeout):
+                raise TimeoutError(f"No response to {method}")
+            error, result = self._responses.pop(msgid)
+        if error is not None:
+            raise RuntimeError(f"{method} failed: {error}")
+        return result
+
+    def wait_for(
+        self,
+        predicate: Callable[[Dict[str, Any]], bool],
+        timeout: float = 10.0,
+    ) -> Tuple[float, Dict[str, Any]]:
+        """Remove and return the first received message matching ``predicate``"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for i, (received, msg) in enumerate(self._messages):
+                    if predicate(msg):
+                        del self._messages[i]
+                        return received, msg
+                remaining = deadline - time.monotonic()
+                if self.closed or remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a message from Blender")
+                self._cond.wait(remaining)
+
+    def wait_for_type(self, msg_type: str, timeout: float = 10.0):
+        return self.wait_for(lambda msg: msg.get("type") == msg_type, timeout)
+
+    def count(self, msg_type: str):
+        with self._cond:
+            return sum(1 for _, msg in self._messages if msg.get("type") == msg_type)
+
+    def discard(self, msg_type: str):
+        with self._cond:
+            self._messages = deque(
+                item for item in self._messages if item[1].get("type") != msg_type
+            )
+
+    def close(self):
+        self._server.close()
+        if self._conn is not None:
+            self._conn.close()
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        os.rmdir(os.path.dirname(self.address))
+
+
+def _decode(value: Any) -> Any:
+    """Method names and code may arrive as msgpack bin depending on the client"""
+    return value.decode() if isinstance(value, bytes) else value
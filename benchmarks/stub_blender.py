@@ -0,0 +1,25 @@
+"""Runs launcher.py against the stub bpy modules, in place of ``blender --python``"""
+
+import os
+import runpy
+import sys
+from pathlib import Path
+
+from . import stubs
+
+root = Path(__file__).parent.parent
+
+
+def main():
+    background = os.environ.get("BLENDER_NVIM_WORKER", "no") == "yes"
+    stubs.install(os.environ["BLENDER_USER_SCRIPTS"], background=background)
+    sys.argv = [str(root / "launcher.py")]
+    runpy.run_path(str(root / "launcher.py"), run_name="__main__")
+    if not background:
+        # launcher.py returns once startup is done, Blender would now enter
+        # its event loop and start firing timers
+        stubs.run_timers()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Minimal stand-ins for the ``bpy`` and ``addon_utils`` modules.
+
+They implement just enough of Blender's API for blender_nvim to start, run
+scripts and reload addons outside of Blender. Timers are run by ``run_timers``,
+which plays the part of Blender's event loop on the main thread.
+"""
+
+import heapq
+import importlib
+import itertools
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Timers:
+    """``bpy.app.timers``, fired by ``run_timers`` instead of an event loop"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[float, int, Callable]] = []
+        self._registered: Dict[Callable, int] = {}
+        self._counter = itertools.count()
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("bpy.app.timers.register called off the main thread")
+        with self._lock:
+            self._push(function, first_interval)
+
+    def _push(self, function, interval):
+        key = next(self._counter)
+        self._registered[function] = key
+        heapq.heappush(self._queue, (time.monotonic() + interval, key, function))
+
+    def is_registered(self, function):
+        with self._lock:
+            return function in self._registered
+
+    def unregister(self, function):
+        with self._lock:
+            if self._registered.pop(function, None) is None:
+                raise ValueError("Error: function is not registered")
+
+    def run(self, stop: threading.Event):
+        while not stop.is_set():
+            with self._lock:
+                due = None
+                while self._queue:
+                    when, key, function = self._queue[0]
+                    if self._registered.get(function) != key:
+                        heapq.heappop(self._queue)  # unregistered or rescheduled
+                        continue
+                    if when <= time.monotonic():
+                        heapq.heappop(self._queue)
+                        del self._registered[function]
+                        due = function
+                    break
+                wait = self._queue[0][0] - time.monotonic() if self._queue else 0.1
+            if due is None:
+                stop.wait(min(max(wait, 0.0), 0.1))
+                continue
+            interval = due()
+            if interval is not None:
+                with self._lock:
+                    self._push(due, interval)
+
+
+class Operator:
+    bl_idname = ""
+    bl_label = ""
+
+    def __init__(self, **props):
+        for name, value in props.items():
+            setattr(self, name, value)
+
+
+class Panel:
+    pass
+
+
+class OperatorNamespace:
+    """Resolves ``bpy.ops.<category>`` to built-in or registered operators"""
+
+    def __init__(self, category: str, builtins: Dict[str, Callable]):
+        self._category = category
+        self._builtins = builtins
+
+    def __getattr__(self, name):
+        if name in self._builtins:
+            return self._builtins[name]
+        cls = _operators.get(f"{self._category}.{name}")
+        if cls is None:
+            raise AttributeError(name)
+
+        def call(*args, **props):
+            return cls(**props).execute(context)
+
+        return call
+
+
+class Ops:
+    def __init__(self):
+        self._namespaces: Dict[str, Dict[str, Callable]] = {}
+
+    def add(self, category: str, **builtins: Callable):
+        self._namespaces.setdefault(category, {}).update(builtins)
+
+    def __getattr__(self, name):
+        known = {idname.split(".")[0] for idname in _operators}
+        if name not in self._namespaces and name not in known:
+            raise AttributeError(name)
+        return OperatorNamespace(name, self._namespaces.get(name, {}))
+
+
+class Struct:
+    def as_pointer(self):
+        return id(self)
+
+
+class ID(Struct):
+    pass
+
+
+class PropCollection(list):
+    pass
+
+
+class Region(Struct):
+    def __init__(self, type: str):
+        self.type = type
+
+
+class Area(Struct):
+    def __init__(self, type: str):
+        self.type = type
+        self.regions = [Region("HEADER"), Region("UI"), Region("WINDOW")]
+
+    def tag_redraw(self):
+        pass
+
+
+class Screen(Struct):
+    def __init__(self, name: str, areas: List[Area]):
+        self.name = name
+        self.areas = areas
+
+
+class Window(Struct):
+    def __init__(self):
+        self.screen = Screen(
+            "Layout", [Area("VIEW_3D"), Area("TEXT_EDITOR"), Area("PROPERTIES")]
+        )
+        self.scene = types.SimpleNamespace(name="Scene")
+        self.view_layer = types.SimpleNamespace(name="ViewLayer")
+        self.workspace = types.SimpleNamespace(name="Layout")
+
+
+class Context:
+    def __init__(self, window_manager):
+        self.window_manager = window_manager
+
+    @contextmanager
+    def temp_override(self, **overrides):
+        yield self
+
+
+_operators: Dict[str, Any] = {}
+context: Optional[Context] = None
+stop_event = threading.Event()
+
+
+def run_timers():
+    """Fire ``bpy.app.timers`` on this thread until Blender is asked to quit"""
+    sys.modules["bpy"].app.timers.run(stop_event)
+
+
+def _addon_utils(addon_dir: str):
+    module = types.ModuleType("addon_utils")
+
+    def enable(module_name, default_set=False, persistent=False, handle_error=None):
+        mod = importlib.import_module(module_name)
+        mod.register()
+        return mod
+
+    def disable(module_name, default_set=False, handle_error=None):
+        mod = sys.modules.get(module_name)
+        if mod is not None:
+            mod.unregister()
+
+    module.enable = enable  # type: ignore
+    module.disable = disable  # type: ignore
+    module.paths = lambda: [addon_dir]  # type: ignore
+    return module
+
+
+def install(scripts_dir: str, version=(4, 0, 0), background=False):
+    """Register the stub modules in ``sys.modules``"""
+    global context
+
+    addon_dir = os.path.join(scripts_dir, "addons")
+    addon_utils = _addon_utils(addon_dir)
+
+    window_manager = types.SimpleNamespace(windows=[Window()])
+    context = Context(window_manager)
+
+    ops = Ops()
+    ops.add(
+        "preferences",
+        addon_enable=lambda module: addon_utils.enable(module, default_set=True),
+        addon_disable=lambda module: addon_utils.disable(module, default_set=True),
+    )
+    ops.add(
+        "wm",
+        read_homefile=lambda **kwargs: {"FINISHED"},
+        quit_blender=lambda: stop_event.set(),
+    )
+
+    def register_class(cls):
+        if getattr(cls, "bl_idname", None) and issubclass(cls, Operator):
+            _operators[cls.bl_idname] = cls
+
+    def user_resource(resource_type, path=""):
+        return os.path.join(scripts_dir, path)
+
+    bpy = types.ModuleType("bpy")
+    bpy.app = types.SimpleNamespace(  # type: ignore
+        version=tuple(version),
+        binary_path=sys.executable,
+        background=background,
+        timers=Timers(),
+        handlers=types.SimpleNamespace(persistent=lambda func: func, load_post=[]),
+    )
+    bpy.msgbus = types.SimpleNamespace(  # type: ignore
+        subscribe_rna=lambda key, owner, args, notify, options=set(): None,
+        clear_by_owner=lambda owner: None,
+    )
+    bpy.ops = ops  # type: ignore
+    bpy.context = context  # type: ignore
+    bpy.data = types.SimpleNamespace(window_managers=[window_manager])  # type: ignore
+    bpy.types = types.SimpleNamespace(  # type: ignore
+        Operator=Operator,
+        Panel=Panel,
+        Window=Window,
+        Area=Area,
+        ID=ID,
+        bpy_struct=Struct,
+        bpy_prop_collection=PropCollection,
+    )
+    bpy.props = types.SimpleNamespace(  # type: ignore
+        StringProperty=lambda **kwargs: None,
+        BoolProperty=lambda **kwargs: None,
+    )
+    bpy.utils = types.SimpleNamespace(  # type: ignore
+        register_class=register_class,
+        unregister_class=lambda cls: None,
+        user_resource=user_resource,
+    )
+
+    sys.modules["bpy"] = bpy
+    sys.modules["addon_utils"] = addon_utils
@@ -1,10 +1,11 @@
 import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 from .environment import blender_path, scripts_folder, version
 from .load_addons import load_addons, setup_addon_links
-from .utils import ensure_installed, fatal
+from .prewarm import Prewarm
+from .utils import Stopwatch, ensure_installed, fatal
 
 
 def ensure_compat():
@@ -17,13 +18,51 @@ def startup(
     addons_to_load: Tuple[Tuple[Path, str], ...],
     enable_dap: bool,
     task_id: int,
+    worker: bool = False,
+    fast_start: bool = False,
+    started_at: Optional[float] = None,
+    log_rpc: bool = False,
+    prewarm: bool = False,
+    log_level: str = "info",
+    track_memory: bool = False,
+    memory_frames: int = 1,
 ):
-    ensure_compat()
-    ensure_installed(["pynvim", "debugpy" if enable_dap else None])
+    timings = Stopwatch(started_at)
+    if started_at is not None:
+        timings.stages["launcher"] = timings.total()
 
+    with timings.stage("checks"):
+        ensure_compat()
+        ensure_installed(["pynvim", "debugpy" if enable_dap else None])
+
+    from .output import levels, log, output_sink
     from .rpc import NvimRpc
 
-    path_mappings = setup_addon_links(addons_to_load)
+    if log_rpc:
+        # RPC payloads are logged at the debug level
+        log_level = "debug"
+    if log_level in levels:
+        output_sink.set_level(log_level)
+    else:
+        log("warn", f"Unknown log level {log_level!r}, using {output_sink.log_level}")
+    NvimRpc.session_id = task_id
+
+    if track_memory:
+        from .memory import memory_tracker
+
+        # before the addons are loaded, so that their allocations are traced
+        memory_tracker.enable(memory_frames)
+
+    with timings.stage("addon_links"):
+        path_mappings = setup_addon_links(addons_to_load)
+
+    prewarmer = None
+    if prewarm and addons_to_load:
+        # runs in the background while the rest of startup carries on
+        prewarmer = Prewarm(
+            (Path(mapping["load"]), module_name)
+            for mapping, (_, module_name) in zip(path_mappings, addons_to_load)
+        )
 
     def on_setup(rpc: NvimRpc):
         rpc.send(
@@ -35,22 +74,59 @@ def startup(
                 "scripts_folder": str(scripts_folder),
                 "path_mappings": path_mappings,
                 "task_id": task_id,
+                "session": task_id,
                 "channel_id": rpc.nvim.channel_id,
+                "worker": worker,
+                # the debugger itself is started on demand, see NvimDap
+                "dap": enable_dap and not worker,
+                "startup_timings": timings.as_dict(),
             }
         )
 
-    rpc = NvimRpc.initialize(rpc_socket, on_setup=on_setup)
-    rpc.start()
+    with timings.stage("rpc_connect"):
+        rpc = NvimRpc.initialize(rpc_socket, on_setup=on_setup)
+    # from here on, output reaches Neovim over RPC instead of the terminal
+    output_sink.install()
+
+    from . import dap, data_channel  # noqa: F401
+
+    if worker:
+        from . import operators, worker as worker_mode
+
+        with timings.stage("load_addons"):
+            load_addons(addons_to_load, prewarmer)
+        operators.register()
+        log("info", f"Startup timings: {timings.format()}")
+        # blocks until Neovim sends "stop"
+        worker_mode.run(rpc)
+        return
+
+    from . import operators
+
+    with timings.stage("rpc_start"):
+        rpc.start()
+        operators.register()
+
+    def finish_startup():
+        with timings.stage("load_addons"):
+            load_addons(addons_to_load, prewarmer)
+
+        from . import ui
 
-    load_addons(addons_to_load)
+        with timings.stage("ui"):
+            ui.register()
 
-    from . import operators, ui
+        if enable_dap:
+            dap.NvimDap.initialize(rpc)
 
-    ui.register()
-    operators.register()
+        log("info", f"Startup timings: {timings.format()}")
+        rpc.send({"type": "startup_complete", "startup_timings": timings.as_dict()})
+        return None
 
-    if enable_dap:
-        from .dap import NvimDap
+    import bpy
 
-        dap = NvimDap.initialize(rpc)
-        dap.start()
+    if fast_start and not bpy.app.background:
+        # timers first fire once Blender's window and event loop are up
+        bpy.app.timers.register(finish_startup, first_interval=0.0)
+    else:
+        finish_startup()
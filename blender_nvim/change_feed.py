@@ -0,0 +1,260 @@
+import itertools
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import bpy
+
+from .outbox import register_low_priority
+from .rpc import NvimRpc
+
+# Dropped rather than queued when the outbox is full; each subscription numbers
+# its messages so clients can tell when they missed some and re-query.
+register_low_priority("changes")
+
+# Owner of the msgbus subscriptions, used to clear them
+_msgbus_owner = object()
+
+
+class Subscription:
+    __slots__ = (
+        "id",
+        "id_types",
+        "interval",
+        "properties",
+        "seq",
+        "last_sent",
+        "pending",
+        "pending_properties",
+        "truncated",
+    )
+
+    id: int
+    # type names like "Object" or "Mesh", None for all
+    id_types: Optional[Set[str]]
+    interval: float
+    # (type name, property) pairs watched through msgbus
+    properties: Set[Tuple[str, str]]
+    seq: int
+    last_sent: float
+    # (id type, name) -> kinds of change
+    pending: Dict[Tuple[str, str], Set[str]]
+    pending_properties: Set[Tuple[str, str]]
+    truncated: bool
+
+    def __init__(self, id, id_types, interval, properties):
+        self.id = id
+        self.id_types = id_types
+        self.interval = interval
+        self.properties = properties
+        self.seq = 0
+        self.last_sent = 0.0
+        self.pending = {}
+        self.pending_properties = set()
+        self.truncated = False
+
+    def has_pending(self):
+        return bool(self.pending or self.pending_properties or self.truncated)
+
+    def wants(self, id_type: str):
+        return self.id_types is None or id_type in self.id_types
+
+
+class ChangeFeed:
+    """Sends Neovim the IDs that changed in Blender, for each subscription.
+
+    Changes are collected from ``depsgraph_update_post`` (which IDs were
+    updated, and whether their transform, geometry or shading changed) and from
+    msgbus for properties a client asks for by name. They are merged per
+    subscription and sent at most once every ``interval`` seconds, so dragging
+    an object around sends one message per interval rather than one per redraw.
+    Nothing is hooked into Blender while there are no subscriptions.
+
+    In background mode there are no timers to wait out an interval with: the
+    changes are sent as soon as the task that made them ends, whatever the
+    interval.
+    """
+
+    min_interval = 1 / 30
+    # IDs collected per message; past that the message is marked truncated
+    max_ids = 1000
+
+    _subscriptions: Dict[int, Subscription]
+    _flush_scheduled: bool
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._ids = itertools.count(1)
+        self._flush_scheduled = False
+
+    def subscribe(
+        self,
+        id_types: Optional[Iterable[str]] = None,
+        interval: Optional[float] = None,
+        properties: Iterable[str] = (),
+    ):
+        watched = set()
+        for spec in properties:
+            type_name, _, prop = spec.partition(".")
+            struct = getattr(bpy.types, type_name, None)
+            if struct is None or not prop:
+                raise ValueError(f"Expected a property like Object.location: {spec!r}")
+            if prop not in struct.bl_rna.properties:
+                raise ValueError(f"{type_name} has no property {prop!r}")
+            watched.add((type_name, prop))
+
+        subscription = Subscription(
+            next(self._ids),
+            set(id_types) if id_types else None,
+            max(interval or 0.0, self.min_interval),
+            watched,
+        )
+        if not self._subscriptions:
+            bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+            bpy.app.handlers.load_post.append(_on_load_post)
+        self._subscriptions[subscription.id] = subscription
+        if watched:
+            self.subscribe_msgbus()
+        return subscription.id
+
+    def unsubscribe(self, subscription_id: int):
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return False
+        if subscription.properties:
+            self.subscribe_msgbus()
+        if not self._subscriptions:
+            handlers = bpy.app.handlers
+            _remove_handler(handlers.depsgraph_update_post, _on_depsgraph_update)
+            _remove_handler(handlers.load_post, _on_load_post)
+        return True
+
+    def subscribe_msgbus(self):
+        bpy.msgbus.clear_by_owner(_msgbus_owner)
+        watched = set()
+        for subscription in self._subscriptions.values():
+            watched |= subscription.properties
+        for type_name, prop in watched:
+            bpy.msgbus.subscribe_rna(
+                key=(getattr(bpy.types, type_name), prop),
+                owner=_msgbus_owner,
+                args=(type_name, prop),
+                notify=self.on_property_change,
+            )
+
+    def on_depsgraph_update(self, depsgraph):
+        changes: List[Tuple[str, str, Set[str]]] = []
+        for update in depsgraph.updates:
+            id = update.id.original
+            kinds = set()
+            if update.is_updated_transform:
+                kinds.add("transform")
+            if update.is_updated_geometry:
+                kinds.add("geometry")
+            if update.is_updated_shading:
+                kinds.add("shading")
+            changes.append((type(id).__name__, id.name, kinds))
+        if not changes:
+            return
+        for subscription in self._subscriptions.values():
+            pending = subscription.pending
+            for id_type, name, kinds in changes:
+                if not subscription.wants(id_type):
+                    continue
+                key = (id_type, name)
+                if key in pending:
+                    pending[key] |= kinds
+                elif len(pending) < self.max_ids:
+                    pending[key] = set(kinds)
+                else:
+                    subscription.truncated = True
+        self._schedule_flush()
+
+    def on_property_change(self, type_name: str, prop: str):
+        for subscription in self._subscriptions.values():
+            if (type_name, prop) in subscription.properties:
+                subscription.pending_properties.add((type_name, prop))
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        if bpy.app.background:
+            # timers never fire in background mode, the executor runs the flush
+            # once the current task (usually the script making the changes) ends
+            NvimRpc.get_instance().schedule(lambda: self.flush(force=True))
+        else:
+            # persistent, or loading a file would drop it with _flush_scheduled
+            # still set, and nothing would be sent again
+            bpy.app.timers.register(
+                self.flush, first_interval=self.min_interval, persistent=True
+            )
+
+    def flush(self, force: bool = False) -> Optional[float]:
+        """Send what each subscription has pending, once its interval is up.
+
+        Returns the delay until the next subscription is due, as a timer.
+        """
+        self._flush_scheduled = False
+        rpc = NvimRpc.get_instance_safe()
+        now = time.monotonic()
+        next_due = None
+        for subscription in self._subscriptions.values():
+            if not subscription.has_pending():
+                continue
+            due = subscription.last_sent + subscription.interval
+            if not force and due > now:
+                next_due = due if next_due is None else min(next_due, due)
+                continue
+            message = self._take(subscription)
+            subscription.last_sent = now
+            if rpc is not None:
+                rpc.send(message)
+        if next_due is None:
+            return None
+        self._flush_scheduled = True
+        return max(next_due - now, 0.0)
+
+    @staticmethod
+    def _take(subscription: Subscription):
+        subscription.seq += 1
+        message = {
+            "type": "changes",
+            "subscription": subscription.id,
+            "seq": subscription.seq,
+            "ids": [
+                {"id_type": id_type, "name": name, "changed": sorted(kinds)}
+                for (id_type, name), kinds in subscription.pending.items()
+            ],
+            "properties": [
+                {"id_type": id_type, "property": prop}
+                for id_type, prop in sorted(subscription.pending_properties)
+            ],
+            "truncated": subscription.truncated,
+        }
+        subscription.pending = {}
+        subscription.pending_properties = set()
+        subscription.truncated = False
+        return message
+
+
+def _remove_handler(handlers, handler):
+    if handler in handlers:
+        handlers.remove(handler)
+
+
+change_feed = ChangeFeed()
+
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph=None):
+    # Blender before 2.81 only passes the scene
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    change_feed.on_depsgraph_update(depsgraph)
+
+
+@bpy.app.handlers.persistent
+def _on_load_post(*args):
+    # loading a file clears msgbus subscriptions
+    change_feed.subscribe_msgbus()
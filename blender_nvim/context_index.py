@@ -0,0 +1,187 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import bpy
+
+# Owner of the msgbus subscriptions, used to clear them
+_msgbus_owner = object()
+
+# Properties whose change makes the index stale. Splitting and joining areas
+# doesn't publish anything, that is caught by the index fingerprint.
+_msgbus_keys = (
+    ("Window", "screen"),
+    ("Window", "workspace"),
+    ("Area", "type"),
+    ("Area", "ui_type"),
+)
+
+
+class WindowEntry:
+    __slots__ = ("window", "areas", "areas_by_type", "regions")
+
+    window: Any
+    areas: List[Any]
+    areas_by_type: Dict[str, List[Any]]
+    # area pointer -> (regions in order, first region of each type)
+    regions: Dict[int, Tuple[List[Any], Dict[str, Any]]]
+
+    def __init__(self, window):
+        self.window = window
+        self.areas = list(window.screen.areas)
+        self.areas_by_type = {}
+        self.regions = {}
+        for area in self.areas:
+            self.areas_by_type.setdefault(area.type, []).append(area)
+            regions = list(area.regions)
+            by_type: Dict[str, Any] = {}
+            for region in regions:
+                by_type.setdefault(region.type, region)
+            self.regions[area.as_pointer()] = (regions, by_type)
+
+
+class ContextIndex:
+    """Index of the windows, areas and regions used for script context overrides.
+
+    Built on first use and reused until it is invalidated, by a file load or a
+    msgbus notification, or until the layout fingerprint (each window's screen
+    and number of areas) changes. Looking up a target then costs the same no
+    matter how many areas the screens have.
+    """
+
+    _windows: Optional[List[WindowEntry]]
+    _by_name: Dict[str, int]
+    _fingerprint: Optional[Tuple]
+
+    def __init__(self):
+        self._windows = None
+        self._by_name = {}
+        self._fingerprint = None
+        self.builds = 0
+
+    def invalidate(self, *args):
+        self._windows = None
+
+    def subscribe(self):
+        bpy.msgbus.clear_by_owner(_msgbus_owner)
+        for type_name, prop in _msgbus_keys:
+            bpy.msgbus.subscribe_rna(
+                key=(getattr(bpy.types, type_name), prop),
+                owner=_msgbus_owner,
+                args=(),
+                notify=self.invalidate,
+            )
+
+    def register(self):
+        self.subscribe()
+        if _on_load_post not in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.append(_on_load_post)
+
+    @staticmethod
+    def _window_manager():
+        return bpy.data.window_managers[0]
+
+    def _current_fingerprint(self):
+        return tuple(
+            (window.screen.as_pointer(), len(window.screen.areas))
+            for window in self._window_manager().windows
+        )
+
+    def _build(self):
+        windows = [WindowEntry(window) for window in self._window_manager().windows]
+        by_name: Dict[str, int] = {}
+        for i, entry in enumerate(windows):
+            by_name.setdefault(entry.window.workspace.name, i)
+            by_name.setdefault(entry.window.screen.name, i)
+        self._windows = windows
+        self._by_name = by_name
+        self.builds += 1
+
+    def windows(self) -> List[WindowEntry]:
+        fingerprint = self._current_fingerprint()
+        if self._windows is None or fingerprint != self._fingerprint:
+            self._build()
+            self._fingerprint = fingerprint
+        assert self._windows is not None
+        return self._windows
+
+    def resolve(
+        self,
+        window: Optional[str] = None,
+        area: Optional[str] = None,
+        region: Optional[str] = None,
+    ):
+        """Find the window, area and region selected by script directives.
+
+        ``window`` is an index or a workspace or screen name. ``area`` is an
+        index into the screen's areas, an area type, or ``TYPE:n`` for the n-th
+        area of a type. ``region`` is an index or a region type. Explicit
+        selections that match nothing raise ``ValueError``.
+        """
+        try:
+            return self._resolve(window, area, region)
+        except ReferenceError:
+            # a window or area was freed without the index hearing about it
+            self.invalidate()
+            return self._resolve(window, area, region)
+
+    def _resolve(self, window_spec, area_spec, region_spec):
+        windows = self.windows()
+        if not windows:
+            return None, None, None
+
+        area_type, area_index = parse_area(area_spec or "VIEW_3D")
+
+        if window_spec is None:
+            # the first window that has the area
+            entry = windows[0]
+            if area_type is not None:
+                for candidate in windows:
+                    if len(candidate.areas_by_type.get(area_type, ())) > area_index:
+                        entry = candidate
+                        break
+        elif window_spec.isdigit():
+            if int(window_spec) >= len(windows):
+                raise ValueError(f"No window with index {window_spec}")
+            entry = windows[int(window_spec)]
+        elif window_spec in self._by_name:
+            entry = windows[self._by_name[window_spec]]
+        else:
+            raise ValueError(f"No window with a workspace or screen {window_spec!r}")
+
+        if area_type is None:
+            areas = entry.areas
+        else:
+            areas = entry.areas_by_type.get(area_type, [])
+        if area_index >= len(areas):
+            if area_spec is not None:
+                workspace = entry.window.workspace.name
+                raise ValueError(f"No area {area_spec!r} in workspace {workspace!r}")
+            return entry.window, None, None
+        area = areas[area_index]
+
+        regions, regions_by_type = entry.regions[area.as_pointer()]
+        spec = region_spec or "WINDOW"
+        if spec.isdigit():
+            region = regions[int(spec)] if int(spec) < len(regions) else None
+        else:
+            region = regions_by_type.get(spec.upper())
+        if region is None and region_spec is not None:
+            raise ValueError(f"No region {region_spec!r} in area {area.type}")
+        return entry.window, area, region
+
+
+def parse_area(spec: str) -> Tuple[Optional[str], int]:
+    """Split an area directive into an area type (None for any) and an index"""
+    if spec.isdigit():
+        return None, int(spec)
+    area_type, _, index = spec.partition(":")
+    return area_type.upper(), int(index) if index.isdigit() else 0
+
+
+context_index = ContextIndex()
+
+
+@bpy.app.handlers.persistent
+def _on_load_post(*args):
+    # loading a file replaces the windows and clears msgbus subscriptions
+    context_index.invalidate()
+    context_index.subscribe()
@@ -1,10 +1,20 @@
-from typing import Optional
+import sys
+import threading
+import time
+from typing import Optional, Tuple
 
+from .output import log
 from .rpc import NvimRpc
 
 
 class NvimDap:
-    """DAP Interface for Neovim <-> Debugpy communication (singleton)"""
+    """DAP Interface for Neovim <-> Debugpy communication (singleton)
+
+    Nothing is imported or listened on until the debugger is first needed:
+    when Neovim sends ``dap_start``, or when a script calls ``breakpoint()``.
+    Clients attach in the background, and Blender's main thread is only traced
+    while a client is attached.
+    """
 
     # --- Class --- #
     _instance: Optional["NvimDap"] = None
@@ -14,6 +24,7 @@ class NvimDap:
         if cls._instance is not None:
             raise ValueError("NvimDap instance is already initialized")
         cls._instance = cls(rpc)
+        sys.breakpointhook = _breakpointhook
         return cls._instance
 
     @classmethod
@@ -31,23 +42,98 @@ class NvimDap:
     started: bool = False
     host: Optional[str]
     port: Optional[int]
+    # seconds between checks whether the client is still connected
+    poll_interval: float = 0.5
+    # seconds breakpoint() waits for a client before the script carries on
+    attach_timeout: float = 60.0
 
     def __init__(self, rpc: NvimRpc):
         self.rpc = rpc
+        self.host = None
+        self.port = None
+        self._lock = threading.Lock()
+        self._attached = threading.Event()
+
+    @property
+    def attached(self):
+        return self._attached.is_set()
+
+    def start(self, announce: bool = True) -> Tuple[Optional[str], Optional[int]]:
+        """Start listening for a debug client, if not already, without waiting.
+
+        With ``announce``, Neovim is sent the address so it attaches.
+        """
+        with self._lock:
+            if self.started:
+                return self.host, self.port
+            import debugpy
+
+            debugpy.configure()
+            self.host, self.port = debugpy.listen(("localhost", 0))
+            self.started = True
+            log("info", f"Debugpy listening on {self.host}:{self.port}")
+            threading.Thread(
+                target=self._monitor, name="blender-nvim-dap", daemon=True
+            ).start()
+        if announce:
+            self.announce()
+        return self.host, self.port
+
+    def announce(self):
+        """Ask Neovim to attach to the listener"""
+        self.rpc.send({"type": "setup_debugpy", "host": self.host, "port": self.port})
+
+    def wait_for_client(self, timeout: Optional[float] = None):
+        """Block until a debug client is attached, False if ``timeout`` passed.
 
-    def start(self):
+        Waits in short steps, so that cancelling the script that waits (which
+        raises ScriptCancelled in it) isn't held up until a client attaches.
+        """
+        self.start(announce=False)
+        if not self.attached:
+            self.announce()
+            log("info", "Waiting for debug client.")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._attached.wait(self.poll_interval):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+    def _monitor(self):
         import debugpy
 
-        debugpy.configure()
-        self.host, self.port = debugpy.listen(("localhost", 0))
-        print(f"Debugpy listening on {self.host}:{self.port}")
-        self.rpc.send(
-            {
-                "type": "setup_debugpy",
-                "host": self.host,
-                "port": self.port,
-            }
-        )
-        print("Waiting for debug client.")
-        debugpy.wait_for_client()
-        print("Debug client attached.")
+        while True:
+            debugpy.wait_for_client()
+            log("info", "Debug client attached.")
+            self._attached.set()
+            self.rpc.schedule(lambda: debugpy.trace_this_thread(True))
+            # debugpy has no detach event
+            while debugpy.is_client_connected():
+                time.sleep(self.poll_interval)
+            log("info", "Debug client detached.")
+            self._attached.clear()
+            # stop paying for tracing on the main thread until the next attach
+            self.rpc.schedule(lambda: debugpy.trace_this_thread(False))
+            self.rpc.send({"type": "dap_detached"})
+
+
+def _breakpointhook(*args, **kwargs):
+    dap = NvimDap.get_instance_safe()
+    if dap is None:
+        return sys.__breakpointhook__(*args, **kwargs)
+    import debugpy
+
+    if not dap.wait_for_client(dap.attach_timeout):
+        log("warn", f"No debug client attached in {dap.attach_timeout:.0f}s")
+        return None
+    debugpy.trace_this_thread(True)
+    debugpy.breakpoint()
+
+
+@NvimRpc.request_handler("dap_start", main_thread=False)
+def dap_start_action(data=None):
+    dap = NvimDap.get_instance_safe()
+    if dap is None:
+        raise ValueError("DAP is not enabled for this Blender session")
+    host, port = dap.start(announce=False)
+    return {"host": host, "port": port, "attached": dap.attached}
@@ -0,0 +1,241 @@
+import array
+import atexit
+import os
+import queue
+import select
+import socket
+import struct
+import tempfile
+import threading
+import traceback
+from typing import Any, Dict, Optional, Tuple
+
+import bpy
+import msgpack
+
+from .output import log
+from .rpc import NvimRpc
+
+
+def frame_header(stream_id: int, seq: int, last: bool, size: int):
+    """Header of a ``[stream_id, seq, last, bin]`` msgpack frame.
+
+    The payload is written separately, straight from the source buffer, so the
+    chunk is never copied into a packed bytes object.
+    """
+    return (
+        b"\x94"
+        + msgpack.packb(stream_id)
+        + msgpack.packb(seq)
+        + msgpack.packb(last)
+        + b"\xc6"
+        + struct.pack(">I", size)
+    )
+
+
+def _is_open(conn: socket.socket):
+    """Whether the peer still has ``conn`` open.
+
+    Neovim never writes to the data channel, so it only becomes readable once
+    Neovim closes it.
+    """
+    try:
+        readable, _, _ = select.select([conn], [], [], 0)
+        return not readable or conn.recv(1, socket.MSG_PEEK) != b""
+    except (OSError, ValueError):
+        return False
+
+
+class DataChannel:
+    """Streams raw buffers to Neovim over a dedicated local socket (singleton).
+
+    Bulk transfers use their own connection so that they never hold up control
+    messages on the RPC session. Buffers are queued for a sender thread; at most
+    ``max_pending`` streams may be queued at once, and a slow reader blocks the
+    sender thread rather than Blender's main thread.
+    """
+
+    # --- Class --- #
+    _instance: Optional["DataChannel"] = None
+
+    chunk_size = 1 << 20
+    max_pending = 8
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+            atexit.register(cls._instance.close)
+        return cls._instance
+
+    @classmethod
+    def get_instance_safe(cls):
+        return cls._instance
+
+    # --- Instance --- #
+    family: str
+    address: str
+    _server: socket.socket
+    _conn: Optional[socket.socket]
+    _connected: threading.Event
+    _streams: "queue.Queue[Tuple[int, memoryview, int]]"
+
+    def __init__(self):
+        if hasattr(socket, "AF_UNIX"):
+            self.family = "unix"
+            self.address = os.path.join(
+                tempfile.gettempdir(), f"blender-nvim-data-{os.getpid()}.sock"
+            )
+            if os.path.exists(self.address):
+                os.remove(self.address)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(self.address)
+        else:
+            self.family = "tcp"
+            self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._server.bind(("127.0.0.1", 0))
+            host, port = self._server.getsockname()
+            self.address = f"{host}:{port}"
+        self._server.listen(1)
+        self._conn = None
+        self._connected = threading.Event()
+        self._streams = queue.Queue(maxsize=self.max_pending)
+        for target in (self._accept_loop, self._send_loop):
+            threading.Thread(target=target, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            current = self._conn
+            if current is not None and _is_open(current):
+                # one Neovim reads the channel, a second reader would get
+                # chunks of streams it never asked for
+                log("warn", "Rejected a second data channel connection")
+                conn.close()
+                continue
+            if current is not None:
+                log("info", "Data channel reconnected")
+                current.close()
+            self._conn = conn
+            self._connected.set()
+
+    def _send_loop(self):
+        while True:
+            stream_id, view, chunk_size = self._streams.get()
+            self._connected.wait()
+            conn = self._conn
+            if conn is None:
+                continue
+            try:
+                seq = 0
+                offset = 0
+                while True:
+                    chunk = view[offset : offset + chunk_size]
+                    offset += len(chunk)
+                    last = offset >= len(view)
+                    conn.sendall(frame_header(stream_id, seq, last, len(chunk)))
+                    conn.sendall(chunk)
+                    seq += 1
+                    if last:
+                        break
+            except OSError:
+                traceback.print_exc()
+                self._connected.clear()
+                self._conn = None
+            finally:
+                view.release()
+
+    def submit(self, stream_id: int, buffer: Any, chunk_size: Optional[int] = None):
+        """Queue ``buffer`` for sending, returns False if too many are pending"""
+        view = memoryview(buffer).cast("B")
+        try:
+            self._streams.put_nowait((stream_id, view, chunk_size or self.chunk_size))
+        except queue.Full:
+            view.release()
+            return False
+        return True
+
+    def close(self):
+        self._server.close()
+        if self._conn is not None:
+            self._conn.close()
+        if self.family == "unix" and os.path.exists(self.address):
+            os.remove(self.address)
+
+
+def make_buffer(prop_type: str, length: int):
+    if prop_type == "FLOAT":
+        return array.array("f", [0.0]) * length, "float32"
+    if prop_type == "INT":
+        return array.array("i", [0]) * length, "int32"
+    if prop_type == "BOOLEAN":
+        # foreach_get needs a bool-typed buffer, which array.array can't provide
+        import numpy
+
+        return numpy.empty(length, dtype=bool), "bool"
+    raise ValueError(f"Unsupported property type: {prop_type}")
+
+
+def read_buffer(data: Dict[str, Any]):
+    """Copy a bpy property into a flat buffer with a single foreach_get call"""
+    target = getattr(bpy.data, data["id_type"])[data["name"]]
+    if data.get("path"):
+        target = target.path_resolve(data["path"])
+    attribute = data.get("attribute")
+    count = len(target)
+
+    if attribute:
+        # a collection such as mesh.vertices, read attribute "co" of each item
+        if count == 0:
+            return array.array("f"), {"dtype": "float32", "shape": [0]}
+        prop = target[0].bl_rna.properties[attribute]
+        width = max(prop.array_length, 1)
+        buffer, dtype = make_buffer(prop.type, count * width)
+        target.foreach_get(attribute, buffer)
+    else:
+        # a property array such as image.pixels
+        width = 1
+        sample = target[0] if count else 0.0
+        prop_type = {bool: "BOOLEAN", int: "INT"}.get(type(sample), "FLOAT")
+        buffer, dtype = make_buffer(prop_type, count)
+        target.foreach_get(buffer)
+
+    shape = [count, width] if width > 1 else [count]
+    return buffer, {"dtype": dtype, "shape": shape}
+
+
+@NvimRpc.notification_handler("data_stream")
+def data_stream_action(data):
+    rpc = NvimRpc.get_instance()
+    stream_id = data["stream_id"]
+    try:
+        buffer, meta = read_buffer(data)
+    except Exception as e:
+        traceback.print_exc()
+        rpc.send(
+            {"type": "data_stream_error", "stream_id": stream_id, "message": str(e)}
+        )
+        return
+    channel = DataChannel.get_instance()
+    if not channel.submit(stream_id, buffer, data.get("chunk_size")):
+        rpc.send(
+            {
+                "type": "data_stream_error",
+                "stream_id": stream_id,
+                "message": "Too many pending data streams",
+            }
+        )
+        return
+    rpc.send(
+        {
+            "type": "data_stream_ready",
+            "stream_id": stream_id,
+            "family": channel.family,
+            "address": channel.address,
+            "nbytes": memoryview(buffer).nbytes,
+            **meta,
+        }
+    )
@@ -1,9 +1,9 @@
 import platform
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Tuple, cast
 
-import addon_utils
 import bpy
 
 python_path = Path(sys.executable)
@@ -19,4 +19,11 @@ else:
 version = cast(Tuple[int, int, int], bpy.app.version)
 scripts_folder = blender_path.parent / f"{version[0]}.{version[1]}" / "scripts"
 user_addon_directory = Path(bpy.utils.user_resource("SCRIPTS", path="addons"))
-addon_directories = tuple(map(Path, cast(List[str], addon_utils.paths())))
+
+
+@lru_cache(maxsize=None)
+def get_addon_directories() -> Tuple[Path, ...]:
+    # addon_utils.paths() scans the script directories, only do it when needed
+    import addon_utils
+
+    return tuple(map(Path, cast(List[str], addon_utils.paths())))
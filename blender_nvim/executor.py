@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Tuple
+
+import bpy
+
+
+class ExecutorStats:
+    """Counters describing the main-thread executor's queue"""
+
+    executed: int = 0
+    ticks: int = 0
+    budget_overruns: int = 0
+    last_wait: float = 0.0
+    max_wait: float = 0.0
+    total_wait: float = 0.0
+
+    def record_wait(self, wait: float):
+        self.executed += 1
+        self.last_wait = wait
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+    @property
+    def avg_wait(self):
+        return self.total_wait / self.executed if self.executed else 0.0
+
+
+class MainThreadExecutor:
+    """Runs queued callables on Blender's main thread from a bpy.app.timers callback.
+
+    Timers can only be (re-)registered safely from the main thread, so the
+    session thread cannot wake the timer directly. Instead the tick interval
+    adapts to the traffic: while work is arriving the executor polls every
+    ``min_interval`` seconds, and once the queue has been idle for
+    ``hot_period`` seconds the interval backs off geometrically until it
+    reaches ``max_interval``. Each tick runs queued work for at most
+    ``tick_budget`` seconds before yielding back to Blender's UI.
+
+    This bounds the wait before queued work starts: at most ``min_interval``
+    within ``hot_period`` of the last activity, but up to ``max_interval``
+    (the old fixed poll) for the first message after an idle period, such as
+    the reload after a save. The price of the hot period is a timer call every
+    ``min_interval`` seconds for ``hot_period`` seconds after each burst, each
+    doing no more than checking the queue.
+    """
+
+    min_interval = 0.001
+    max_interval = 0.1
+    hot_period = 0.5
+    backoff = 1.5
+    tick_budget = 0.02
+
+    _queue: "queue.SimpleQueue[Tuple[float, Callable[[], Any]]]"
+    _interval: float
+    _last_activity: float
+    _started: bool
+    stats: ExecutorStats
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._interval = self.min_interval
+        self._last_activity = time.monotonic()
+        self._started = False
+        self.stats = ExecutorStats()
+
+    @property
+    def started(self):
+        return self._started
+
+    def submit(self, func: Callable[[], Any]):
+        self._queue.put((time.monotonic(), func))
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth(),
+            "interval": self._interval,
+            "executed": self.stats.executed,
+            "ticks": self.stats.ticks,
+            "budget_overruns": self.stats.budget_overruns,
+            "last_wait": self.stats.last_wait,
+            "avg_wait": self.stats.avg_wait,
+            "max_wait": self.stats.max_wait,
+        }
+
+    def _run_one(self, enqueued_at: float, func: Callable[[], Any]):
+        self.stats.record_wait(time.monotonic() - enqueued_at)
+        try:
+            func()
+        except:  # noqa: E722
+            traceback.print_exc()
+
+    def tick(self):
+        self.stats.ticks += 1
+        start = time.monotonic()
+        ran = False
+        while True:
+            try:
+                enqueued_at, func = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            ran = True
+            self._run_one(enqueued_at, func)
+            if time.monotonic() - start >= self.tick_budget:
+                if not self._queue.empty():
+                    # Out of budget with work left: let Blender process events,
+                    # then come straight back.
+                    self.stats.budget_overruns += 1
+                    self._last_activity = time.monotonic()
+                    self._interval = self.min_interval
+                    return 0.0
+                break
+        now = time.monotonic()
+        if ran:
+            self._last_activity = now
+            self._interval = self.min_interval
+        elif now - self._last_activity > self.hot_period:
+            self._interval = min(self._interval * self.backoff, self.max_interval)
+        return self._interval
+
+    def start(self):
+        if self._started:
+            raise ValueError("Executor is already started")
+        bpy.app.timers.register(self.tick, first_interval=0.0, persistent=True)
+        self._started = True
+
+    def run_forever(self, stop: threading.Event, poll_interval: float = 0.1):
+        """Drive the executor from a blocking loop on the calling thread.
+
+        Used in background mode (``blender -b``), where timers never fire. Work is
+        picked up as soon as it is queued.
+        """
+        if self._started:
+            raise ValueError("Executor is already started")
+        self._started = True
+        while not stop.is_set():
+            try:
+                enqueued_at, func = self._queue.get(timeout=poll_interval)
+            except queue.Empty:
+                continue
+            self.stats.ticks += 1
+            self._run_one(enqueued_at, func)
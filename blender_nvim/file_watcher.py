@@ -0,0 +1,242 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .output import log
+
+# Files that never warrant a reload: bytecode, editor swap and backup files, and
+# the file Vim creates to test whether it can write to a directory
+ignore_patterns = ("*.pyc", "*.pyo", "*~", "*.swp", "*.swx", ".*", "4913")
+ignore_dirs = ("__pycache__", ".*")
+# Files watched by default, addons add patterns for their data files
+source_patterns = ("*.py",)
+
+
+def _ignored(name: str, patterns: Iterable[str]):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def _watched(name: str, patterns: Iterable[str]):
+    return not _ignored(name, ignore_patterns) and _ignored(name, patterns)
+
+
+def _walk(root: str):
+    """Yield the directories under ``root`` that are watched, ``root`` first"""
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not _ignored(d, ignore_dirs)]
+        yield dirpath
+
+
+class _Inotify:
+    """Linux inotify through libc, one watch per directory"""
+
+    name = "inotify"
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+
+    mask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _header = struct.Struct("iIII")
+
+    def __init__(self, roots: List[str], patterns: Iterable[str]):
+        self._patterns = tuple(patterns)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_tree(self, root: str):
+        for path in _walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.mask)
+            if wd < 0:
+                error = os.strerror(ctypes.get_errno())
+                log("warn", f"Could not watch {path}: {error}")
+                continue
+            self._dirs[wd] = path
+
+    def read(self, timeout: float) -> Tuple[Set[str], bool]:
+        """Wait for changes, return the changed paths and whether some were lost"""
+        changed: Set[str] = set()
+        overflow = False
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed, overflow
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, overflow
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._header.unpack_from(data, offset)
+            offset += self._header.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                if _ignored(name, ignore_dirs):
+                    continue
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    # e.g. a branch switch adding a package
+                    self._add_tree(path)
+            elif not _watched(name, self._patterns):
+                continue
+            changed.add(path)
+        return changed, overflow
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _Poller:
+    """Compares modification times and sizes of every file, for other systems"""
+
+    name = "poll"
+
+    interval = 0.5
+
+    def __init__(self, roots: List[str], patterns: Iterable[str]):
+        self._roots = roots
+        self._patterns = tuple(patterns)
+        self._files = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for root in self._roots:
+            for directory in _walk(root):
+                try:
+                    entries = list(os.scandir(directory))
+                except OSError:
+                    continue
+                for entry in entries:
+                    if not _watched(entry.name, self._patterns):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def read(self, timeout: float) -> Tuple[Set[str], bool]:
+        time.sleep(min(timeout, self.interval))
+        files = self._scan()
+        previous = self._files
+        self._files = files
+        changed = set(files.keys() ^ previous.keys())
+        changed.update(
+            path
+            for path, state in files.items()
+            if path in previous and previous[path] != state
+        )
+        return changed, False
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """Watches add-on sources from inside Blender and reports bursts of changes.
+
+    Uses inotify on Linux, and compares stat results of every file elsewhere or
+    when inotify is unavailable. Changes are collected until none arrived for
+    ``debounce`` seconds (or ``max_wait`` seconds passed since the first), so
+    a branch switch touching hundreds of files is reported once. Only files
+    matching ``patterns`` (Python sources by default) are watched.
+    ``on_change`` is called on the watcher thread with the changed paths, or
+    ``None`` when inotify dropped events and anything may have changed, and the
+    ``time.monotonic()`` at which the first change of the burst was seen.
+    """
+
+    debounce = 0.2
+    max_wait = 2.0
+
+    _backend: Optional[Union[_Inotify, _Poller]]
+    _thread: Optional[threading.Thread]
+
+    def __init__(
+        self,
+        roots: List[str],
+        on_change: Callable[[Optional[Set[str]], float], None],
+        debounce: Optional[float] = None,
+        patterns: Iterable[str] = source_patterns,
+    ):
+        self.roots = [os.path.realpath(root) for root in roots]
+        self.patterns = tuple(patterns)
+        self._on_change = on_change
+        if debounce is not None:
+            self.debounce = debounce
+        self._stop = threading.Event()
+        self._backend = None
+        self._thread = None
+
+    @property
+    def backend(self):
+        return getattr(self._backend, "name", None)
+
+    def start(self):
+        if sys.platform.startswith("linux"):
+            try:
+                self._backend = _Inotify(self.roots, self.patterns)
+            except (OSError, AttributeError) as e:
+                log("warn", f"inotify is unavailable, polling for changes: {e}")
+        if self._backend is None:
+            self._backend = _Poller(self.roots, self.patterns)
+        self._thread = threading.Thread(
+            target=self._run, name="blender-nvim-watch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        backend = self._backend
+        assert backend is not None
+        try:
+            while not self._stop.is_set():
+                changed, overflow = backend.read(0.5)
+                if not changed and not overflow:
+                    continue
+                first = last = time.monotonic()
+                while not self._stop.is_set():
+                    remaining = min(last + self.debounce, first + self.max_wait)
+                    remaining -= time.monotonic()
+                    if remaining <= 0:
+                        break
+                    more, more_overflow = backend.read(remaining)
+                    overflow = overflow or more_overflow
+                    if more or more_overflow:
+                        changed |= more
+                        last = time.monotonic()
+                if self._stop.is_set():
+                    break
+                self._on_change(None if overflow else changed, first)
+        finally:
+            backend.close()
@@ -1,12 +1,17 @@
 import os
 import sys
+import time
 import traceback
+from typing import Any, Dict, List, Optional
 
 import bpy
 
-from .environment import addon_directories, user_addon_directory
+from .environment import get_addon_directories, user_addon_directory
+from .prewarm import Prewarm
 from .rpc import NvimRpc
 
+path_mappings: List[Dict[str, str]] = []
+
 
 def setup_addon_links(addons_to_load):
     if not os.path.exists(user_addon_directory):
@@ -15,7 +20,7 @@ def setup_addon_links(addons_to_load):
     if str(user_addon_directory) not in sys.path:
         sys.path.append(str(user_addon_directory))
 
-    path_mappings = []
+    path_mappings.clear()
 
     for source_path, module_name in addons_to_load:
         if is_in_any_addon_directory(source_path):
@@ -29,8 +34,14 @@ def setup_addon_links(addons_to_load):
     return path_mappings
 
 
-def load_addons(addons_to_load):
+def load_addons(addons_to_load, prewarm: Optional[Prewarm] = None):
+    start = time.perf_counter()
+    timings = []
     for source_path, module_name in addons_to_load:
+        timing: Dict[str, Any] = {"name": module_name, "ok": True}
+        if prewarm is not None:
+            timing["prewarm"] = prewarm.wait(module_name)
+        enable_start = time.perf_counter()
         try:
             bpy.ops.preferences.addon_enable(module=module_name)
         except:  # noqa: E722
@@ -38,6 +49,40 @@ def load_addons(addons_to_load):
             NvimRpc.get_instance().send(
                 {"type": "enable_failure", "message": traceback.format_exc()}
             )
+            timing["ok"] = False
+        timing["enable"] = time.perf_counter() - enable_start
+        timings.append(timing)
+    NvimRpc.get_instance().send(
+        {
+            "type": "addons_loaded",
+            "addons": timings,
+            "duration": time.perf_counter() - start,
+        }
+    )
+    return timings
+
+
+def loaded_addon_names():
+    """Module names of the addons loaded from Neovim"""
+    return [os.path.basename(mapping["load"]) for mapping in path_mappings]
+
+
+def map_source_path(path: str):
+    """Translate a path inside an addon's source directory to its load path"""
+    for mapping in path_mappings:
+        src = mapping["src"]
+        if path == src or path.startswith(src + os.sep):
+            return mapping["load"] + path[len(src) :]
+    return path
+
+
+def map_load_path(path: str):
+    """Translate a path inside an addon's load path back to its source directory"""
+    for mapping in path_mappings:
+        load = mapping["load"]
+        if path == load or path.startswith(load + os.sep):
+            return mapping["src"] + path[len(load) :]
+    return path
 
 
 def create_link_in_user_addon_directory(directory, link_path):
@@ -53,7 +98,7 @@ def create_link_in_user_addon_directory(directory, link_path):
 
 
 def is_in_any_addon_directory(module_path):
-    for path in addon_directories:
+    for path in get_addon_directories():
         if path == module_path.parent:
             return True
     return False
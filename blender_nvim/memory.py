@@ -0,0 +1,226 @@
+import gc
+import sys
+import time
+import tracemalloc
+import types
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+from .load_addons import loaded_addon_names, map_load_path
+from .output import log
+from .reload import is_addon_module
+from .rpc import NvimRpc
+
+# number of allocation sites, by growth, sent back to Neovim
+max_sites = 20
+# objects per stale module whose holders are looked up
+max_samples = 3
+
+_snapshot_filters = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _is_current(obj: Any, name: str):
+    """Whether a function or class belongs to the loaded copy of its module"""
+    module = sys.modules.get(name)
+    if module is None:
+        return False
+    if isinstance(obj, types.FunctionType):
+        return obj.__globals__ is module.__dict__
+    qualname = obj.__qualname__
+    if "<locals>" in qualname:
+        # can't be looked up, but it is current if its module is
+        return True
+    found: Any = module
+    for part in qualname.split("."):
+        found = getattr(found, part, None)
+    return found is obj
+
+
+def find_stale(packages: Iterable[str]):
+    """Count the objects left over from previous imports of the packages' modules.
+
+    After a reload, the old module objects, and the functions and classes
+    defined in them, should be garbage. Those still alive are kept by something
+    the addon registered and never removed: a handler, a timer, a msgbus
+    subscription or a class that is still registered.
+    """
+    packages = list(packages)
+    stale: Dict[str, Dict[str, Any]] = {}
+    samples: Dict[str, List[Any]] = {}
+    gc.collect()
+    for obj in gc.get_objects():
+        if isinstance(obj, types.ModuleType):
+            name, kind = getattr(obj, "__name__", None), "modules"
+        elif isinstance(obj, types.FunctionType):
+            name, kind = obj.__module__, "functions"
+        elif isinstance(obj, type):
+            name, kind = getattr(obj, "__module__", None), "classes"
+        else:
+            continue
+        if not isinstance(name, str):
+            continue
+        if not any(is_addon_module(name, package) for package in packages):
+            continue
+        if kind == "modules":
+            current = sys.modules.get(name) is obj
+        else:
+            current = _is_current(obj, name)
+        if current:
+            continue
+        entry = stale.setdefault(
+            name, {"module": name, "modules": 0, "functions": 0, "classes": 0}
+        )
+        entry[kind] += 1
+        if kind != "modules" and len(samples.setdefault(name, [])) < max_samples:
+            samples[name].append(obj)
+    if samples:
+        named = _named_containers()
+        for name, objects in samples.items():
+            stale[name]["holders"] = sorted(
+                {holder for obj in objects for holder in _holders(obj, objects, named)}
+            )
+    return stale
+
+
+def _named_containers() -> Dict[int, str]:
+    """Names of the lists and dicts that commonly keep stale objects alive"""
+    import bpy
+
+    named: Dict[int, str] = {}
+    for attr in dir(bpy.app.handlers):
+        handlers = getattr(bpy.app.handlers, attr)
+        if isinstance(handlers, list):
+            named[id(handlers)] = f"bpy.app.handlers.{attr}"
+    for module_name, module in list(sys.modules.items()):
+        module_dict = getattr(module, "__dict__", None)
+        if module_dict is not None:
+            named[id(module_dict)] = f"module {module_name}"
+    return named
+
+
+def _holders(obj: Any, ignore: List[Any], named: Dict[int, str]) -> List[str]:
+    """Describe what keeps ``obj`` alive, as far as it can be named"""
+    holders = []
+    if isinstance(obj, type) and getattr(obj, "is_registered", False):
+        holders.append("registered bpy class")
+    for referrer in gc.get_referrers(obj):
+        if referrer is ignore or isinstance(referrer, types.FrameType):
+            continue
+        if referrer is getattr(obj, "__mro__", None):
+            continue
+        if type(referrer).__name__ == "getset_descriptor":
+            # the class's own __dict__ and __weakref__ attributes
+            continue
+        if id(referrer) in named:
+            holders.append(named[id(referrer)])
+        elif isinstance(referrer, dict) and "__file__" in referrer:
+            # the globals of an old copy of a module, kept by its functions
+            holders.append(f"old module {referrer.get('__name__')}")
+        elif isinstance(referrer, types.MethodType):
+            holders.append(f"bound method of {type(referrer.__self__).__name__}")
+        else:
+            holders.append(type(referrer).__name__)
+    return holders
+
+
+def top_growth(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot):
+    stats = after.compare_to(before, "lineno")
+    growing = [stat for stat in stats if stat.size_diff > 0][:max_sites]
+    return [
+        {
+            "file": map_load_path(stat.traceback[0].filename),
+            "line": stat.traceback[0].lineno,
+            "size_diff": stat.size_diff,
+            "count_diff": stat.count_diff,
+            "size": stat.size,
+        }
+        for stat in growing
+    ]
+
+
+class MemoryTracker:
+    """Measures what reloads and script runs leave behind (opt-in).
+
+    While enabled, tracemalloc records where memory is allocated. Each tracked
+    reload or run is bracketed by a garbage collection, a tracemalloc snapshot
+    and a count of the stale copies of the addons' modules. The allocation
+    sites that grew the most, and the stale modules with what holds on to them,
+    are sent to Neovim as a ``memory_report`` message.
+    """
+
+    # stack frames stored per allocation, more is slower
+    frames = 1
+
+    @property
+    def enabled(self):
+        return tracemalloc.is_tracing()
+
+    def enable(self, frames: Optional[int] = None):
+        if frames is not None:
+            self.frames = max(1, int(frames))
+        if not self.enabled:
+            tracemalloc.start(self.frames)
+            log("info", f"Tracking memory ({self.frames} frames per allocation)")
+
+    def disable(self):
+        if self.enabled:
+            tracemalloc.stop()
+            log("info", "Stopped tracking memory")
+
+    def status(self):
+        traced, peak = tracemalloc.get_traced_memory()
+        return {"enabled": self.enabled, "traced": traced, "peak": peak}
+
+    @contextmanager
+    def track(self, label: str, packages: Optional[Iterable[str]] = None):
+        """Report the memory growth and stale modules caused by the body"""
+        if not self.enabled:
+            yield
+            return
+        packages = list(packages if packages is not None else loaded_addon_names())
+        stale_before = find_stale(packages)
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if not self.enabled:
+                # stopped while the body ran
+                return
+            stale_after = find_stale(packages)
+            after = tracemalloc.take_snapshot()
+            self._send(label, duration, before, after, stale_before, stale_after)
+
+    def _send(self, label, duration, before, after, stale_before, stale_after):
+        stale = []
+        for name, entry in sorted(stale_after.items()):
+            previous = stale_before.get(name, {})
+            count = entry["modules"] + entry["functions"] + entry["classes"]
+            previous_count = sum(
+                previous.get(kind, 0) for kind in ("modules", "functions", "classes")
+            )
+            stale.append({**entry, "count": count, "new": count - previous_count})
+        before = before.filter_traces(_snapshot_filters)
+        after = after.filter_traces(_snapshot_filters)
+        traced_before = sum(trace.size for trace in before.traces)
+        traced_after = sum(trace.size for trace in after.traces)
+        NvimRpc.get_instance().send(
+            {
+                "type": "memory_report",
+                "label": label,
+                "duration": duration,
+                "traced_before": traced_before,
+                "traced_after": traced_after,
+                "growth": top_growth(before, after),
+                "stale": stale,
+            }
+        )
+
+
+memory_tracker = MemoryTracker()
@@ -1,9 +1,25 @@
-from . import addon_update, script_runner, stop_blender
+from . import (
+    addon_update,
+    change_feed,
+    file_watcher,
+    memory,
+    output,
+    query,
+    script_runner,
+    stop_blender,
+    trace_stats,
+)
 
 modules = (
     addon_update,
+    change_feed,
+    file_watcher,
+    memory,
+    output,
+    query,
     script_runner,
     stop_blender,
+    trace_stats,
 )
 
 
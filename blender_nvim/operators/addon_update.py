@@ -1,10 +1,151 @@
-import sys
+import time
 import traceback
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 import bpy
 
+from ..memory import memory_tracker
+from ..output import log
+from ..profiling import parse_mode, profile
+from ..reload import (
+    SnapshotRestorer,
+    SubmoduleReattacher,
+    addon_module_names,
+    get_graph,
+    purge_modules,
+    take_snapshots,
+    track_addon,
+)
 from ..rpc import NvimRpc
-from ..utils import call_operator, in_blender, redraw_all
+from ..tracing import Trace, tracer
+from ..utils import in_blender, redraw_all
+
+# Reload requests arriving within this many seconds of the first pending one
+# are merged into a single batch.
+coalesce_delay = 0.03
+
+_pending_reloads: Dict[str, bool] = {}
+_pending_traces: List[Trace] = []
+_pending_profile: Optional[str] = None
+# Source files behind the pending reloads, when the file watcher requested them
+_pending_changes: Set[str] = set()
+_pending_since: Optional[float] = None
+# Whether the watcher lost track of which files changed
+_pending_overflow = False
+# Snapshots of addons that failed to re-enable, kept for the next reload
+_retained_snapshots: Dict[str, Dict[str, Any]] = {}
+
+
+def reload_addons(
+    addons: Dict[str, bool], profile_mode: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Reload several addons at once.
+
+    ``addons`` maps module names to whether they should be reloaded
+    incrementally. Every addon is disabled before any is re-enabled so that
+    addons depending on each other never see a half-reloaded sibling. With
+    ``profile_mode`` set, enabling each addon (importing its modules and calling
+    its ``register()``) is profiled.
+
+    Modules that define the snapshot and restore hooks (see ``reload``) keep
+    their state: it is taken before the addon is disabled and handed back to
+    the new module as soon as it is imported.
+    """
+    results: Dict[str, Dict[str, Any]] = {
+        name: {
+            "name": name,
+            "ok": True,
+            "duration": 0.0,
+            "reloaded_modules": 0,
+            "restored_modules": 0,
+        }
+        for name in addons
+    }
+    stale: Dict[str, List[str]] = {}
+    snapshots: Dict[str, Dict[str, Any]] = {}
+
+    for name, incremental in addons.items():
+        start = time.perf_counter()
+        graph = get_graph(name) if incremental else None
+        if graph is not None:
+            stale[name] = graph.modules_to_reload()
+        else:
+            stale[name] = addon_module_names(name)
+        # before unregister(), which may release what the snapshot keeps. The
+        # snapshots retained from a failed reload were taken while the addon
+        # still worked, so they win over the new ones.
+        snapshots[name] = {
+            **take_snapshots(stale[name]),
+            **_retained_snapshots.pop(name, {}),
+        }
+        try:
+            bpy.ops.preferences.addon_disable(module=name)
+        except Exception as e:
+            traceback.print_exc()
+            results[name].update(ok=False, stage="disable", error=str(e))
+            del stale[name]
+            if snapshots[name]:
+                # unregister() may have released part of the state already
+                _retained_snapshots[name] = snapshots.pop(name)
+        results[name]["duration"] += time.perf_counter() - start
+
+    for name, modules in stale.items():
+        purge_modules(modules)
+        results[name]["reloaded_modules"] = len(modules)
+
+    for name in stale:
+        start = time.perf_counter()
+        restorer = SnapshotRestorer(snapshots.get(name, {}))
+        # kept by an incremental reload, the modules that weren't purged
+        reattacher = SubmoduleReattacher(name)
+        try:
+            with profile(
+                f"enable {name}", profile_mode
+            ), restorer.installed(), reattacher.installed():
+                bpy.ops.preferences.addon_enable(module=name)
+        except Exception as e:
+            traceback.print_exc()
+            results[name].update(ok=False, stage="enable", error=str(e))
+            if restorer.states:
+                _retained_snapshots[name] = restorer.states
+        else:
+            if addons[name] or get_graph(name) is not None:
+                track_addon(name)
+        results[name]["restored_modules"] = len(restorer.restored)
+        results[name]["duration"] += time.perf_counter() - start
+
+    return list(results.values())
+
+
+# Changed files listed in a reload summary, the rest are only counted
+max_reported_changes = 50
+
+
+def send_reload_summary(
+    results: List[Dict[str, Any]],
+    duration: float,
+    changes: Optional[Set[str]] = None,
+    detected_at: Optional[float] = None,
+    traces: Optional[Iterable[Trace]] = None,
+    overflow: bool = False,
+):
+    message: Dict[str, Any] = {
+        "type": "addons_updated",
+        "addons": results,
+        "duration": duration,
+    }
+    if changes is not None:
+        message["changed"] = sorted(changes)[:max_reported_changes]
+        if overflow:
+            # more files changed than the watcher could tell
+            message["overflow"] = True
+        else:
+            message["changed_count"] = len(changes)
+    if detected_at is not None:
+        # from the watcher noticing the first change to the end of the reload,
+        # on the watcher's clock
+        message["latency"] = time.monotonic() - detected_at
+    NvimRpc.get_instance().send(message, traces=traces)
 
 
 class NVIM_OT_UpdateAddon(bpy.types.Operator):
@@ -13,39 +154,91 @@ class NVIM_OT_UpdateAddon(bpy.types.Operator):
 
     if in_blender():
         module_name: bpy.props.StringProperty()  # type: ignore
+        incremental: bpy.props.BoolProperty(default=False)  # type: ignore
     else:
         module_name: str
+        incremental: bool
 
     def execute(self, context):
-        try:
-            bpy.ops.preferences.addon_disable(module=self.module_name)
-        except Exception as e:
-            traceback.print_exc()
-            NvimRpc.get_instance().send({"type": "disable_failure", "message": str(e)})
-            return {"CANCELLED"}
-
-        for name in list(sys.modules.keys()):
-            if name.startswith(self.module_name):
-                del sys.modules[name]
-
-        try:
-            bpy.ops.preferences.addon_enable(module=self.module_name)
-        except Exception as e:
-            traceback.print_exc()
-            NvimRpc.get_instance().send({"type": "enable_failure", "message": str(e)})
-            return {"CANCELLED"}
-
-        NvimRpc.get_instance().send({"type": "addon_updated"})
-
+        start = time.perf_counter()
+        with memory_tracker.track(f"reload {self.module_name}", [self.module_name]):
+            results = reload_addons({self.module_name: self.incremental})
+        send_reload_summary(results, time.perf_counter() - start)
         redraw_all()
-        return {"FINISHED"}
+        return {"FINISHED"} if results[0]["ok"] else {"CANCELLED"}
+
+
+def flush_pending_reloads():
+    global _pending_profile, _pending_since, _pending_overflow
+    addons = dict(_pending_reloads)
+    traces = list(_pending_traces)
+    profile_mode = _pending_profile
+    changes = set(_pending_changes) if _pending_since is not None else None
+    detected_at = _pending_since
+    overflow = _pending_overflow
+    _pending_reloads.clear()
+    _pending_traces.clear()
+    _pending_changes.clear()
+    _pending_profile = None
+    _pending_since = None
+    _pending_overflow = False
+    if not addons:
+        return None
+    for trace in traces:
+        trace.mark("started")
+    start = time.perf_counter()
+    with memory_tracker.track(f"reload {', '.join(addons)}", addons):
+        results = reload_addons(addons, profile_mode)
+    redraw_all()
+    send_reload_summary(
+        results, time.perf_counter() - start, changes, detected_at, traces, overflow
+    )
+    for trace in traces:
+        tracer.finish(trace)
+    return None
+
+
+def queue_reload(
+    names: Iterable[str],
+    incremental: bool,
+    profile_mode: Optional[str] = None,
+    trace: Optional[Trace] = None,
+    changes: Optional[Iterable[str]] = None,
+    detected_at: Optional[float] = None,
+    overflow: bool = False,
+):
+    """Queue addons for the next batch of reloads, must run on the main thread"""
+    global _pending_profile, _pending_since, _pending_overflow
+    first = not _pending_reloads
+    for name in names:
+        # a full reload requested for the same addon wins over an incremental one
+        _pending_reloads[name] = _pending_reloads.get(name, True) and incremental
+    _pending_profile = profile_mode or _pending_profile
+    if trace is not None:
+        _pending_traces.append(trace)
+    if detected_at is not None:
+        _pending_changes.update(changes or ())
+        _pending_overflow = _pending_overflow or overflow
+        if _pending_since is None or detected_at < _pending_since:
+            _pending_since = detected_at
+    if bpy.app.background:
+        # timers never fire in background mode, merge the reloads that are
+        # already queued on the executor instead
+        if first:
+            NvimRpc.get_instance().schedule(flush_pending_reloads)
+    elif not bpy.app.timers.is_registered(flush_pending_reloads):
+        bpy.app.timers.register(flush_pending_reloads, first_interval=coalesce_delay)
 
 
 @NvimRpc.notification_handler("reload")
 def reload_addon_action(data):
-    print("reload_addon_action", data)
-    for name in data["names"]:
-        call_operator(NVIM_OT_UpdateAddon, module_name=name)
+    log("debug", "reload_addon_action", data)
+    queue_reload(
+        data["names"],
+        bool(data.get("incremental", False)),
+        parse_mode(data.get("profile")),
+        tracer.detach(),
+    )
 
 
 classes = (NVIM_OT_UpdateAddon,)
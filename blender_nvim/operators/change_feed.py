@@ -0,0 +1,22 @@
+from ..change_feed import change_feed
+from ..rpc import NvimRpc
+
+
+@NvimRpc.request_handler("subscribe_changes")
+def subscribe_changes_action(data=None):
+    data = data or {}
+    subscription_id = change_feed.subscribe(
+        id_types=data.get("id_types"),
+        interval=data.get("interval"),
+        properties=data.get("properties") or (),
+    )
+    return {"subscription": subscription_id}
+
+
+@NvimRpc.notification_handler("unsubscribe_changes")
+def unsubscribe_changes_action(data):
+    change_feed.unsubscribe(data["subscription"])
+
+
+def register():
+    pass
@@ -0,0 +1,82 @@
+import os
+import threading
+from typing import Dict, Optional, Set
+
+from ..file_watcher import FileWatcher, source_patterns
+from ..load_addons import path_mappings
+from ..output import log
+from ..rpc import NvimRpc
+from .addon_update import queue_reload
+
+_watcher: Optional[FileWatcher] = None
+_lock = threading.Lock()
+
+
+def _addon_sources() -> Dict[str, str]:
+    """Real path of each loaded addon's sources, mapped to its module name"""
+    return {
+        os.path.realpath(mapping["src"]): os.path.basename(mapping["load"])
+        for mapping in path_mappings
+    }
+
+
+def _on_change(sources: Dict[str, str], incremental: bool):
+    def on_change(changed: Optional[Set[str]], detected_at: float):
+        if changed is None:
+            log("warn", "Missed file changes, reloading every addon")
+            names = set(sources.values())
+        else:
+            names = {
+                name
+                for path in changed
+                for src, name in sources.items()
+                if path == src or path.startswith(src + os.sep)
+            }
+        if not names:
+            return
+        NvimRpc.get_instance().schedule(
+            lambda: queue_reload(
+                names,
+                incremental,
+                changes=changed or (),
+                detected_at=detected_at,
+                overflow=changed is None,
+            )
+        )
+
+    return on_change
+
+
+@NvimRpc.request_handler("watch_files", main_thread=False)
+def watch_files_action(data=None):
+    """Reload the loaded addons when their sources change"""
+    global _watcher
+    data = data or {}
+    sources = _addon_sources()
+    if not sources:
+        raise ValueError("No addons to watch")
+    watcher = FileWatcher(
+        list(sources),
+        _on_change(sources, bool(data.get("incremental", False))),
+        debounce=data.get("debounce"),
+        patterns=[*source_patterns, *(data.get("data_files") or ())],
+    )
+    with _lock:
+        if _watcher is not None:
+            _watcher.stop()
+        watcher.start()
+        _watcher = watcher
+    return {"backend": watcher.backend, "paths": watcher.roots}
+
+
+@NvimRpc.notification_handler("unwatch_files", main_thread=False)
+def unwatch_files_action(data=None):
+    global _watcher
+    with _lock:
+        if _watcher is not None:
+            _watcher.stop()
+            _watcher = None
+
+
+def register():
+    pass
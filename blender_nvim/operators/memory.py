@@ -0,0 +1,18 @@
+from ..memory import memory_tracker
+from ..rpc import NvimRpc
+
+
+@NvimRpc.request_handler("memory_tracking", main_thread=False)
+def memory_tracking_action(data=None):
+    """Start or stop tracking memory growth, return the tracking status"""
+    data = data or {}
+    enabled = data.get("enabled")
+    if enabled is True:
+        memory_tracker.enable(data.get("frames"))
+    elif enabled is False:
+        memory_tracker.disable()
+    return memory_tracker.status()
+
+
+def register():
+    pass
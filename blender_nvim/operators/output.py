@@ -0,0 +1,15 @@
+from ..output import output_sink
+from ..rpc import NvimRpc
+
+
+@NvimRpc.request_handler("log_level", main_thread=False)
+def log_level_action(data=None):
+    """Set the level of Blender.nvim's own log messages, return the current one"""
+    level = (data or {}).get("level")
+    if level is not None:
+        output_sink.set_level(level)
+    return {"level": output_sink.log_level}
+
+
+def register():
+    pass
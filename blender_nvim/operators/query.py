@@ -0,0 +1,13 @@
+from ..query import run_query
+from ..rpc import NvimRpc
+
+
+@NvimRpc.request_handler("query")
+def query_action(data):
+    result = run_query(data)
+    result["path"] = data.get("path", "")
+    return result
+
+
+def register():
+    pass
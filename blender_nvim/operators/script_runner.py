@@ -1,10 +1,22 @@
-import re
-import runpy
+import builtins
+import inspect
+import os
+import sys
+import textwrap
+import types
+from typing import Any, Dict, Optional
 
 import bpy
 
+from ..context_index import context_index
 from ..environment import version
+from ..load_addons import map_source_path
+from ..memory import memory_tracker
+from ..output import log, output_sink
+from ..profiling import parse_mode, profile
 from ..rpc import NvimRpc
+from ..script_cache import ScriptEntry, script_cache, source_lines
+from ..script_tasks import ScriptCancelled, script_tasks
 from ..utils import call_operator, in_blender, redraw_all
 
 
@@ -14,67 +26,134 @@ class NVIM_OT_RunScript(bpy.types.Operator):
 
     if in_blender():
         filepath: bpy.props.StringProperty()  # type: ignore
+        from_source: bpy.props.BoolProperty(default=False)  # type: ignore
+        profile: bpy.props.StringProperty()  # type: ignore
     else:
         filepath: str
+        from_source: bool
+        profile: str
 
     def execute(self, context):
-        ctx = prepare_script_context(self.filepath)
-        runpy.run_path(self.filepath, init_globals={"CTX": ctx})
+        if self.from_source:
+            entry = script_cache.get_cached_source(self.filepath)
+        else:
+            # validated with a stat call, the file was already read by the caller
+            entry = script_cache.get(self.filepath)
+        ctx = prepare_script_context(entry.directives)
+        label = f"run {os.path.basename(entry.path)}"
+        try:
+            with source_lines(entry), memory_tracker.track(label), profile(
+                label, self.profile or None
+            ), output_sink.source("script"), script_tasks.interruptible():
+                module_globals = run_code(
+                    entry.code, entry.path, init_globals={"CTX": ctx}
+                )
+        except ScriptCancelled:
+            log("info", f"Cancelled {entry.path}")
+            return {"CANCELLED"}
+        main = module_globals.get("main")
+        if inspect.isgeneratorfunction(main):
+            # the rest runs in time slices, see ScriptTasks
+            script_tasks.start(entry.path, main(), ctx)
         redraw_all()
         return {"FINISHED"}
 
 
-def prepare_script_context(filepath):
-    with open(filepath) as fs:
-        text = fs.read()
-
-    area_type = "VIEW_3D"
-    region_type = "WINDOW"
-
-    for line in text.splitlines():
-        match = re.match(r"^\s*#\s*context\.area\s*:\s*(\w+)", line, re.IGNORECASE)
-        if match:
-            area_type = match.group(1)
+def run_code(code: types.CodeType, filepath: str, init_globals: Dict[str, Any]):
+    """Execute ``code`` as ``__main__``, like ``runpy.run_path`` does"""
+    module = types.ModuleType("__main__")
+    module.__dict__.update(init_globals)
+    module.__dict__.update(
+        __file__=filepath,
+        __cached__=None,
+        __loader__=None,
+        __package__=None,
+        __spec__=None,
+        __builtins__=builtins,
+    )
+    saved_main = sys.modules.get("__main__")
+    saved_argv0 = sys.argv[0] if sys.argv else None
+    sys.modules["__main__"] = module
+    if sys.argv:
+        sys.argv[0] = filepath
+    try:
+        exec(code, module.__dict__)
+    finally:
+        if saved_main is not None:
+            sys.modules["__main__"] = saved_main
+        else:
+            sys.modules.pop("__main__", None)
+        if saved_argv0 is not None:
+            sys.argv[0] = saved_argv0
+    return module.__dict__.copy()
+
+
+def prepare_script_context(directives: Dict[str, str]):
+    window, area, region = context_index.resolve(
+        directives.get("window"), directives.get("area"), directives.get("region")
+    )
 
     context = {}
     context["window_manager"] = bpy.data.window_managers[0]
-    context["window"] = context["window_manager"].windows[0]
-    context["scene"] = context["window"].scene
-    context["view_layer"] = context["window"].view_layer
-    context["screen"] = context["window"].screen
-    context["workspace"] = context["window"].workspace
-    context["area"] = get_area_by_type(area_type)
-    context["region"] = (
-        get_region_in_area(context["area"], region_type) if context["area"] else None
-    )
+    if window is None:
+        return context
+    context["window"] = window
+    context["scene"] = window.scene
+    context["view_layer"] = window.view_layer
+    context["screen"] = window.screen
+    context["workspace"] = window.workspace
+    context["area"] = area
+    context["region"] = region
     return context
 
 
-def get_area_by_type(area_type):
-    for area in bpy.data.window_managers[0].windows[0].screen.areas:
-        if area.type == area_type:
-            return area
-    return None
-
+def run_entry(
+    entry: ScriptEntry, from_source: bool = False, profile: Optional[str] = None
+):
+    props = dict(filepath=entry.path, from_source=from_source, profile=profile or "")
+    if version < (4, 0, 0):
+        call_operator(NVIM_OT_RunScript, **props)
+        return
 
-def get_region_in_area(area, region_type):
-    for region in area.regions:
-        if region.type == region_type:
-            return region
-    return None
+    context = prepare_script_context(entry.directives)
+    with bpy.context.temp_override(**context):
+        call_operator(NVIM_OT_RunScript, **props)
 
 
 @NvimRpc.notification_handler("run")
 def run_script_action(data):
-    path = data["path"]
-    context = prepare_script_context(path)
+    run_entry(script_cache.get(data["path"]), profile=parse_mode(data.get("profile")))
 
-    if version < (4, 0, 0):
-        call_operator(NVIM_OT_RunScript, filepath=path)
-        return
 
-    with bpy.context.temp_override(**context):
-        call_operator(NVIM_OT_RunScript, filepath=path)
+@NvimRpc.notification_handler("run_source")
+def run_source_action(data):
+    source = data["source"]
+    first_line = int(data.get("first_line", 1))
+    if data.get("path"):
+        # compile under the path Blender loads the file from, so that debugpy
+        # breakpoints set through the DAP path mappings still hit
+        filename = map_source_path(data["path"])
+    else:
+        filename = f"<nvim:{data.get('name', 'buffer')}>"
+    if first_line > 1:
+        # a selection taken from inside an indented block
+        source = textwrap.dedent(source)
+    run_entry(
+        script_cache.get_source(filename, source, first_line),
+        from_source=True,
+        profile=parse_mode(data.get("profile")),
+    )
+
+
+@NvimRpc.notification_handler("cancel", main_thread=False)
+def cancel_action(data=None):
+    script_id = (data or {}).get("script")
+    script_tasks.cancel(int(script_id) if script_id is not None else None)
+
+
+@NvimRpc.request_handler("scripts", main_thread=False)
+def scripts_action(data=None):
+    return script_tasks.active()
 
 
 classes = (NVIM_OT_RunScript,)
@@ -83,3 +162,5 @@ classes = (NVIM_OT_RunScript,)
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    context_index.register()
+    script_tasks.register()
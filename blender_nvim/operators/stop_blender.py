@@ -1,10 +1,25 @@
 import bpy
 
 from ..rpc import NvimRpc
+from ..script_tasks import script_tasks
 
 
-@NvimRpc.notification_handler("stop")
+@NvimRpc.notification_handler("stop", main_thread=False)
 def stop_action(data):
+    # handled on the session thread, so that a script stuck on the main thread
+    # can be interrupted before the quit is queued behind it
+    script_tasks.cancel()
+    NvimRpc.get_instance().schedule(quit_blender)
+
+
+def quit_blender():
+    from .. import worker
+
+    NvimRpc.get_instance().flush()
+    if worker.is_worker():
+        # returning from the launcher script lets background Blender exit
+        worker.stop()
+        return
     bpy.ops.wm.quit_blender()
 
 
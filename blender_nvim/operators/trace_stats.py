@@ -0,0 +1,33 @@
+from ..rpc import NvimRpc
+from ..tracing import tracer
+
+
+@NvimRpc.request_handler("trace_stats", main_thread=False)
+def trace_stats_action(data=None):
+    return {
+        "handlers": tracer.stats(),
+        "executor": NvimRpc.get_instance().executor_stats(),
+    }
+
+
+@NvimRpc.notification_handler("trace_export", main_thread=False)
+def trace_export_action(data):
+    path = data["path"]
+    fmt = data.get("format", "chrome")
+    try:
+        count = tracer.export(path, fmt)
+    except OSError as e:
+        NvimRpc.get_instance().send({"type": "trace_export_failure", "message": str(e)})
+        return
+    NvimRpc.get_instance().send(
+        {"type": "trace_exported", "path": path, "format": fmt, "count": count}
+    )
+
+
+@NvimRpc.notification_handler("trace_reset", main_thread=False)
+def trace_reset_action(data=None):
+    tracer.reset()
+
+
+def register():
+    pass
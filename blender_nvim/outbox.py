@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+MergeKey = Optional[Callable[[Dict[str, Any]], Hashable]]
+# Opaque values attached to a message, handed to ``deliver`` with its batch
+Tags = Tuple[Any, ...]
+Deliver = Callable[[List[Any], Tags, Optional[threading.Event]], None]
+
+# Message types that may be dropped when the outbox is full. Types with a merge
+# key also replace any pending message of the same type and key, so only the
+# latest state is sent.
+_low_priority: Dict[str, MergeKey] = {}
+
+
+def register_low_priority(msg_type: str, merge_key: MergeKey = None):
+    _low_priority[msg_type] = merge_key
+
+
+class Outbox:
+    """Collects outgoing messages and delivers them to Neovim in batches.
+
+    A flusher thread waits for the first message, keeps collecting for
+    ``window`` seconds, then hands everything pending to ``deliver`` at once.
+    Memory is bounded by ``max_messages``: when full, low-priority messages are
+    dropped (newest first for incoming ones, oldest first for pending ones) and
+    the number of dropped messages is reported with the next batch.
+
+    Each message may carry tags, e.g. the traces of the requests it answers.
+    ``deliver`` receives the tags of the messages in the batch, including those
+    of messages that were merged into another or dropped since the last batch.
+    """
+
+    window = 0.005
+    max_messages = 1000
+
+    _deliver: Deliver
+    _messages: Deque[Tuple[Any, Tags]]
+    _cond: threading.Condition
+    _send_lock: threading.Lock
+    _dropped: int
+    _dropped_tags: List[Any]
+    _closed: bool
+
+    def __init__(self, deliver: Deliver):
+        self._deliver = deliver
+        self._messages = deque()
+        self._cond = threading.Condition()
+        # held while taking and handing off a batch, so batches stay in order
+        self._send_lock = threading.Lock()
+        self._dropped = 0
+        self._dropped_tags = []
+        self._closed = False
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def __len__(self):
+        return len(self._messages)
+
+    def put(self, message: Any, tags: Tags = ()):
+        msg_type = message.get("type") if isinstance(message, dict) else None
+        with self._cond:
+            if msg_type in _low_priority:
+                merge_key = _low_priority[msg_type]
+                if merge_key is not None and self._merge(
+                    msg_type, merge_key, message, tags
+                ):
+                    return
+                if len(self._messages) >= self.max_messages:
+                    self._dropped += 1
+                    self._dropped_tags.extend(tags)
+                    return
+            elif len(self._messages) >= self.max_messages:
+                self._drop_oldest_low_priority()
+            self._messages.append((message, tags))
+            self._cond.notify()
+
+    def _merge(
+        self, msg_type: str, merge_key: Callable, message: Dict[str, Any], tags: Tags
+    ):
+        key = merge_key(message)
+        for i, (pending, pending_tags) in enumerate(self._messages):
+            if (
+                isinstance(pending, dict)
+                and pending.get("type") == msg_type
+                and merge_key(pending) == key
+            ):
+                self._messages[i] = (message, pending_tags + tags)
+                return True
+        return False
+
+    def _drop_oldest_low_priority(self):
+        for i, (pending, tags) in enumerate(self._messages):
+            if isinstance(pending, dict) and pending.get("type") in _low_priority:
+                del self._messages[i]
+                self._dropped += 1
+                self._dropped_tags.extend(tags)
+                return
+
+    def _take(self) -> Tuple[List[Any], Tags]:
+        batch = [message for message, _ in self._messages]
+        tags = tuple(tag for _, message_tags in self._messages for tag in message_tags)
+        self._messages.clear()
+        if self._dropped:
+            batch.append({"type": "messages_dropped", "count": self._dropped})
+            tags += tuple(self._dropped_tags)
+            self._dropped = 0
+            self._dropped_tags = []
+        return batch, tags
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._messages and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            time.sleep(self.window)
+            with self._send_lock:
+                with self._cond:
+                    batch, tags = self._take()
+                if batch:
+                    self._deliver(batch, tags, None)
+
+    def flush(self, timeout: float = 1.0):
+        """Deliver everything pending now and wait until it has been written"""
+        done = threading.Event()
+        with self._send_lock:
+            with self._cond:
+                batch, tags = self._take()
+            if not batch:
+                return True
+            self._deliver(batch, tags, done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 1.0):
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        return flushed
@@ -0,0 +1,213 @@
+import atexit
+import io
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional, TextIO, Tuple
+
+from .outbox import register_low_priority
+
+# Dropped when Neovim can't keep up; the sink already bounds each message
+register_low_priority("output")
+
+levels = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+
+# (source, level, text)
+Piece = Tuple[str, str, str]
+
+
+class _Stream(io.TextIOBase):
+    """Stands in for sys.stdout or sys.stderr, writing to the sink"""
+
+    def __init__(self, sink: "OutputSink", original: TextIO, level: str):
+        self._sink = sink
+        self._original = original
+        self._level = level
+
+    @property
+    def encoding(self):  # type: ignore
+        return getattr(self._original, "encoding", None) or "utf-8"
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def fileno(self):
+        # faulthandler and subprocess write to the real file descriptor
+        return self._original.fileno()
+
+    def write(self, text: str):
+        self._sink.write(text, self._level)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class OutputSink:
+    """Captures Blender's stdout and stderr and streams it to Neovim.
+
+    Writes go to a ring buffer holding at most ``max_chars`` characters; past
+    that the oldest output is dropped and counted. A flusher thread sends what
+    was buffered every ``interval`` seconds as one ``output`` message, with
+    consecutive writes of the same source and level joined into one chunk.
+
+    Output is tagged with its source: ``script`` while a script runs,
+    ``internal`` for Blender.nvim's own log messages and ``addon`` for
+    everything else. Internal messages below ``log_level`` are skipped before
+    they are formatted.
+    """
+
+    interval = 0.05
+    max_chars = 64 * 1024
+    log_level = "info"
+
+    _pieces: Deque[Piece]
+    _size: int
+    _dropped: int
+    _originals: Optional[Tuple[TextIO, TextIO]]
+
+    def __init__(self):
+        self._pieces = deque()
+        self._size = 0
+        self._dropped = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._originals = None
+        self._closed = False
+
+    @property
+    def installed(self):
+        return self._originals is not None
+
+    def install(self):
+        """Redirect sys.stdout and sys.stderr to the sink"""
+        if self.installed:
+            return
+        self._originals = (sys.stdout, sys.stderr)
+        sys.stdout = _Stream(self, sys.stdout, "info")
+        sys.stderr = _Stream(self, sys.stderr, "error")
+        threading.Thread(
+            target=self._run, name="blender-nvim-output", daemon=True
+        ).start()
+        # runs before the RPC outbox is closed, which was registered earlier
+        atexit.register(self.close)
+
+    def close(self):
+        """Send what is buffered and restore the original streams"""
+        if self._originals is None:
+            return
+        self.flush()
+        sys.stdout, sys.stderr = self._originals
+        self._originals = None
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def set_level(self, level: str):
+        if level not in levels:
+            raise ValueError(f"Unknown log level {level!r}")
+        self.log_level = level
+
+    def is_enabled(self, level: str):
+        return levels[level] >= levels[self.log_level]
+
+    def current_source(self):
+        return getattr(self._local, "source", "addon")
+
+    @contextmanager
+    def source(self, name: str):
+        """Attribute output written by this thread to ``name``"""
+        previous = self.current_source()
+        self._local.source = name
+        try:
+            yield
+        finally:
+            self._local.source = previous
+
+    def write(self, text: str, level: str, source: Optional[str] = None):
+        if not text:
+            return
+        if source is None:
+            source = self.current_source()
+        with self._cond:
+            if len(text) > self.max_chars:
+                self._dropped += len(text) - self.max_chars
+                text = text[-self.max_chars :]
+            self._pieces.append((source, level, text))
+            self._size += len(text)
+            while self._size > self.max_chars:
+                dropped = self._pieces.popleft()[2]
+                self._size -= len(dropped)
+                self._dropped += len(dropped)
+            if len(self._pieces) == 1:
+                self._cond.notify()
+
+    def log(self, level: str, *args: Any):
+        if not self.is_enabled(level):
+            return
+        message = " ".join(map(str, args))
+        text = f"[Blender.nvim] {level.upper()}: {message}\n"
+        if self.installed:
+            self.write(text, level, "internal")
+        else:
+            print(text, end="")
+
+    def _take(self) -> Tuple[List[Dict[str, str]], int]:
+        with self._cond:
+            pieces = list(self._pieces)
+            dropped = self._dropped
+            self._pieces.clear()
+            self._size = 0
+            self._dropped = 0
+        chunks: List[Dict[str, str]] = []
+        parts: List[str] = []
+        for i, (source, level, text) in enumerate(pieces):
+            parts.append(text)
+            following = pieces[i + 1] if i + 1 < len(pieces) else None
+            if following is None or following[:2] != (source, level):
+                text = "".join(parts)
+                chunks.append({"source": source, "level": level, "text": text})
+                parts = []
+        return chunks, dropped
+
+    def flush(self):
+        chunks, dropped = self._take()
+        if not chunks and not dropped:
+            return
+        from .rpc import NvimRpc
+
+        rpc = NvimRpc.get_instance_safe()
+        if rpc is not None:
+            rpc.send({"type": "output", "chunks": chunks, "dropped": dropped})
+        elif self._originals is not None:
+            for chunk in chunks:
+                stdout, stderr = self._originals
+                stream = stderr if chunk["level"] == "error" else stdout
+                stream.write(chunk["text"])
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pieces and not self._dropped and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            time.sleep(self.interval)
+            self.flush()
+
+
+output_sink = OutputSink()
+
+
+def log(level: str, *args: Any):
+    """Log an internal message, unless ``level`` is below the log level"""
+    output_sink.log(level, *args)
+
+
+def is_enabled(level: str):
+    return output_sink.is_enabled(level)
@@ -0,0 +1,149 @@
+import ast
+import compileall
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+# Modules that are only safe to import on Blender's main thread
+blender_modules = {
+    "addon_utils",
+    "aud",
+    "bgl",
+    "blf",
+    "bmesh",
+    "bpy",
+    "bpy_extras",
+    "bpy_types",
+    "freestyle",
+    "gpu",
+    "gpu_extras",
+    "idprop",
+    "imbuf",
+    "mathutils",
+    "nodeitems_utils",
+    "rna_prop_ui",
+}
+
+
+def is_blender_module(name: str):
+    root = name.partition(".")[0]
+    return root in blender_modules or root.startswith("bl_")
+
+
+def module_level_imports(source: bytes):
+    """Absolute imports executed when the module is imported.
+
+    Imports inside functions are left out, they are often deferred on purpose.
+    """
+    found: Set[str] = set()
+    pending: List[ast.AST] = [ast.parse(source)]
+    while pending:
+        node = pending.pop()
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                continue
+            if isinstance(child, ast.Import):
+                found.update(alias.name for alias in child.names)
+            elif isinstance(child, ast.ImportFrom):
+                if not child.level and child.module:
+                    found.add(child.module)
+            else:
+                pending.append(child)
+    return found
+
+
+def external_imports(load_path: Path, skip: Set[str]):
+    """Modules outside of Blender and the addons being loaded that an addon imports"""
+    if load_path.is_dir():
+        files = [
+            Path(root, name)
+            for root, dirs, names in os.walk(load_path)
+            if "__pycache__" not in Path(root).parts
+            for name in names
+            if name.endswith(".py")
+        ]
+    else:
+        files = [load_path]
+    found: Set[str] = set()
+    for path in files:
+        try:
+            found |= module_level_imports(path.read_bytes())
+        except (OSError, SyntaxError, ValueError):
+            continue
+    return {
+        name
+        for name in found
+        if not is_blender_module(name) and name.partition(".")[0] not in skip
+    }
+
+
+def prewarm_addon(load_path: Path, skip: Set[str]) -> Dict[str, Any]:
+    """Write the addon's bytecode caches and import its external dependencies"""
+    start = time.perf_counter()
+    if load_path.is_dir():
+        compileall.compile_dir(str(load_path), quiet=1)
+    else:
+        compileall.compile_file(str(load_path), quiet=1)
+    compile_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    imported, failed = [], []
+    for name in sorted(external_imports(load_path, skip)):
+        if name in sys.modules:
+            continue
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # left for the addon to report when it is enabled
+            failed.append(name)
+        else:
+            imported.append(name)
+    return {
+        "compile": compile_duration,
+        "imports": time.perf_counter() - start,
+        "imported": imported,
+        "failed": failed,
+    }
+
+
+class Prewarm:
+    """Prepares addons in a thread pool so that enabling them is mostly cached.
+
+    Registration with bpy has to happen on the main thread, but compiling an
+    addon's modules and importing its pure-Python dependencies does not. Both
+    run in the background from the moment the prewarm starts, and ``wait`` is
+    called right before each addon is enabled.
+    """
+
+    _futures: Dict[str, "Future[Dict[str, Any]]"]
+
+    def __init__(self, addons: Iterable[Tuple[Path, str]], max_workers: int = 4):
+        addons = list(addons)
+        skip = {module_name for _, module_name in addons}
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(addons))),
+            thread_name_prefix="blender-nvim-prewarm",
+        )
+        self._futures = {
+            module_name: pool.submit(prewarm_addon, load_path, skip)
+            for load_path, module_name in addons
+        }
+        # the workers exit once the queued addons are done
+        pool.shutdown(wait=False)
+
+    def wait(self, module_name: str) -> Dict[str, Any]:
+        """Block until the addon is prewarmed and return its timings"""
+        future = self._futures.get(module_name)
+        if future is None:
+            return {}
+        start = time.perf_counter()
+        try:
+            result = dict(future.result())
+        except Exception as e:
+            result = {"error": str(e)}
+        result["wait"] = time.perf_counter() - start
+        return result
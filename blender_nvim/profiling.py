@@ -0,0 +1,175 @@
+import cProfile
+import itertools
+import marshal
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from .load_addons import map_load_path
+from .rpc import NvimRpc
+
+FuncKey = Tuple[str, int, str]
+# the dict format used by cProfile and pstats:
+# (file, line, name) -> (primitive calls, calls, self time, cumulative time, callers)
+Stats = Dict[FuncKey, Tuple[int, int, float, float, Dict]]
+
+profile_dir = os.path.join(tempfile.gettempdir(), "blender-nvim-profiles")
+
+# number of functions, by self time, sent back to Neovim
+max_functions = 30
+
+
+class SamplingProfiler:
+    """Samples the call stack of one thread from a background thread.
+
+    Much cheaper than cProfile for code that makes many small calls, at the cost
+    of precision: the sampler needs the GIL, so samples are at most one switch
+    interval apart while the profiled thread is busy. Times are estimated by
+    spreading the measured duration evenly over the samples.
+    """
+
+    interval = 0.001
+
+    def __init__(self, thread_id: Optional[int] = None):
+        self._thread_id = threading.get_ident() if thread_id is None else thread_id
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._self: Counter = Counter()
+        self._cumulative: Counter = Counter()
+        self.samples = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            code = frame.f_code
+            self._self[(code.co_filename, code.co_firstlineno, code.co_name)] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                # count recursive functions once per sample
+                if key not in seen:
+                    seen.add(key)
+                    self._cumulative[key] += 1
+                frame = frame.f_back
+
+    def stats(self, duration: float) -> Stats:
+        per_sample = duration / self.samples if self.samples else 0.0
+        return {
+            key: (count, count, self._self[key] * per_sample, count * per_sample, {})
+            for key, count in self._cumulative.items()
+        }
+
+
+def parse_mode(value: Any) -> Optional[str]:
+    """The profiler requested by the ``profile`` field of a message"""
+    if not value:
+        return None
+    return "sample" if value == "sample" else "cprofile"
+
+
+def save_stats(label: str, stats: Stats) -> str:
+    """Write ``stats`` in the format read by ``pstats.Stats`` and snakeviz"""
+    os.makedirs(profile_dir, exist_ok=True)
+    name = re.sub(r"[^\w.-]+", "_", label).strip("_")
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    stamp += f".{int(now * 1000) % 1000:03d}"
+    # profiles of one batch of reloads can share a label and a millisecond
+    for attempt in itertools.count():
+        suffix = f"-{attempt}" if attempt else ""
+        path = os.path.join(profile_dir, f"{name}-{stamp}{suffix}.pstats")
+        try:
+            fs = open(path, "xb")
+        except FileExistsError:
+            continue
+        with fs:
+            marshal.dump(stats, fs)
+        return path
+    raise AssertionError("unreachable")
+
+
+def hot_functions(stats: Stats):
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[
+        :max_functions
+    ]
+    return [
+        {
+            "name": name,
+            "file": map_load_path(filename),
+            "line": line,
+            "calls": calls,
+            "self": self_time,
+            "cumulative": cumulative,
+        }
+        for (filename, line, name), (_, calls, self_time, cumulative, _) in ranked
+    ]
+
+
+def send_result(label: str, mode: str, duration: float, stats: Stats):
+    try:
+        path = save_stats(label, stats)
+    except OSError:
+        traceback.print_exc()
+        path = None
+    NvimRpc.get_instance().send(
+        {
+            "type": "profile_result",
+            "label": label,
+            "mode": mode,
+            "duration": duration,
+            "path": path,
+            "functions": hot_functions(stats),
+        }
+    )
+
+
+@contextmanager
+def profile(label: str, mode: Optional[str]):
+    """Profile the body with ``mode`` ("cprofile" or "sample"), or not at all.
+
+    The hottest functions are sent to Neovim as a ``profile_result`` message and
+    the full statistics are saved as a .pstats file.
+    """
+    if mode is None:
+        yield
+        return
+    profiler: Any
+    if mode == "sample":
+        profiler = SamplingProfiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if mode == "sample":
+            profiler.stop()
+            stats = profiler.stats(duration)
+        else:
+            profiler.disable()
+            profiler.create_stats()
+            stats = profiler.stats
+        send_result(label, mode, duration, stats)
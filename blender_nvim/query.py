@@ -0,0 +1,229 @@
+import fnmatch
+import itertools
+import operator
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import bpy
+
+# an identifier, or a subscript with a quoted key or an integer index
+_segment_re = re.compile(
+    r"""\s*(?:
+        \.?(?P<attr>[A-Za-z]\w*)
+      | \[\s*(?:
+            "(?P<dq>(?:[^"\\]|\\.)*)"
+          | '(?P<sq>(?:[^'\\]|\\.)*)'
+          | (?P<index>-?\d+)
+        )\s*\]
+    )""",
+    re.VERBOSE,
+)
+
+Segment = Union[Tuple[str, str], Tuple[str, int]]
+
+max_limit = 10000
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_path(path: str) -> List[Segment]:
+    """Split a data path like ``scenes["Scene"].objects`` into its segments.
+
+    Only attribute access and subscripts are allowed, nothing is evaluated, and
+    private attributes (starting with an underscore) can't be reached.
+    """
+    segments: List[Segment] = []
+    pos = 0
+    path = path.strip()
+    while pos < len(path):
+        match = _segment_re.match(path, pos)
+        if match is None or match.end() == pos:
+            raise QueryError(f"Invalid data path at {path[pos:]!r}")
+        if match.group("attr") is not None:
+            segments.append(("attr", match.group("attr")))
+        elif match.group("index") is not None:
+            segments.append(("index", int(match.group("index"))))
+        else:
+            key = match.group("dq")
+            if key is None:
+                key = match.group("sq")
+            segments.append(("key", re.sub(r"\\(.)", r"\1", key)))
+        pos = match.end()
+    return segments
+
+
+_missing = object()
+
+
+def resolve(value: Any, segments: List[Segment], default: Any = _missing):
+    for kind, name in segments:
+        try:
+            if kind == "attr":
+                value = getattr(value, name)  # type: ignore
+            else:
+                value = value[name]
+        except (AttributeError, KeyError, IndexError, TypeError):
+            if default is not _missing:
+                return default
+            raise QueryError(f"Could not resolve {kind} {name!r}")
+        if callable(value) and not hasattr(value, "__len__"):
+            raise QueryError(f"{name!r} is a method, not a property")
+    return value
+
+
+def _contains(a, b):
+    return a is not None and b in a
+
+
+def _glob(a, b):
+    return isinstance(a, str) and fnmatch.fnmatchcase(a, b)
+
+
+def _startswith(a, b):
+    return isinstance(a, str) and a.startswith(b)
+
+
+def _endswith(a, b):
+    return isinstance(a, str) and a.endswith(b)
+
+
+def _in(a, b):
+    return a in b
+
+
+_operators: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": _in,
+    "contains": _contains,
+    "startswith": _startswith,
+    "endswith": _endswith,
+    "glob": _glob,
+}
+
+
+def compile_filters(filters: Iterable[List[Any]]):
+    """Build a predicate from ``[field, op, value]`` triples, all must match"""
+    checks = []
+    for spec in filters:
+        if len(spec) != 3:
+            raise QueryError(f"Filters are [field, op, value] triples, got {spec!r}")
+        field, op, expected = spec
+        if op not in _operators:
+            raise QueryError(f"Unknown filter operator {op!r}")
+        checks.append((parse_path(field), _operators[op], expected))
+
+    def predicate(item):
+        for segments, compare, expected in checks:
+            value = to_msgpack(resolve(item, segments, None))
+            try:
+                if not compare(value, expected):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    return predicate
+
+
+def to_msgpack(value: Any, depth: int = 0):
+    """Convert a bpy value to something msgpack can send"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, bpy.types.ID):
+        return {"id_type": type(value).__name__, "name": value.name}
+    if isinstance(value, bpy.types.bpy_prop_collection):
+        return {"len": len(value)}
+    if isinstance(value, bpy.types.bpy_struct):
+        return {
+            "type": type(value).__name__,
+            "name": getattr(value, "name", None),
+        }
+    if depth < 2:
+        # vectors, matrices, colors and property arrays
+        try:
+            return [to_msgpack(v, depth + 1) for v in value]
+        except TypeError:
+            pass
+    return str(value)
+
+
+def _sort_key(value):
+    if isinstance(value, dict):
+        # pointers sort by the name of what they point to, collections by size
+        value = value.get("name", value.get("len"))
+    # None sorts first and values of different types don't compare
+    return (value is not None, type(value).__name__, value)
+
+
+def run_query(params: Dict[str, Any]):
+    """Select, filter, project and paginate items of a collection in bpy.data.
+
+    ``params``:
+        path: data path of a collection relative to ``bpy.data``, e.g.
+            ``objects`` or ``scenes["Scene"].view_layers``
+        filter: list of ``[field, op, value]``, fields are data paths relative
+            to each item
+        fields: data paths to return for each item (default: ``["name"]``)
+        order_by: field to sort by, prefixed with ``-`` for descending; this
+            has to look at every matching item
+        offset, limit: the page to return
+        count: also count every matching item
+    """
+    collection = resolve(bpy.data, parse_path(params.get("path", "")))
+    predicate = compile_filters(params.get("filter") or [])
+    fields = [(field, parse_path(field)) for field in params.get("fields") or ["name"]]
+    offset = max(0, int(params.get("offset", 0)))
+    limit = min(max(0, int(params.get("limit", 100))), max_limit)
+    order_by: Optional[str] = params.get("order_by")
+    count = bool(params.get("count", False))
+
+    try:
+        items: Iterable[Any] = iter(collection)
+    except TypeError:
+        raise QueryError(f"{params.get('path')!r} is not a collection")
+    matches = filter(predicate, items) if params.get("filter") else items
+
+    total = None
+    if order_by:
+        descending = order_by.startswith("-")
+        key_path = parse_path(order_by.lstrip("-"))
+        ordered = sorted(
+            matches,
+            key=lambda item: _sort_key(to_msgpack(resolve(item, key_path, None))),
+            reverse=descending,
+        )
+        total = len(ordered)
+        page = ordered[offset : offset + limit]
+        has_more = offset + limit < total
+    else:
+        # stop scanning as soon as the page is full, unless counting
+        skipped = sum(1 for _ in itertools.islice(matches, offset))
+        page = list(itertools.islice(matches, limit + 1))
+        has_more = len(page) > limit
+        if count:
+            total = skipped + len(page) + sum(1 for _ in matches)
+        page = page[:limit]
+
+    result = {
+        "items": [
+            {
+                field: to_msgpack(resolve(item, segments, None))
+                for field, segments in fields
+            }
+            for item in page
+        ],
+        "offset": offset,
+        "next_offset": offset + limit if has_more else None,
+    }
+    if count or order_by:
+        result["total"] = total
+    return result
@@ -0,0 +1,366 @@
+import ast
+import hashlib
+import importlib.abc
+import os
+import sys
+import traceback
+from contextlib import contextmanager
+from typing import Any, Container, Dict, Iterable, List, Optional, Set
+
+from .output import log
+
+# Optional module-level functions of an addon module that keep its state across
+# a reload: the snapshot hook returns any object, which is handed to the restore
+# hook of the re-imported module.
+snapshot_hook = "__blender_nvim_snapshot__"
+restore_hook = "__blender_nvim_restore__"
+
+
+def is_addon_module(name: str, package: str):
+    return name == package or name.startswith(package + ".")
+
+
+def addon_module_names(package: str):
+    return [name for name in list(sys.modules) if is_addon_module(name, package)]
+
+
+def purge_modules(names: Iterable[str]):
+    for name in names:
+        sys.modules.pop(name, None)
+
+
+def take_snapshots(names: Iterable[str]) -> Dict[str, Any]:
+    """Call the snapshot hook of each loaded module that has one"""
+    states = {}
+    for name in names:
+        hook = getattr(sys.modules.get(name), snapshot_hook, None)
+        if not callable(hook):
+            continue
+        try:
+            states[name] = hook()
+        except Exception:
+            log("error", f"{name}.{snapshot_hook} failed")
+            traceback.print_exc()
+    return states
+
+
+class _HookedLoader:
+    """Calls ``before`` and ``after`` around running a module's body"""
+
+    def __init__(self, loader, before=None, after=None):
+        self._loader = loader
+        self._before = before
+        self._after = after
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        if self._before is not None:
+            self._before(module)
+        self._loader.exec_module(module)
+        if self._after is not None:
+            self._after(module)
+
+
+def _find_hooked_spec(skip, fullname, path, target, before=None, after=None):
+    """Find a spec with the other finders and hook its loader"""
+    for finder in sys.meta_path:
+        if finder is skip or not hasattr(finder, "find_spec"):
+            continue
+        spec = finder.find_spec(fullname, path, target)
+        if spec is not None:
+            break
+    else:
+        return None
+    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+        spec.loader = _HookedLoader(spec.loader, before, after)
+    return spec
+
+
+class SnapshotRestorer(importlib.abc.MetaPathFinder):
+    """Hands snapshots to modules as they are re-imported.
+
+    While installed on ``sys.meta_path``, it wraps the loader of each module
+    that has a pending snapshot, so the restore hook runs right after the
+    module is executed. That is before the addon's ``register()`` is called,
+    which can then skip rebuilding whatever was restored.
+    """
+
+    states: Dict[str, Any]
+    restored: List[str]
+
+    def __init__(self, states: Dict[str, Any]):
+        self.states = dict(states)
+        self.restored = []
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self.states:
+            return None
+        return _find_hooked_spec(self, fullname, path, target, after=self._restore)
+
+    def _restore(self, module):
+        state = self.states.pop(module.__name__, None)
+        hook = getattr(module, restore_hook, None)
+        if not callable(hook):
+            return
+        try:
+            hook(state)
+        except Exception:
+            log("error", f"{module.__name__}.{restore_hook} failed")
+            traceback.print_exc()
+        else:
+            self.restored.append(module.__name__)
+
+    @contextmanager
+    def installed(self):
+        if not self.states:
+            yield self
+            return
+        sys.meta_path.insert(0, self)
+        try:
+            yield self
+        finally:
+            sys.meta_path.remove(self)
+
+
+class SubmoduleReattacher(importlib.abc.MetaPathFinder):
+    """Sets the submodules kept by a partial reload on their re-imported parent.
+
+    Importing a submodule makes it an attribute of its package, so a package
+    re-imported while its submodules stay loaded would lack them and
+    ``package.sub`` would fail. They are set before the package's body runs,
+    so that the body and ``register()`` find them as before.
+    """
+
+    children: Dict[str, Dict[str, Any]]
+
+    def __init__(self, package: str):
+        self.children = {}
+        for name in addon_module_names(package):
+            parent, _, child = name.rpartition(".")
+            if parent:
+                self.children.setdefault(parent, {})[child] = sys.modules[name]
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self.children or fullname in sys.modules:
+            return None
+        return _find_hooked_spec(self, fullname, path, target, before=self._attach)
+
+    def _attach(self, module):
+        for child, submodule in self.children[module.__name__].items():
+            setattr(module, child, submodule)
+
+    @contextmanager
+    def installed(self):
+        if not self.children:
+            yield self
+            return
+        sys.meta_path.insert(0, self)
+        try:
+            yield self
+        finally:
+            sys.meta_path.remove(self)
+
+
+def file_digest(data: bytes):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def find_imports(
+    module_name: str,
+    is_package: bool,
+    source: bytes,
+    package: str,
+    modules: Optional[Container[str]] = None,
+):
+    """Return the names of modules inside ``package`` that ``source`` imports.
+
+    ``from a import b`` only binds ``a.b``: when that is one of ``modules`` it
+    is the submodule, and ``a`` is not a dependency. Otherwise ``b`` may be
+    anything defined by ``a``, so both are.
+    """
+    tree = ast.parse(source)
+    own_package = module_name if is_package else module_name.rpartition(".")[0]
+    found: Set[str] = set()
+
+    def add(name: str):
+        if is_addon_module(name, package):
+            found.add(name)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    add(alias.name)
+                    continue
+                # ``import a.b.c`` binds ``a`` and reaches c through a and a.b
+                parts = alias.name.split(".")
+                for i in range(1, len(parts) + 1):
+                    add(".".join(parts[:i]))
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = own_package.split(".")
+                if node.level > 1:
+                    parts = parts[: -(node.level - 1)]
+                base = ".".join(parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if not base:
+                continue
+            for alias in node.names:
+                if alias.name == "*":
+                    add(base)
+                    continue
+                name = f"{base}.{alias.name}"
+                add(name)
+                if modules is None or name not in modules:
+                    add(base)
+    found.discard(module_name)
+    return found
+
+
+class ModuleRecord:
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+    imports: Set[str]
+
+    def __init__(self, path, mtime_ns, size, digest, imports):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.imports = imports
+
+
+class AddonGraph:
+    """Tracks the source files and import graph of one addon's modules"""
+
+    package: str
+    records: Dict[str, ModuleRecord]
+
+    def __init__(self, package: str):
+        self.package = package
+        self.records = {}
+
+    def _read_record(
+        self, name: str, path: str, modules: Container[str]
+    ) -> Optional[ModuleRecord]:
+        try:
+            st = os.stat(path)
+            with open(path, "rb") as fs:
+                data = fs.read()
+        except OSError:
+            return None
+        is_package = os.path.basename(path) == "__init__.py"
+        try:
+            imports = find_imports(name, is_package, data, self.package, modules)
+        except SyntaxError:
+            imports = set()
+        return ModuleRecord(
+            path, st.st_mtime_ns, st.st_size, file_digest(data), imports
+        )
+
+    def snapshot(self):
+        """Record the current state of every loaded module of the addon"""
+        records = {}
+        modules = set(addon_module_names(self.package))
+        for name in modules:
+            path = getattr(sys.modules[name], "__file__", None)
+            if not path or not path.endswith(".py"):
+                continue
+            previous = self.records.get(name)
+            if (
+                previous is not None
+                and previous.path == path
+                and not self._is_stale(previous)
+            ):
+                records[name] = previous
+                continue
+            record = self._read_record(name, path, modules)
+            if record is not None:
+                records[name] = record
+        self.records = records
+
+    def _is_stale(self, record: ModuleRecord):
+        try:
+            st = os.stat(record.path)
+        except OSError:
+            return True
+        return st.st_mtime_ns != record.mtime_ns or st.st_size != record.size
+
+    def changed_modules(self) -> Set[str]:
+        changed = set()
+        for name, record in self.records.items():
+            if not self._is_stale(record):
+                continue
+            try:
+                with open(record.path, "rb") as fs:
+                    digest = file_digest(fs.read())
+                st = os.stat(record.path)
+            except OSError:
+                changed.add(name)
+                continue
+            if digest == record.digest:
+                # touched but identical, e.g. after a git checkout
+                record.mtime_ns = st.st_mtime_ns
+                record.size = st.st_size
+                continue
+            changed.add(name)
+        return changed
+
+    def dependents(self, names: Set[str]) -> Set[str]:
+        reverse: Dict[str, Set[str]] = {}
+        for name, record in self.records.items():
+            for dep in record.imports:
+                reverse.setdefault(dep, set()).add(name)
+        result = set(names)
+        pending = list(names)
+        while pending:
+            for dependent in reverse.get(pending.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    pending.append(dependent)
+        return result
+
+    def modules_to_reload(self) -> List[str]:
+        """Return the loaded modules that must be re-imported.
+
+        Only ``import`` statements are edges of the graph. Submodules imported
+        with ``importlib.import_module``, as auto_load does, have none, so the
+        package itself is re-imported whenever anything is: otherwise enabling
+        the addon would call the old package's ``register()``. Loaded modules
+        that the graph doesn't know are re-imported as well.
+        """
+        loaded = set(addon_module_names(self.package))
+        stale = self.dependents(self.changed_modules())
+        stale |= loaded - set(self.records)
+        if stale:
+            stale.add(self.package)
+        return sorted(stale & loaded)
+
+
+_graphs: Dict[str, AddonGraph] = {}
+
+
+def get_graph(package: str) -> Optional[AddonGraph]:
+    return _graphs.get(package)
+
+
+def track_addon(package: str):
+    """Record the addon's modules as the baseline of its next incremental reload.
+
+    Reading and parsing every module takes a while, so this is only done for
+    addons that are reloaded incrementally, starting with their first
+    incremental reload (a full one, as nothing was recorded before).
+    """
+    graph = _graphs.get(package)
+    if graph is None:
+        graph = _graphs[package] = AddonGraph(package)
+    graph.snapshot()
+    return graph
@@ -1,12 +1,18 @@
-import queue
+import atexit
 import threading
-import traceback
-from typing import Any, Callable, Dict, List, Literal, Optional
+from concurrent import futures
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Tuple
 
-import bpy
+import greenlet
 import pynvim
 from pynvim.msgpack_rpc.event_loop import base as pynvim_event_loop_base
 
+from .executor import MainThreadExecutor
+from .outbox import Outbox
+from .output import is_enabled, log
+from .tracing import Trace, tracer
+
 # override default interrupt handler to avoid error when running in Blender
 # in background mode
 # SEE: https://github.com/neovim/pynvim/issues/264
@@ -18,8 +24,12 @@ class NvimRpc:
 
     # --- Class --- #
     _instance: Optional["NvimRpc"] = None
-    _request_handlers: Dict[str, Callable[["NvimRpc", List[Any]], None]] = {}
-    _notification_handlers: Dict[str, Callable[["NvimRpc", List[Any]], None]] = {}
+    _request_handlers: Dict[
+        str, Callable[["NvimRpc", List[Any], Optional[Trace]], Any]
+    ] = {}
+    _notification_handlers: Dict[
+        str, Callable[["NvimRpc", List[Any], Optional[Trace]], Any]
+    ] = {}
 
     @classmethod
     def initialize(
@@ -28,6 +38,8 @@ class NvimRpc:
         if cls._instance is not None:
             raise ValueError("NvimRpc instance is already initialized")
         cls._instance = cls(sock, on_setup)
+        # the session thread is a daemon, but is still alive while atexit runs
+        atexit.register(cls._instance.close)
         return cls._instance
 
     @classmethod
@@ -45,14 +57,32 @@ class NvimRpc:
         cls,
         kind: Literal["request", "notification"],
         name: str,
-        handler: Callable[[List[Any]], None],
+        handler: Callable[..., Any],
         main_thread: bool = True,
     ):
-        def wrapper(self, args):
+        def run(args, trace):
+            if trace is not None:
+                trace.mark("dequeued" if main_thread else "started")
+            try:
+                with tracer.activate(trace):
+                    return handler(*args)
+            finally:
+                if trace is not None and not trace.detached:
+                    tracer.finish(trace)
+
+        def wrapper(self, args, trace=None):
+            if kind == "notification":
+                if main_thread:
+                    self.schedule(lambda: run(args, trace))
+                else:
+                    run(args, trace)
+                return None
             if main_thread:
-                self.schedule(lambda: handler(*args))
+                future = self.submit_main_thread(lambda: run(args, trace))
             else:
-                handler(*args)
+                future = self._workers.submit(run, args, trace)
+            # the session keeps serving other messages until the result is ready
+            return self.wait(future)
 
         registry = (
             cls._request_handlers if kind == "request" else cls._notification_handlers
@@ -61,7 +91,7 @@ class NvimRpc:
 
     @classmethod
     def request_handler(cls, name: str, main_thread: bool = True):
-        def decorator(handler: Callable[[List[Any]], None]):
+        def decorator(handler: Callable[..., Any]):
             cls._register_handler("request", name, handler, main_thread)
             return handler
 
@@ -69,7 +99,7 @@ class NvimRpc:
 
     @classmethod
     def notification_handler(cls, name: str, main_thread: bool = True):
-        def decorator(handler: Callable[[List[Any]], None]):
+        def decorator(handler: Callable[..., Any]):
             cls._register_handler("notification", name, handler, main_thread)
             return handler
 
@@ -80,9 +110,16 @@ class NvimRpc:
     nvim: pynvim.Nvim
     _main_thread: threading.Thread
     _session_thread: Optional[threading.Thread]
-    _execution_queue: queue.Queue
+    _executor: MainThreadExecutor
+    _outbox: Outbox
     _on_setup_cb: Optional[Callable[["NvimRpc"], None]]
-    _executor_started: bool
+    _workers: ThreadPoolExecutor
+    # identifies this Blender to Neovim, which may drive several at once
+    session_id: Optional[int] = None
+    # seconds a request waits for its handler before failing
+    request_timeout: float = 30.0
+    # threads running request handlers registered with main_thread=False
+    max_workers: int = 4
 
     def __init__(
         self, sock: str, on_setup: Optional[Callable[["NvimRpc"], None]] = None
@@ -93,29 +130,91 @@ class NvimRpc:
         self.nvim = pynvim.attach("socket", path=sock)
         self._main_thread = threading.current_thread()
         self._session_thread = None
-        self._execution_queue = queue.Queue()
+        self._executor = MainThreadExecutor()
+        self._outbox = Outbox(self._deliver)
+        self._workers = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="blender-nvim-rpc"
+        )
         self._on_setup_cb = on_setup
-        self._executor_started = False
 
     def schedule(self, func: Callable[[], None]):
-        self._execution_queue.put(func)
+        self._executor.submit(func)
+
+    def submit_main_thread(self, func: Callable[[], Any]) -> "Future[Any]":
+        """Run ``func`` on the main thread, the future resolves to its result"""
+        future: "Future[Any]" = Future()
+
+        def call():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+
+        if threading.current_thread() == self._main_thread:
+            call()
+        else:
+            self.schedule(call)
+        return future
+
+    def wait(self, future: "Future[Any]"):
+        """Wait for a request handler's future and return its result.
+
+        Called from a request callback, which pynvim runs in a greenlet on the
+        session thread: the greenlet is suspended and resumed from the event
+        loop once the future is done, so the session keeps delivering messages
+        and serving other requests in the meantime. Errors are turned into RPC
+        error responses.
+        """
+        current = greenlet.getcurrent()
+        if current.parent is not None:
+            loop = self.nvim.loop
+            resumed = False
+
+            def resume():
+                nonlocal resumed
+                if not resumed:
+                    resumed = True
+                    current.switch()
+
+            timeout = loop.call_later(self.request_timeout, resume)
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(resume))
+            current.parent.switch()
+            timeout.cancel()
+        else:
+            futures.wait([future], timeout=self.request_timeout)
+        if not future.done():
+            future.cancel()
+            raise pynvim.ErrorResponse("Timed out waiting for the request handler")
+        error = future.exception()
+        if error is None:
+            return future.result()
+        if isinstance(error, pynvim.ErrorResponse):
+            raise error
+        raise pynvim.ErrorResponse(f"{type(error).__name__}: {error}")
+
+    def executor_stats(self):
+        return self._executor.get_stats()
 
     def _on_request(self, name: str, args: List[Any]):
-        print("RPC request:", name, args)
+        log("debug", "RPC request:", name, args)
         if name not in self._request_handlers:
-            print("No handler for request:", name)
+            log("warn", "No handler for request:", name)
             return
-        self._request_handlers[name](self, args)
+        trace = tracer.start("request", name)
+        return self._request_handlers[name](self, args, trace)
 
     def _on_notification(self, name: str, args: list):
-        print("RPC notification:", name, args)
+        log("debug", "RPC notification:", name, args)
         if name not in self._notification_handlers:
-            print("No handler for notification:", name)
+            log("warn", "No handler for notification:", name)
             return
-        self._notification_handlers[name](self, args)
+        trace = tracer.start("notification", name)
+        self._notification_handlers[name](self, args, trace)
 
     def _on_setup(self):
-        print("RPC setup")
+        log("debug", "RPC setup")
         if self._on_setup_cb is not None:
             self._on_setup_cb(self)
 
@@ -134,31 +233,76 @@ class NvimRpc:
         self._session_thread.daemon = True
         self._session_thread.start()
 
-    def _start_executor(self):
-        if self._executor_started:
-            raise ValueError("Executor is already started")
-
-        def executor():
-            while not self._execution_queue.empty():
-                func = self._execution_queue.get()
-                try:
-                    func()
-                except:  # noqa: E722
-                    traceback.print_exc()
-            return 0.1
-
-        bpy.app.timers.register(executor, persistent=True)
-        self._executor_started = True
-
     def start(self):
-        self._start_executor()
+        self._executor.start()
         self._start_session()
 
-    def send(self, data: Any, async_: bool = True):
+    def run_blocking(self, stop: threading.Event):
+        """Start the session and process scheduled work until ``stop`` is set"""
+        self._start_session()
+        self._executor.run_forever(stop)
+
+    def send(
+        self, data: Any, async_: bool = True, traces: Optional[Iterable[Trace]] = None
+    ):
+        """Queue a message for Neovim, it is delivered with the next batch.
+
+        With ``async_=False`` pending messages are flushed first and the message
+        is sent immediately, returning the handler's result. The message is
+        counted as a reply of ``traces``, by default the current trace.
+        """
+        if async_:
+            self._outbox.put(data, tracer.on_send(traces))
+            return None
+        self._outbox.flush()
         if threading.current_thread() != self._session_thread:
-            self.nvim._session.threadsafe_call(lambda: self.send(data))
-            return
-        print("RPC send:", data)
-        return self.nvim.exec_lua(
-            'return require("blender.rpc").handle(...)', data, async_=async_
-        )
+            raise ValueError("Synchronous sends must be made on the session thread")
+        log("debug", "RPC send:", data)
+        sent = tracer.on_send(traces)
+        try:
+            return self.nvim.exec_lua(
+                'return require("blender.rpc").handle(...)', data, self.session_id
+            )
+        finally:
+            tracer.on_deliver(sent)
+
+    def _deliver(
+        self,
+        batch: List[Any],
+        traces: Tuple[Trace, ...] = (),
+        done: Optional[threading.Event] = None,
+    ):
+        def call():
+            try:
+                if is_enabled("debug"):
+                    # logging the output messages would feed back into them
+                    logged = [m for m in batch if not _is_output(m)]
+                    if logged:
+                        log("debug", "RPC send:", logged)
+                self.nvim.exec_lua(
+                    'return require("blender.rpc").handle_batch(...)',
+                    batch,
+                    self.session_id,
+                    async_=True,
+                )
+                tracer.on_deliver(traces)
+            finally:
+                if done is not None:
+                    done.set()
+
+        if threading.current_thread() == self._session_thread:
+            call()
+        else:
+            self.nvim._session.threadsafe_call(call)
+
+    def flush(self, timeout: float = 1.0):
+        """Deliver all queued messages, e.g. before Blender exits"""
+        return self._outbox.flush(timeout)
+
+    def close(self, timeout: float = 1.0):
+        self._workers.shutdown(wait=False)
+        return self._outbox.close(timeout)
+
+
+def _is_output(message: Any):
+    return isinstance(message, dict) and message.get("type") == "output"
@@ -0,0 +1,166 @@
+import hashlib
+import linecache
+import os
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import CodeType
+from typing import Dict, List, Optional
+
+# values may contain spaces, e.g. workspace names
+directive_re = re.compile(r"^\s*#\s*context\.(\w+)\s*:\s*(.*\S)", re.IGNORECASE)
+
+
+def parse_directives(source: str) -> Dict[str, str]:
+    """Parse ``# context.<key>: <value>`` header comments, last one wins"""
+    directives = {}
+    for line in source.splitlines():
+        match = directive_re.match(line)
+        if match:
+            directives[match.group(1).lower()] = match.group(2)
+    return directives
+
+
+class ScriptEntry:
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+    code: CodeType
+    directives: Dict[str, str]
+    # source lines of code compiled from memory, see ScriptCache.get_source
+    lines: Optional[List[str]] = None
+
+    def __init__(self, path, mtime_ns, size, digest, code, directives):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.code = code
+        self.directives = directives
+
+
+class ScriptCache:
+    """LRU cache of compiled scripts and their context directives.
+
+    Entries are validated with a stat call; the file is only read again when
+    its mtime or size changed, and only recompiled when its content hash did.
+    """
+
+    max_entries: int
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ScriptEntry]" = OrderedDict()
+        self._sources: "OrderedDict[str, ScriptEntry]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries) + len(self._sources)
+
+    def clear(self):
+        self._entries.clear()
+        self._sources.clear()
+
+    def _store(self, entries: "OrderedDict[str, ScriptEntry]", entry: ScriptEntry):
+        entries[entry.path] = entry
+        entries.move_to_end(entry.path)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        return entry
+
+    def get(self, path: str) -> ScriptEntry:
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        entry: Optional[ScriptEntry] = self._entries.get(path)
+        if (
+            entry is not None
+            and entry.mtime_ns == st.st_mtime_ns
+            and entry.size == st.st_size
+        ):
+            self._entries.move_to_end(path)
+            return entry
+
+        with open(path, "rb") as fs:
+            data = fs.read()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if entry is not None and entry.digest == digest:
+            entry.mtime_ns = st.st_mtime_ns
+            entry.size = st.st_size
+            self._entries.move_to_end(path)
+            return entry
+
+        entry = ScriptEntry(
+            path,
+            st.st_mtime_ns,
+            st.st_size,
+            digest,
+            compile(data, path, "exec", dont_inherit=True),
+            parse_directives(data.decode("utf-8", errors="replace")),
+        )
+        return self._store(self._entries, entry)
+
+    def get_source(self, filename: str, source: str, first_line: int = 1):
+        """Compile in-memory ``source`` under ``filename``.
+
+        The code is padded so that its line numbers start at ``first_line``.
+        A pseudo-filename like ``<nvim:buffer-1>`` is registered with
+        ``linecache`` right away, so that tracebacks and debuggers can show the
+        code even though it never touched the disk. The source of a real file
+        is only registered while it runs, see ``source_lines``.
+        """
+        digest = hashlib.blake2b(
+            f"{first_line}:{source}".encode(), digest_size=16
+        ).hexdigest()
+        padded = "\n" * (first_line - 1) + source
+        entry = self._sources.get(filename)
+        if entry is None or entry.digest != digest:
+            entry = ScriptEntry(
+                filename,
+                0,
+                len(padded),
+                digest,
+                compile(padded, filename, "exec", dont_inherit=True),
+                parse_directives(source),
+            )
+        entry.lines = padded.splitlines(keepends=True)
+        if is_pseudo_filename(filename):
+            _register_lines(filename, entry.lines)
+        return self._store(self._sources, entry)
+
+    def get_cached_source(self, filename: str) -> ScriptEntry:
+        return self._sources[filename]
+
+
+def is_pseudo_filename(filename: str):
+    return filename.startswith("<") and filename.endswith(">")
+
+
+def _register_lines(filename: str, lines: List[str]):
+    # a None mtime keeps linecache.checkcache() from discarding the entry
+    linecache.cache[filename] = (sum(map(len, lines)), None, lines, filename)
+
+
+@contextmanager
+def source_lines(entry: ScriptEntry):
+    """Show the in-memory source of ``entry`` for its file while the body runs.
+
+    Code from a buffer or selection of a real file is compiled under that
+    file's path, so that debugpy breakpoints hit. Left in ``linecache``, its
+    lines would replace the file's in every later traceback, including those
+    of the addon's own code, so the previous entry is restored afterwards.
+    """
+    if entry.lines is None or is_pseudo_filename(entry.path):
+        yield
+        return
+    previous = linecache.cache.get(entry.path)
+    _register_lines(entry.path, entry.lines)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            linecache.cache[entry.path] = previous
+        else:
+            linecache.cache.pop(entry.path, None)
+
+
+script_cache = ScriptCache()
@@ -0,0 +1,298 @@
+import ctypes
+import itertools
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Generator, List, Optional
+
+import bpy
+
+from .environment import version
+from .outbox import register_low_priority
+from .output import output_sink
+from .rpc import NvimRpc
+from .utils import redraw_all
+
+# Only the latest progress of each script matters
+register_low_priority("script_progress", lambda message: message["script"])
+
+
+class ScriptCancelled(BaseException):
+    """Raised in a script that is cancelled while it runs.
+
+    Derived from BaseException, so that ``except Exception`` in the script
+    doesn't swallow it.
+    """
+
+
+class ScriptTask:
+    __slots__ = (
+        "id",
+        "path",
+        "generator",
+        "context",
+        "started_at",
+        "progress",
+        "message",
+        "cancelled",
+        "last_report",
+    )
+
+    id: int
+    path: str
+    generator: Generator[Any, None, Any]
+    # context override for each slice
+    context: Dict[str, Any]
+    started_at: float
+    progress: Optional[float]
+    message: Optional[str]
+    cancelled: bool
+    last_report: float
+
+    def __init__(self, id, path, generator, context):
+        self.id = id
+        self.path = path
+        self.generator = generator
+        self.context = context
+        self.started_at = time.monotonic()
+        self.progress = None
+        self.message = None
+        self.cancelled = False
+        self.last_report = 0.0
+
+    def update(self, value: Any):
+        """Take progress from a yielded value: a fraction, a message, or both"""
+        if isinstance(value, tuple) and len(value) == 2:
+            fraction, message = value
+        elif isinstance(value, str):
+            fraction, message = self.progress, value
+        else:
+            fraction, message = value, self.message
+        if isinstance(fraction, (int, float)) and not isinstance(fraction, bool):
+            self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = str(message)
+
+
+class ScriptTasks:
+    """Runs generator scripts in time slices on Blender's main thread.
+
+    A script that defines a generator function ``main`` has it driven one step
+    at a time for at most ``slice_budget`` seconds per tick, after which Blender
+    gets to redraw and handle other RPC messages. Each ``yield`` is a point
+    where the script can be paused or cancelled, and the yielded value reports
+    its progress.
+
+    Plain scripts run to completion in one go. While they run, ``interrupt``
+    raises ``ScriptCancelled`` in them from another thread.
+
+    Loading a file cancels the generator scripts, whose state refers to the
+    data of the previous file.
+    """
+
+    slice_budget = 0.015
+    # seconds between progress messages of a script
+    report_interval = 0.1
+
+    _tasks: Dict[int, ScriptTask]
+    _scheduled: bool
+    # set while a plain script or a slice runs, guarded by _lock
+    _running: bool
+    _interrupted: bool
+
+    def __init__(self):
+        self._tasks = {}
+        self._ids = itertools.count(1)
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._running = False
+        self._interrupted = False
+        self._main_thread_id = threading.main_thread().ident
+
+    def start(self, path: str, generator: Generator, context: Dict[str, Any]):
+        task = ScriptTask(next(self._ids), path, generator, context)
+        self._tasks[task.id] = task
+        self._report(task, "running")
+        self._schedule()
+        return task.id
+
+    def active(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "script": task.id,
+                "path": task.path,
+                "progress": task.progress,
+                "message": task.message,
+            }
+            for task in list(self._tasks.values())
+        ]
+
+    def cancel(self, script_id: Optional[int] = None):
+        """Cancel a generator script, or all of them and interrupt a plain one.
+
+        Can be called from any thread; generators are closed at their next
+        yield.
+        """
+        for task in list(self._tasks.values()):
+            if script_id is None or task.id == script_id:
+                task.cancelled = True
+        if script_id is None:
+            self.interrupt()
+
+    def close_all(self):
+        """Cancel every generator script now, rather than at its next slice"""
+        for task in list(self._tasks.values()):
+            task.cancelled = True
+            if task.generator.gi_running:
+                # the load happened inside this script, closed once it yields
+                continue
+            del self._tasks[task.id]
+            try:
+                with output_sink.source("script"):
+                    task.generator.close()
+            except Exception:
+                with output_sink.source("script"):
+                    traceback.print_exc()
+            self._report(task, "cancelled")
+
+    def register(self):
+        if _on_load_post not in bpy.app.handlers.load_post:
+            bpy.app.handlers.load_post.append(_on_load_post)
+
+    def interrupt(self):
+        """Raise ScriptCancelled in the script running on the main thread, if any"""
+        with self._lock:
+            if not self._running or self._interrupted:
+                return False
+            self._interrupted = True
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(self._main_thread_id),
+                ctypes.py_object(ScriptCancelled),
+            )
+            return True
+
+    @contextmanager
+    def interruptible(self):
+        """Mark a script as running, so that ``interrupt`` may stop it"""
+        with self._lock:
+            self._running = True
+        try:
+            yield
+        finally:
+            while True:
+                try:
+                    self._end_interruptible()
+                    break
+                except ScriptCancelled:
+                    # raised after the script ended but before the lock was
+                    # taken, the script is over either way
+                    continue
+
+    def _end_interruptible(self):
+        with self._lock:
+            self._running = False
+            if self._interrupted:
+                # the script ended before the exception was raised in it
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._main_thread_id), None
+                )
+                self._interrupted = False
+
+    def _schedule(self):
+        if self._scheduled:
+            return
+        self._scheduled = True
+        if bpy.app.background:
+            # timers never fire in background mode; going through the executor
+            # queue also lets other RPC messages run between slices
+            NvimRpc.get_instance().schedule(self._tick_background)
+        else:
+            # persistent, or loading a file would drop it with _scheduled still
+            # set, and no script would get a slice again
+            bpy.app.timers.register(self._tick, first_interval=0.0, persistent=True)
+
+    def _tick_background(self):
+        if self._tick() is not None:
+            self._scheduled = False
+            self._schedule()
+
+    def _tick(self) -> Optional[float]:
+        self._scheduled = False
+        deadline = time.monotonic() + self.slice_budget
+        for task in list(self._tasks.values()):
+            self._run_slice(task, deadline)
+            if task.id in self._tasks:
+                # round-robin: tasks that didn't get a slice go first next tick
+                self._tasks[task.id] = self._tasks.pop(task.id)
+            if time.monotonic() >= deadline:
+                break
+        redraw_all()
+        if not self._tasks:
+            return None
+        self._scheduled = True
+        return 0.0
+
+    def _run_slice(self, task: ScriptTask, deadline: float):
+        state = "running"
+        error = None
+        try:
+            with self._override(task.context), output_sink.source(
+                "script"
+            ), self.interruptible():
+                while not task.cancelled:
+                    task.update(next(task.generator))
+                    if time.monotonic() >= deadline:
+                        break
+            if task.cancelled:
+                task.generator.close()
+                state = "cancelled"
+        except StopIteration:
+            state = "done"
+        except ScriptCancelled:
+            task.generator.close()
+            state = "cancelled"
+        except Exception:
+            with output_sink.source("script"):
+                traceback.print_exc()
+            error = traceback.format_exc()
+            state = "failed"
+        if state != "running":
+            del self._tasks[task.id]
+        self._report(task, state, error)
+
+    @staticmethod
+    def _override(context: Dict[str, Any]):
+        if version < (4, 0, 0) or not context:
+            return nullcontext()
+        return bpy.context.temp_override(**context)
+
+    def _report(self, task: ScriptTask, state: str, error: Optional[str] = None):
+        now = time.monotonic()
+        if state == "running" and now - task.last_report < self.report_interval:
+            return
+        task.last_report = now
+        message = {
+            "type": "script_progress" if state == "running" else "script_done",
+            "script": task.id,
+            "path": task.path,
+            "name": os.path.basename(task.path),
+            "state": state,
+            "progress": task.progress,
+            "message": task.message,
+            "elapsed": now - task.started_at,
+        }
+        if error is not None:
+            message["error"] = error
+        rpc = NvimRpc.get_instance_safe()
+        if rpc is not None:
+            rpc.send(message)
+
+
+script_tasks = ScriptTasks()
+
+
+@bpy.app.handlers.persistent
+def _on_load_post(*args):
+    script_tasks.close_all()
@@ -0,0 +1,189 @@
+import importlib
+import os
+import sys
+import time
+import traceback
+import unittest
+from typing import Any, Dict, Iterable, List, Optional
+
+from .load_addons import loaded_addon_names, map_load_path, path_mappings
+from .reload import addon_module_names, get_graph, purge_modules
+from .rpc import NvimRpc
+
+# Lines of a failure's traceback sent with its result, the full traceback is
+# printed to the worker's output
+max_message_lines = 20
+
+
+def refresh_addons():
+    """Pick up changes made since the previous run in this worker.
+
+    The test modules (imported after the addon was enabled, so not part of its
+    import graph) are dropped to be imported again, and addon modules that
+    changed are reloaded through the usual incremental reload. The first run
+    in a worker reloads the addons fully, which starts tracking their modules.
+    """
+    from .operators.addon_update import reload_addons
+
+    stale = {}
+    for name in loaded_addon_names():
+        graph = get_graph(name)
+        if graph is not None:
+            purge_modules(
+                [
+                    module
+                    for module in addon_module_names(name)
+                    if module not in graph.records
+                ]
+            )
+        if graph is None or graph.modules_to_reload():
+            stale[name] = True
+    if stale:
+        reload_addons(stale)
+    for name in loaded_addon_names():
+        graph = get_graph(name)
+        tracked = set(graph.records) if graph is not None else set()
+        purge_modules(
+            [module for module in addon_module_names(name) if module not in tracked]
+        )
+    importlib.invalidate_caches()
+
+
+def _iter_tests(suite: unittest.TestSuite) -> Iterable[unittest.TestCase]:
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_tests(test)
+        else:
+            yield test
+
+
+def _load_error(test) -> Optional[str]:
+    """The error of a test that unittest could not load, if it is one"""
+    tests = _iter_tests(test) if isinstance(test, unittest.TestSuite) else [test]
+    for case in tests:
+        exception = getattr(case, "_exception", None)
+        if exception is not None:
+            return str(exception)
+    return None
+
+
+def discover(pattern: Optional[str] = None, start: Optional[str] = None):
+    """Find the unittest tests of every loaded addon.
+
+    Tests are looked up in the addon as it is loaded (its link in the user addon
+    directory), so test modules are imported as part of the addon package.
+    """
+    refresh_addons()
+    loader = unittest.TestLoader()
+    tests: List[str] = []
+    errors: List[Dict[str, str]] = []
+    for mapping in path_mappings:
+        load = mapping["load"]
+        start_dir = os.path.join(load, start) if start else load
+        if not os.path.isdir(start_dir):
+            continue
+        top_level_dir = os.path.dirname(load)
+        suite = loader.discover(start_dir, pattern or "test*.py", top_level_dir)
+        for test in _iter_tests(suite):
+            exception = _load_error(test)
+            if exception is not None:
+                # a module that failed to import
+                errors.append({"id": test._testMethodName, "message": exception})
+            else:
+                tests.append(test.id())
+    return {"tests": tests, "errors": errors}
+
+
+class StreamingResult(unittest.TestResult):
+    """Sends each test's outcome to Neovim as soon as the test finishes"""
+
+    def __init__(self, run_id: Optional[int]):
+        super().__init__()
+        self.run_id = run_id
+        self.counts: Dict[str, int] = {}
+        self._started = time.perf_counter()
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started = time.perf_counter()
+
+    def report(self, test_id: str, outcome: str, err=None, reason=None, test=None):
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        message: Dict[str, Any] = {
+            "type": "test_result",
+            "run": self.run_id,
+            "id": test_id,
+            "outcome": outcome,
+            "duration": time.perf_counter() - self._started,
+        }
+        if reason:
+            message["message"] = reason
+        if err is not None:
+            text = "".join(traceback.format_exception(*err))
+            print(f"{outcome.upper()}: {test_id}\n{text}", file=sys.stderr)
+            lines = text.rstrip().splitlines()
+            message["message"] = "\n".join(lines[-max_message_lines:])
+            if test is not None:
+                message.update(self._location(test, err[2]))
+        NvimRpc.get_instance().send(message)
+
+    @staticmethod
+    def _location(test, tb) -> Dict[str, Any]:
+        """The innermost frame of the traceback in the test's own file"""
+        module = sys.modules.get(type(test).__module__)
+        test_file = os.path.realpath(getattr(module, "__file__", "") or "")
+        for frame in reversed(traceback.extract_tb(tb)):
+            if os.path.realpath(frame.filename) == test_file:
+                return {"file": map_load_path(frame.filename), "line": frame.lineno}
+        return {}
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self.report(test.id(), "passed")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self.report(test.id(), "failed", err, test=test)
+
+    def addError(self, test, err):
+        # also called for errors in setUpClass and setUpModule
+        super().addError(test, err)
+        self.report(test.id(), "error", err, test=test)
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.report(test.id(), "skipped", reason=reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self.report(test.id(), "expected_failure")
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self.report(test.id(), "unexpected_success")
+
+
+def run_tests(ids: List[str], run_id: Optional[int] = None) -> Dict[str, int]:
+    """Run the given tests, streaming each result, and return the counts.
+
+    The tests run as one suite, so class and module fixtures are set up once
+    for all of a shard's tests that share them.
+    """
+    refresh_addons()
+    loader = unittest.TestLoader()
+    result = StreamingResult(run_id)
+    suite = unittest.TestSuite()
+    for test_id in ids:
+        # e.g. the test was removed or renamed since it was discovered
+        try:
+            loaded = loader.loadTestsFromName(test_id)
+        except Exception:
+            result.report(test_id, "error", sys.exc_info())
+            continue
+        exception = _load_error(loaded)
+        if exception is not None:
+            result.report(test_id, "error", reason=exception)
+            continue
+        suite.addTest(loaded)
+    suite.run(result)
+    return result.counts
@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+
+class Trace:
+    """Monotonic timestamps of one RPC message as it moves through each hop"""
+
+    __slots__ = ("kind", "name", "marks", "detached", "undelivered")
+
+    kind: str
+    name: str
+    marks: List[Tuple[str, float]]
+    detached: bool
+    # messages sent while handling this one that haven't reached Neovim yet
+    undelivered: int
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.marks = [("received", time.monotonic())]
+        self.detached = False
+        self.undelivered = 0
+
+    def mark(self, stage: str):
+        self.marks.append((stage, time.monotonic()))
+
+    def has_mark(self, stage: str):
+        return any(name == stage for name, _ in self.marks)
+
+    def durations(self) -> Dict[str, float]:
+        """Time spent reaching each mark from the previous one, plus the total"""
+        result: Dict[str, float] = {}
+        for (_, start), (stage, end) in zip(self.marks, self.marks[1:]):
+            result[stage] = result.get(stage, 0.0) + end - start
+        result["total"] = self.marks[-1][1] - self.marks[0][1]
+        return result
+
+
+class Histogram:
+    """Keeps the most recent samples and reports percentiles over them"""
+
+    max_samples = 1024
+
+    def __init__(self):
+        self.count = 0
+        self._samples: Deque[float] = deque(maxlen=self.max_samples)
+
+    def add(self, value: float):
+        self.count += 1
+        self._samples.append(value)
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0}
+
+        def pct(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {
+            "count": self.count,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": samples[-1],
+        }
+
+
+class Tracer:
+    """Collects per-message traces and per-handler latency histograms"""
+
+    max_traces = 2000
+
+    def __init__(self):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._traces: Deque[Trace] = deque(maxlen=self.max_traces)
+        self._histograms: Dict[str, Dict[str, Histogram]] = {}
+        self._local = threading.local()
+
+    def start(self, kind: str, name: str) -> Optional[Trace]:
+        return Trace(kind, name) if self.enabled else None
+
+    @property
+    def current(self) -> Optional[Trace]:
+        return getattr(self._local, "trace", None)
+
+    @contextmanager
+    def activate(self, trace: Optional[Trace]):
+        previous = self.current
+        self._local.trace = trace
+        try:
+            yield trace
+        finally:
+            self._local.trace = previous
+
+    def detach(self) -> Optional[Trace]:
+        """Take over the current trace from its handler.
+
+        For handlers that hand their work off to run later; the caller becomes
+        responsible for calling ``finish``.
+        """
+        trace = self.current
+        if trace is not None:
+            trace.detached = True
+        return trace
+
+    def on_send(self, traces: Optional[Iterable[Trace]] = None) -> Tuple[Trace, ...]:
+        """Note that a message is being sent for ``traces`` (default: the current).
+
+        Returns the traces to tag the message with, for ``on_deliver``.
+        """
+        if traces is None:
+            current = self.current
+            traces = () if current is None else (current,)
+        traces = tuple(traces)
+        with self._lock:
+            for trace in traces:
+                if not trace.has_mark("send"):
+                    trace.mark("send")
+                trace.undelivered += 1
+        return traces
+
+    def on_deliver(self, traces: Iterable[Trace]):
+        """Note that messages tagged with ``traces`` were handed to Neovim"""
+        done = []
+        with self._lock:
+            for trace in traces:
+                trace.undelivered -= 1
+                if trace.undelivered == 0 and trace.has_mark("finished"):
+                    trace.mark("delivered")
+                    done.append(trace)
+        for trace in done:
+            self._record(trace)
+
+    def finish(self, trace: Optional[Trace]):
+        if trace is None:
+            return
+        with self._lock:
+            trace.mark("finished")
+            if trace.undelivered:
+                # recorded once its messages have been handed to Neovim
+                return
+            if trace.has_mark("send"):
+                # they were delivered before the handler finished
+                trace.mark("delivered")
+        self._record(trace)
+
+    def _record(self, trace: Trace):
+        with self._lock:
+            self._traces.append(trace)
+            stages = self._histograms.setdefault(trace.name, {})
+            for stage, duration in trace.durations().items():
+                stages.setdefault(stage, Histogram()).add(duration)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {stage: hist.summary() for stage, hist in stages.items()}
+                for name, stages in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._traces.clear()
+            self._histograms.clear()
+
+    def export(self, path: str, fmt: str = "chrome"):
+        """Write the recorded traces as JSON or as a Chrome trace event file"""
+        with self._lock:
+            traces = list(self._traces)
+        if fmt == "chrome":
+            pid = os.getpid()
+            events = []
+            # one track per handler: tids must be integers, the handler names
+            # are given as thread names
+            tids: Dict[str, int] = {}
+            for i, trace in enumerate(traces):
+                tid = tids.get(trace.name)
+                if tid is None:
+                    tid = tids[trace.name] = len(tids) + 1
+                    events.append(
+                        {
+                            "name": "thread_name",
+                            "ph": "M",
+                            "pid": pid,
+                            "tid": tid,
+                            "args": {"name": trace.name},
+                        }
+                    )
+                for (_, start), (stage, end) in zip(trace.marks, trace.marks[1:]):
+                    events.append(
+                        {
+                            "name": stage,
+                            "cat": trace.kind,
+                            "ph": "X",
+                            "ts": start * 1e6,
+                            "dur": (end - start) * 1e6,
+                            "pid": pid,
+                            "tid": tid,
+                            "args": {"trace": i},
+                        }
+                    )
+            data: Any = {"traceEvents": events, "displayTimeUnit": "ms"}
+        else:
+            data = {
+                "traces": [
+                    {"kind": t.kind, "name": t.name, "marks": t.marks} for t in traces
+                ],
+                "stats": self.stats(),
+            }
+        with open(path, "w") as fs:
+            json.dump(data, fs)
+        return len(traces)
+
+
+tracer = Tracer()
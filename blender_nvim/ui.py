@@ -2,6 +2,7 @@ import bpy
 
 from .dap import NvimDap
 from .rpc import NvimRpc
+from .tracing import tracer
 
 
 class PT_NVIM_Info(bpy.types.Panel):
@@ -23,7 +24,36 @@ class PT_NVIM_Info(bpy.types.Panel):
         layout.row().box().label(text=str(rpc.nvim.channel_id) if rpc else "N/A")
 
         layout.row().label(text="Debugpy Server:")
-        layout.row().box().label(text=f"{dap.host}:{dap.port}" if dap else "N/A")
+        if dap is None:
+            dap_status = "N/A"
+        elif not dap.started:
+            dap_status = "not started"
+        else:
+            dap_status = f"{dap.host}:{dap.port}"
+        layout.row().box().label(text=dap_status)
+
+        layout.row().label(text="Executor:")
+        box = layout.row().box()
+        if rpc:
+            stats = rpc.executor_stats()
+            box.label(text=f"Queue depth: {stats['depth']}")
+            box.label(text=f"Avg wait: {stats['avg_wait'] * 1000:.1f} ms")
+            box.label(text=f"Max wait: {stats['max_wait'] * 1000:.1f} ms")
+        else:
+            box.label(text="N/A")
+
+        layout.row().label(text="RPC Latency (p50 / p95):")
+        box = layout.row().box()
+        stats = tracer.stats()
+        for name, stages in sorted(stats.items()):
+            total = stages.get("total", {})
+            if total.get("count"):
+                box.label(
+                    text=f"{name}: {total['p50'] * 1000:.1f} / "
+                    f"{total['p95'] * 1000:.1f} ms ({total['count']})"
+                )
+        if not stats:
+            box.label(text="N/A")
 
 
 classes = (PT_NVIM_Info,)
@@ -1,5 +1,8 @@
 import sys
-from typing import Type, TypeVar, List
+import time
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Type, TypeVar
 
 import bpy
 
@@ -31,13 +34,44 @@ def ensure_installed(pkg_names: List[str | None]):
 
 
 def is_importable(name):
+    # find_spec locates the module without executing it
     try:
-        __import__(name)
-        return True
-    except ModuleNotFoundError:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
         return False
 
 
+class Stopwatch:
+    """Records the duration of named, sequential stages"""
+
+    started_at: float
+    stages: Dict[str, float]
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def total(self):
+        return time.perf_counter() - self.started_at
+
+    def as_dict(self):
+        return {"stages": dict(self.stages), "total": self.total()}
+
+    def format(self):
+        parts = [
+            f"{name}={duration * 1000:.1f}ms" for name, duration in self.stages.items()
+        ]
+        return f"{', '.join(parts)} (total {self.total() * 1000:.1f}ms)"
+
+
 TOperator = TypeVar("TOperator", bound=bpy.types.Operator)
 
 
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+import traceback
+from typing import Any, Dict
+
+import bpy
+
+from .operators.script_runner import run_code
+from .output import output_sink
+from .profiling import parse_mode, profile
+from .rpc import NvimRpc
+from .script_cache import script_cache, source_lines
+from .script_tasks import ScriptCancelled, script_tasks
+from .test_runner import discover, run_tests
+
+_stop = threading.Event()
+_active = False
+
+# How the scene is reset between jobs: "homefile" reloads the user's startup
+# file, "factory" loads the factory startup file (preferences and enabled addons
+# are kept either way), "none" leaves the scene as the previous job left it.
+reset_mode = os.environ.get("BLENDER_NVIM_WORKER_RESET", "homefile")
+
+
+def is_worker():
+    return _active
+
+
+def run(rpc: NvimRpc):
+    """Serve jobs on the main thread until the worker is stopped"""
+    global _active
+    _active = True
+    rpc.run_blocking(_stop)
+
+
+def stop():
+    _stop.set()
+
+
+def reset_scene():
+    if reset_mode == "homefile":
+        bpy.ops.wm.read_homefile()
+    elif reset_mode == "factory":
+        bpy.ops.wm.read_homefile(use_factory_startup=True)
+
+
+@NvimRpc.notification_handler("job")
+def job_action(data):
+    rpc = NvimRpc.get_instance()
+    start = time.perf_counter()
+    error = None
+    # sent back with job_done, for test jobs
+    extra: Dict[str, Any] = {}
+    try:
+        mode = parse_mode(data.get("profile"))
+        with profile(f"job {data['job_id']}", mode), output_sink.source(
+            "script"
+        ), script_tasks.interruptible():
+            if "tests" in data:
+                extra["counts"] = run_tests(data["tests"], data.get("test_run"))
+            elif "discover" in data:
+                options = data["discover"] or {}
+                extra.update(discover(options.get("pattern"), options.get("start")))
+            else:
+                run_job_script(data)
+    except ScriptCancelled:
+        error = "Cancelled"
+    except Exception:
+        traceback.print_exc()
+        error = traceback.format_exc()
+    duration = time.perf_counter() - start
+
+    reset_start = time.perf_counter()
+    try:
+        if "discover" not in data:
+            reset_scene()
+    except Exception:
+        traceback.print_exc()
+        error = error or traceback.format_exc()
+
+    rpc.send(
+        {
+            "type": "job_done",
+            "job_id": data["job_id"],
+            "ok": error is None,
+            "error": error,
+            "duration": duration,
+            "reset_duration": time.perf_counter() - reset_start,
+            **extra,
+        }
+    )
+
+
+def run_job_script(data):
+    if "source" in data:
+        name = data.get("path") or f"<nvim:job-{data['job_id']}>"
+        entry = script_cache.get_source(name, data["source"])
+    else:
+        entry = script_cache.get(data["path"])
+    with source_lines(entry):
+        run_code(entry.code, entry.path, init_globals={"JOB_ARGS": data.get("args")})
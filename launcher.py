@@ -1,12 +1,15 @@
 import json
 import os
 import sys
+import time
 import traceback
 from pathlib import Path
 from typing import cast
 
 from importlib.util import find_spec
 
+started_at = time.perf_counter()
+
 include_dir = Path(__file__).parent
 sys.path.append(str(include_dir))
 
@@ -46,11 +49,13 @@ def append_venv_path(virtual_env: str):
             f"Virtual environment does not have site-packages directory: {site_packages_dir}",
         )
         return
+    # compare normalized strings rather than stat-ing every sys.path entry
+    candidates = {
+        os.path.normcase(os.path.abspath(site_packages_dir)),
+        os.path.normcase(os.path.realpath(site_packages_dir)),
+    }
     for path in sys.path:
-        path = Path(path)
-        if not path.exists():
-            continue
-        if path.samefile(site_packages_dir):
+        if path and os.path.normcase(os.path.abspath(path)) in candidates:
             log("INFO", f"Virtual environment already in path: {path}")
             return
     log("INFO", f"Using virtual environment: {venv_dir}")
@@ -61,6 +66,13 @@ rpc_socket = os.environ.get("BLENDER_NVIM_RPC_SOCKET")
 addons_to_load = json.loads(os.environ.get("BLENDER_NVIM_ADDONS_TO_LOAD", "[]"))
 enable_debugpy = os.environ.get("BLENDER_NVIM_ENABLE_DAP", "no")
 task_id = os.environ.get("BLENDER_NVIM_TASK_ID", "0")
+worker = os.environ.get("BLENDER_NVIM_WORKER", "no")
+fast_start = os.environ.get("BLENDER_NVIM_FAST_START", "no")
+log_rpc = os.environ.get("BLENDER_NVIM_LOG_RPC", "no")
+log_level = os.environ.get("BLENDER_NVIM_LOG_LEVEL", "info")
+prewarm = os.environ.get("BLENDER_NVIM_PREWARM", "no")
+track_memory = os.environ.get("BLENDER_NVIM_TRACK_MEMORY", "no")
+memory_frames = os.environ.get("BLENDER_NVIM_MEMORY_FRAMES", "1")
 virtual_env = os.environ.get("VIRTUAL_ENV")
 
 if virtual_env is not None:
@@ -80,6 +92,10 @@ if rpc_socket is not None:
     log("INFO", f"Addons to load: {addons_to_load}")
     log("INFO", f"Enable debugpy: {enable_debugpy}")
     log("INFO", f"Task ID: {task_id}")
+    log("INFO", f"Worker: {worker}")
+    log("INFO", f"Fast start: {fast_start}")
+    log("INFO", f"Prewarm: {prewarm}")
+    log("INFO", f"Track memory: {track_memory}")
 
     addons_to_load = tuple(
         map(
@@ -94,6 +110,14 @@ if rpc_socket is not None:
             addons_to_load=addons_to_load,
             enable_dap=enable_debugpy.lower() == "yes",
             task_id=int(task_id),
+            worker=worker.lower() == "yes",
+            fast_start=fast_start.lower() == "yes",
+            started_at=started_at,
+            log_rpc=log_rpc.lower() == "yes",
+            prewarm=prewarm.lower() == "yes",
+            log_level=log_level.lower(),
+            track_memory=track_memory.lower() == "yes",
+            memory_frames=int(memory_frames),
         )
     except Exception as e:
         if type(e) is not SystemExit:
@@ -30,9 +30,11 @@ M.toggle_ui = function()
 end
 
 ---Launch a Blender profile
-M.show_launcher = function()
+---@param opts? { concurrent?: boolean } # launch another session even if one is running
+M.show_launcher = function(opts)
+  local concurrent = opts and opts.concurrent
   local running_task = manager.get_running_task()
-  if running_task then
+  if running_task and not concurrent then
     manage_task {
       message = 'A task is already running',
       task = running_task,
@@ -40,7 +42,7 @@ M.show_launcher = function()
     return
   end
   select_profile(function(profile)
-    local task = profile:launch()
+    local task = profile:launch { allow_concurrent = concurrent }
     if not task then
       return
     end
@@ -84,8 +86,10 @@ M.toggle_output_panel = function()
   panel:toggle()
 end
 
----Reload the Blender add-on
-M.reload = function()
+---@alias SessionTarget integer | 'all' # A session (task) id, or every running session
+
+---@return RpcClient?
+local function get_client()
   local running_task = manager.get_running_task()
   if not running_task then
     notify('No running blender task', 'ERROR')
@@ -95,7 +99,265 @@ M.reload = function()
     notify('No RPC client attached to the running task', 'ERROR')
     return
   end
-  running_task.client:reload_addon()
+  return running_task.client
+end
+
+---The clients of the targeted sessions, the active one by default
+---@param session? SessionTarget
+---@return RpcClient[]
+local function get_clients(session)
+  if session == nil then
+    local client = get_client()
+    return client and { client } or {}
+  end
+  local tasks = session == 'all' and manager.get_running_tasks() or { manager.get_task(session) }
+  local clients = {}
+  for _, task in ipairs(tasks) do
+    if task.status == 'running' and task.client then
+      table.insert(clients, task.client)
+    end
+  end
+  if #clients == 0 then
+    notify('No running Blender session with an RPC client: ' .. tostring(session), 'ERROR')
+  end
+  return clients
+end
+
+---Reload the Blender add-on
+---@param opts? { profile?: RpcProfileMode, session?: SessionTarget } # profile enabling the add-on, results go to the quickfix list
+M.reload = function(opts)
+  for _, client in ipairs(get_clients(opts and opts.session)) do
+    client:reload_addon(opts)
+  end
+end
+
+---Run the current buffer, or a range of lines from it, in Blender
+---The code is sent over RPC, so the buffer doesn't need to be written first.
+---@param range? { [1]: integer, [2]: integer } # 1-based, inclusive line range
+---@param opts? { profile?: RpcProfileMode, session?: SessionTarget } # profile the code, results go to the quickfix list
+M.run = function(range, opts)
+  local clients = get_clients(opts and opts.session)
+  if #clients == 0 then
+    return
+  end
+  local bufnr = vim.api.nvim_get_current_buf()
+  local first_line = range and range[1] or 1
+  local last_line = range and range[2] or -1
+  local lines = vim.api.nvim_buf_get_lines(bufnr, first_line - 1, last_line, false)
+  local path = vim.api.nvim_buf_get_name(bufnr)
+  local params = {
+    source = table.concat(lines, '\n') .. '\n',
+    path = path ~= '' and path or nil,
+    name = 'buffer-' .. bufnr,
+    first_line = first_line,
+    profile = opts and opts.profile,
+  }
+  for _, client in ipairs(clients) do
+    client:run_source(params)
+  end
+end
+
+---Start the debugger in the running Blender and attach to it
+M.start_debugger = function()
+  local running_task = manager.get_running_task()
+  if not running_task then
+    notify('No running blender task', 'ERROR')
+    return
+  end
+  running_task:start_debugger()
+end
+
+---Set the level of Blender.nvim's own log messages, or show it without a level
+---Debug messages include every RPC message exchanged with Blender.
+---@param level? RpcLogLevel
+---@param opts? { session?: SessionTarget }
+M.log_level = function(level, opts)
+  for _, client in ipairs(get_clients(opts and opts.session)) do
+    local ok, result = pcall(client.log_level, client, level)
+    if not ok then
+      notify('Failed to set the log level: ' .. tostring(result), 'ERROR')
+      return
+    end
+    notify('Blender log level: ' .. result.level, 'INFO')
+  end
+end
+
+---Start or stop tracking memory growth across reloads and script runs, or show
+---whether it is tracked. Each tracked reload or run sends a report of the
+---allocation sites that grew and the stale add-on modules left behind.
+---@param enabled? boolean
+---@param opts? { session?: SessionTarget, frames?: integer }
+M.memory_tracking = function(enabled, opts)
+  opts = opts or {}
+  for _, client in ipairs(get_clients(opts.session)) do
+    local ok, result = pcall(client.memory_tracking, client, enabled, opts.frames)
+    if not ok then
+      notify('Failed to change memory tracking: ' .. tostring(result), 'ERROR')
+      return
+    end
+    if result.enabled then
+      notify(('Tracking memory, %.1f MiB traced'):format(result.traced / (1024 * 1024)), 'INFO')
+    else
+      notify('Not tracking memory', 'INFO')
+    end
+  end
+end
+
+---List the running Blender sessions
+M.show_sessions = function()
+  local tasks = manager.get_running_tasks()
+  if #tasks == 0 then
+    notify('No running Blender session', 'INFO')
+    return
+  end
+  local lines = { 'Blender sessions:' }
+  for _, task in ipairs(tasks) do
+    table.insert(
+      lines,
+      ('%s %d  %s%s'):format(
+        task == manager.task and '*' or ' ',
+        task.id,
+        task.profile.name,
+        task.client and (' (Blender ' .. task.client.blender_version .. ')') or ' (starting)'
+      )
+    )
+  end
+  vim.notify(table.concat(lines, '\n'), vim.log.levels.INFO)
+end
+
+---Make a session the one actions apply to by default
+---@param id integer
+M.select_session = function(id)
+  if manager.set_active_task(id) then
+    notify('Active Blender session: ' .. id, 'INFO')
+  end
+end
+
+---Show RPC latency percentiles for each handler, as measured by Blender
+M.show_trace_stats = function()
+  local client = get_client()
+  if not client then
+    return
+  end
+  local stats = client:request('trace_stats', {})
+  local lines = { 'RPC latency (p50 / p95 / p99, ms):' }
+  local names = vim.tbl_keys(stats.handlers)
+  table.sort(names)
+  for _, name in ipairs(names) do
+    table.insert(lines, '  ' .. name .. ':')
+    local stages = stats.handlers[name]
+    local stage_names = vim.tbl_keys(stages)
+    table.sort(stage_names)
+    for _, stage in ipairs(stage_names) do
+      local s = stages[stage]
+      if s.count > 0 then
+        table.insert(
+          lines,
+          ('    %-10s %8.2f %8.2f %8.2f  (n=%d)'):format(stage, s.p50 * 1000, s.p95 * 1000, s.p99 * 1000, s.count)
+        )
+      end
+    end
+  end
+  local executor = stats.executor
+  table.insert(
+    lines,
+    ('Executor: depth %d, avg wait %.2fms, max wait %.2fms'):format(
+      executor.depth,
+      executor.avg_wait * 1000,
+      executor.max_wait * 1000
+    )
+  )
+  vim.notify(table.concat(lines, '\n'), vim.log.levels.INFO)
+end
+
+---Export the RPC traces recorded by Blender
+---@param path string # Output file
+---@param format? 'chrome' | 'json' # 'chrome' files can be loaded in chrome://tracing or Perfetto (default)
+M.export_trace = function(path, format)
+  local client = get_client()
+  if not client then
+    return
+  end
+  client:notify('trace_export', { path = vim.fn.fnamemodify(path, ':p'), format = format or 'chrome' })
+end
+
+---Cancel the scripts running in Blender
+---@param script_id? integer # A generator script to cancel; without it every script is cancelled
+M.cancel = function(script_id)
+  local client = get_client()
+  if not client then
+    return
+  end
+  client:cancel(script_id)
+end
+
+---Query bpy.data in the running Blender
+---@param params RpcQueryParams
+---@return RpcQueryResult?
+M.query = function(params)
+  local client = get_client()
+  if not client then
+    return
+  end
+  local ok, result = pcall(client.query, client, params)
+  if not ok then
+    notify('Query failed: ' .. tostring(result), 'ERROR')
+    return
+  end
+  return result
+end
+
+---Start a pool of headless Blender workers for batch scripts
+---@param profile? Profile # The profile to start the workers with; prompts if not given
+M.pool_start = function(profile)
+  local pool = require 'blender.pool'
+  if profile then
+    pool.start(profile)
+    return
+  end
+  select_profile(function(selected)
+    pool.start(selected)
+  end)
+end
+
+---Stop the pool of headless Blender workers
+M.pool_stop = function()
+  require('blender.pool').stop()
+end
+
+---Run a script on the next free worker of the pool
+---@param path? string # The script to run, defaults to the current file
+---@param args? table # Passed to the script as JOB_ARGS
+M.pool_run = function(path, args)
+  local pool = require('blender.pool').get()
+  if not pool then
+    notify('No Blender worker pool running', 'ERROR')
+    return
+  end
+  path = path or vim.api.nvim_buf_get_name(0)
+  pool:submit({ path = vim.fn.fnamemodify(path, ':p'), args = args }, function(result)
+    if result.ok then
+      notify(('Job %d finished in %.0fms'):format(result.job_id, result.duration * 1000), 'INFO')
+    else
+      notify(('Job %d failed: %s'):format(result.job_id, result.error), 'ERROR')
+    end
+  end)
+end
+
+---Run the add-on's tests on the worker pool, sharded across its workers
+---The pool is started with the running session's profile, or a selected one, if needed.
+---@param opts? TestRunOpts
+M.test = function(opts)
+  local pool = require 'blender.pool'
+  local run = function(profile)
+    require('blender.test').start(pool.get() or pool.start(profile), opts)
+  end
+  local running_task = manager.get_running_task()
+  if pool.get() or running_task then
+    run(running_task and running_task.profile)
+    return
+  end
+  select_profile(run)
 end
 
 ---Start watching for changes in the addon files
@@ -20,13 +20,91 @@ local cmd = function(name, fn, desc, opts)
   )
 end
 
+local profile_modes = function()
+  return { 'cprofile', 'sample' }
+end
+
 M.setup = function()
   cmd('Blender', action 'show_ui', 'Open the Blender.nvim UI')
-  cmd('BlenderLaunch', action 'show_launcher', 'Launch a Blender profile')
+  cmd('BlenderLaunch', function(args)
+    require('blender.actions').show_launcher { concurrent = args.bang }
+  end, 'Launch a Blender profile, with ! alongside the running sessions', { bang = true })
   cmd('BlenderManage', action 'show_task_manager', 'Manage a running Blender task')
-  cmd('BlenderReload', action 'reload', 'Reload the Blender addon')
+  cmd('BlenderReload', function(args)
+    require('blender.actions').reload { session = args.bang and 'all' or nil }
+  end, 'Reload the Blender addon, with ! in every session', { bang = true })
+  cmd('BlenderRun', function(args)
+    require('blender.actions').run(
+      args.range > 0 and { args.line1, args.line2 } or nil,
+      { session = args.bang and 'all' or nil }
+    )
+  end, 'Run the current buffer or range in Blender, with ! in every session', { range = true, bang = true })
+  cmd('BlenderSessions', action 'show_sessions', 'List the running Blender sessions')
+  cmd('BlenderSession', function(args)
+    require('blender.actions').select_session(tonumber(args.args))
+  end, 'Select the Blender session that commands apply to', {
+    nargs = 1,
+    complete = function()
+      return vim.tbl_map(function(task)
+        return tostring(task.id)
+      end, require('blender.manager').get_running_tasks())
+    end,
+  })
+  cmd('BlenderCancel', function(args)
+    require('blender.actions').cancel(args.args ~= '' and tonumber(args.args) or nil)
+  end, 'Cancel the scripts running in Blender', { nargs = '?' })
+  cmd('BlenderProfileRun', function(args)
+    require('blender.actions').run(
+      args.range > 0 and { args.line1, args.line2 } or nil,
+      { profile = args.args ~= '' and args.args or 'cprofile' }
+    )
+  end, 'Profile the current buffer or range in Blender', {
+    range = true,
+    nargs = '?',
+    complete = profile_modes,
+  })
+  cmd('BlenderProfileReload', function(args)
+    require('blender.actions').reload { profile = args.args ~= '' and args.args or 'cprofile' }
+  end, 'Reload the Blender addon, profiling its registration', {
+    nargs = '?',
+    complete = profile_modes,
+  })
+  cmd('BlenderLogLevel', function(args)
+    require('blender.actions').log_level(args.args ~= '' and args.args or nil, { session = args.bang and 'all' or nil })
+  end, 'Set the log level in Blender, with ! in every session', {
+    nargs = '?',
+    bang = true,
+    complete = function()
+      return { 'debug', 'info', 'warn', 'error' }
+    end,
+  })
+  cmd('BlenderMemory', function(args)
+    local enabled = ({ on = true, off = false })[args.args]
+    require('blender.actions').memory_tracking(enabled, { session = args.bang and 'all' or nil })
+  end, 'Track memory growth across reloads and script runs (on|off), with ! in every session', {
+    nargs = '?',
+    bang = true,
+    complete = function()
+      return { 'on', 'off' }
+    end,
+  })
+  cmd('BlenderDebug', action 'start_debugger', 'Start the debugger in Blender and attach to it')
   cmd('BlenderWatch', action 'watch', 'Watch for changes and reload the addon')
   cmd('BlenderUnwatch', action 'unwatch', 'Stop watching for changes')
+  cmd('BlenderPoolStart', action 'pool_start', 'Start a pool of headless Blender workers')
+  cmd('BlenderPoolStop', action 'pool_stop', 'Stop the pool of headless Blender workers')
+  cmd('BlenderPoolRun', function(args)
+    require('blender.actions').pool_run(args.args ~= '' and args.args or nil)
+  end, 'Run a script on the Blender worker pool', { nargs = '?', complete = 'file' })
+  cmd('BlenderTest', function(args)
+    require('blender.actions').test { filter = args.args ~= '' and args.args or nil }
+  end, 'Run the add-on tests on the worker pool, optionally only those whose id contains the argument', {
+    nargs = '?',
+  })
+  cmd('BlenderTraceStats', action 'show_trace_stats', 'Show RPC latency statistics')
+  cmd('BlenderTraceExport', function(args)
+    require('blender.actions').export_trace(args.args)
+  end, 'Export RPC traces to a Chrome trace file', { nargs = 1, complete = 'file' })
   cmd('BlenderOutput', action 'toggle_output_panel', 'Toggle the output panel')
 end
 
@@ -7,9 +7,21 @@ local M = {}
 
 ---@class DapConfig
 ---@field enabled boolean
+---@field lazy boolean
 
 ---@class DapConfigResult : DapConfig
 
+---@class LogConfig
+---@field level 'debug' | 'info' | 'warn' | 'error'
+
+---@class LogConfigResult : LogConfig
+
+---@class MemoryConfig
+---@field track boolean
+---@field frames integer
+
+---@class MemoryConfigResult : MemoryConfig
+
 ---@class NotifyConfig
 ---@field enabled boolean
 ---@field verbosity 'TRACE' | 'DEBUG' | 'INFO' | 'WARN' | 'ERROR' | 'OFF' | 0 | 1 | 2 | 3 | 4 | 5
@@ -19,9 +31,30 @@ local M = {}
 
 ---@class WatchConfig
 ---@field enabled boolean
+---@field backend 'neovim' | 'blender'
+---@field debounce number
+---@field data_files string[] # Glob patterns of the non-Python files that trigger a reload, with the 'blender' backend
 
 ---@class WatchConfigResult : WatchConfig
 
+---@class StartupConfig
+---@field fast boolean
+---@field prewarm boolean
+
+---@class StartupConfigResult : StartupConfig
+
+---@class ReloadConfig
+---@field incremental boolean
+
+---@class ReloadConfigResult : ReloadConfig
+
+---@class PoolConfig
+---@field size integer
+---@field recycle_after integer
+---@field reset 'homefile' | 'factory' | 'none'
+
+---@class PoolConfigResult : PoolConfig
+
 ---@class UiConfig
 ---@field output_panel { height: number }
 
@@ -32,15 +65,25 @@ local M = {}
 ---@class Config
 ---@field profiles (ProfileParams|ProfileGenerator)[]|ProfileGenerator
 ---@field dap DapConfig
+---@field log LogConfig
+---@field memory MemoryConfig
 ---@field notify NotifyConfig
 ---@field watch WatchConfig
+---@field startup StartupConfig
+---@field reload ReloadConfig
+---@field pool PoolConfig
 ---@field ui UiConfig
 
 ---@class ConfigResult
 ---@field profiles ProfileParams[]
 ---@field dap DapConfigResult
+---@field log LogConfigResult
+---@field memory MemoryConfigResult
 ---@field notify NotifyConfigResult
 ---@field watch WatchConfigResult
+---@field startup StartupConfigResult
+---@field reload ReloadConfigResult
+---@field pool PoolConfigResult
 ---@field ui UiConfigResult
 
 ---@class ConfigModule : ConfigResult
@@ -62,6 +105,8 @@ M.schema = Schema(function(s)
             extra_args = vx.optional(vx.list.of(vx.string)),
             enable_dap = vx.optional(vx.bool),
             watch = vx.optional(vx.bool),
+            fast_start = vx.optional(vx.bool),
+            prewarm = vx.optional(vx.bool),
           },
           vx.callable,
         }),
@@ -78,6 +123,14 @@ M.schema = Schema(function(s)
     ),
     dap = {
       enabled = s:entry(true, vx.bool),
+      lazy = s:entry(true, vx.bool),
+    },
+    log = {
+      level = s:entry('info', vx.any { 'debug', 'info', 'warn', 'error' }),
+    },
+    memory = {
+      track = s:entry(false, vx.bool),
+      frames = s:entry(1, vx.number.natural),
     },
     notify = {
       enabled = s:entry(true, vx.bool),
@@ -96,6 +149,21 @@ M.schema = Schema(function(s)
     },
     watch = {
       enabled = s:entry(true, vx.bool),
+      backend = s:entry('neovim', vx.any { 'neovim', 'blender' }),
+      debounce = s:entry(0.2, vx.number.positive),
+      data_files = s:entry({}, vx.list.of(vx.string)),
+    },
+    startup = {
+      fast = s:entry(false, vx.bool),
+      prewarm = s:entry(false, vx.bool),
+    },
+    reload = {
+      incremental = s:entry(false, vx.bool),
+    },
+    pool = {
+      size = s:entry(2, vx.number.positive),
+      recycle_after = s:entry(20, vx.number),
+      reset = s:entry('homefile', vx.any { 'homefile', 'factory', 'none' }),
     },
     ui = {
       output_panel = {
@@ -1,36 +1,96 @@
 local notify = require 'blender.notify'
 
 ---@class Manager
----@field task Task?
+---@field task Task? # The active task, which actions apply to by default
+---@field tasks table<integer, Task> # Every task started by the manager, by id
 local M = {
   task = nil,
+  tasks = {},
 }
 
+---Forget exited tasks, except for the active one
+local prune = function()
+  for id, task in pairs(M.tasks) do
+    if task ~= M.task and task.status ~= 'running' and task.status ~= 'waiting' then
+      M.tasks[id] = nil
+    end
+  end
+end
+
+---Start a task and make it the active one
 ---@param task Task
-M.start_task = function(task)
-  if M.has_running_task() then
+---@param opts? { allow_concurrent?: boolean } # start even if other tasks are running
+M.start_task = function(task, opts)
+  if M.has_running_task() and not (opts and opts.allow_concurrent) then
     notify('A task is already running', 'ERROR')
     return
   end
+  prune()
+  M.tasks[task.id] = task
   M.task = task
   M.task:start()
 end
 
-M.stop_task = function()
-  if M.has_running_task() then
-    M.task:stop()
+---Stop a task, the active one by default
+---@param task? Task
+M.stop_task = function(task)
+  task = task or M.task
+  if task and task.status == 'running' then
+    task:stop()
+  end
+end
+
+M.stop_all = function()
+  for _, task in ipairs(M.get_running_tasks()) do
+    task:stop()
   end
 end
 
 M.has_running_task = function()
-  return M.task and M.task.status == 'running'
+  return #M.get_running_tasks() > 0
 end
 
+---The active task if it is running, otherwise the most recently started running task
+---@return Task?
 M.get_running_task = function()
-  if M.has_running_task() then
+  if M.task and M.task.status == 'running' then
     return M.task
   end
-  return nil
+  local running = M.get_running_tasks()
+  return running[#running]
+end
+
+---@return Task[] # ordered by id
+M.get_running_tasks = function()
+  local running = {}
+  for _, task in pairs(M.tasks) do
+    if task.status == 'running' then
+      table.insert(running, task)
+    end
+  end
+  table.sort(running, function(a, b)
+    return a.id < b.id
+  end)
+  return running
+end
+
+---@param id integer
+---@return Task?
+M.get_task = function(id)
+  return M.tasks[id]
+end
+
+---Make a task the one actions apply to by default
+---@param id integer
+---@return boolean
+M.set_active_task = function(id)
+  local task = M.tasks[id]
+  if not task then
+    notify('No Blender session with id ' .. id, 'ERROR')
+    return false
+  end
+  M.task = task
+  return true
 end
 
 return M
@@ -0,0 +1,230 @@
+local Task = require 'blender.task'
+local config = require 'blender.config'
+local notify = require 'blender.notify'
+
+---@class PoolJobParams
+---@field path? string # Script to run
+---@field source? string # Code to run, instead of a path
+---@field args? table # Passed to the script as JOB_ARGS
+---@field discover? { pattern?: string, start?: string } # Discover the add-on's tests instead, see blender.test
+---@field tests? string[] # Run these tests instead, see blender.test
+---@field test_run? integer # The test run the results are streamed to
+
+---@class PoolJobResult
+---@field job_id integer
+---@field ok boolean
+---@field error? string
+---@field duration number
+---@field reset_duration number
+---@field tests? string[] # Discovered test ids
+---@field errors? { id: string, message: string }[] # Test modules that failed to import
+---@field counts? table<TestOutcome, integer> # Outcomes of the tests run
+
+---@class PoolJob
+---@field id integer
+---@field params PoolJobParams
+---@field on_done? fun(result: PoolJobResult)
+
+---@class PoolWorker
+---@field task Task
+---@field client? RpcClient
+---@field job? PoolJob
+---@field jobs_run integer
+---@field retiring boolean
+
+---@class Pool
+---@field profile Profile
+---@field size integer
+---@field recycle_after integer
+---@field reset 'homefile' | 'factory' | 'none'
+---@field workers table<integer, PoolWorker> # keyed by task id
+---@field queue PoolJob[]
+---@field running boolean
+---@field private _jobs table<integer, PoolWorker> # running jobs, keyed by job id
+local Pool = {}
+
+local next_job_id = 1
+
+local M = {
+  ---@type Pool?
+  pool = nil,
+}
+
+---@param profile Profile
+---@return Pool
+function Pool.create(profile)
+  return setmetatable({
+    profile = profile,
+    size = config.pool.size,
+    recycle_after = config.pool.recycle_after,
+    reset = config.pool.reset,
+    workers = {},
+    queue = {},
+    running = false,
+    _jobs = {},
+  }, { __index = Pool })
+end
+
+function Pool:start()
+  if self.running then
+    return
+  end
+  self.running = true
+  for _ = 1, self.size do
+    self:_spawn()
+  end
+  notify(('Starting %d Blender workers'):format(self.size), 'TRACE')
+end
+
+function Pool:stop()
+  self.running = false
+  for _, worker in pairs(self.workers) do
+    self:_retire(worker)
+  end
+  for _, job in ipairs(self.queue) do
+    if job.on_done then
+      job.on_done { job_id = job.id, ok = false, error = 'Pool stopped', duration = 0, reset_duration = 0 }
+    end
+  end
+  self.queue = {}
+end
+
+function Pool:_spawn()
+  local cmd = self.profile:get_worker_cmd()
+  if not cmd then
+    self.running = false
+    return
+  end
+  local task = Task.create {
+    cmd = cmd,
+    cwd = vim.fn.getcwd(),
+    env = self.profile:get_env {
+      BLENDER_NVIM_ENABLE_DAP = 'no',
+      BLENDER_NVIM_WORKER = 'yes',
+      BLENDER_NVIM_WORKER_RESET = self.reset,
+    },
+    profile = self.profile,
+  }
+  ---@type PoolWorker
+  local worker = { task = task, client = nil, job = nil, jobs_run = 0, retiring = false }
+  self.workers[task.id] = worker
+  task:once('exit', function()
+    self:_on_exit(worker)
+  end)
+  task:start()
+end
+
+---@param worker PoolWorker
+function Pool:_retire(worker)
+  worker.retiring = true
+  if worker.client then
+    worker.client:notify('stop', {})
+  else
+    worker.task:stop()
+  end
+end
+
+---@param worker PoolWorker
+function Pool:_on_exit(worker)
+  self.workers[worker.task.id] = nil
+  local job = worker.job
+  if job then
+    self._jobs[job.id] = nil
+    if job.on_done then
+      job.on_done { job_id = job.id, ok = false, error = 'Worker exited', duration = 0, reset_duration = 0 }
+    end
+  end
+  if not worker.retiring then
+    notify('Blender worker exited unexpectedly with code: ' .. tostring(worker.task.exit_code), 'WARN')
+  end
+  if self.running and vim.tbl_count(self.workers) < self.size then
+    self:_spawn()
+  end
+end
+
+---@param task_id integer
+---@param client RpcClient
+---@return boolean # whether the task belongs to this pool
+function Pool:attach(task_id, client)
+  local worker = self.workers[task_id]
+  if not worker then
+    return false
+  end
+  worker.client = client
+  worker.task:attach_client(client)
+  self:_dispatch()
+  return true
+end
+
+---@param params PoolJobParams
+---@param on_done? fun(result: PoolJobResult)
+---@return integer # the job id
+function Pool:submit(params, on_done)
+  local job = { id = next_job_id, params = params, on_done = on_done }
+  next_job_id = next_job_id + 1
+  table.insert(self.queue, job)
+  self:_dispatch()
+  return job.id
+end
+
+function Pool:_dispatch()
+  for _, worker in pairs(self.workers) do
+    if #self.queue == 0 then
+      return
+    end
+    if worker.client and not worker.job and not worker.retiring then
+      local job = table.remove(self.queue, 1)
+      worker.job = job
+      self._jobs[job.id] = worker
+      worker.client:notify('job', vim.tbl_extend('force', job.params, { job_id = job.id }))
+    end
+  end
+end
+
+---@param result PoolJobResult
+function Pool:job_done(result)
+  local worker = self._jobs[result.job_id]
+  if not worker then
+    return
+  end
+  self._jobs[result.job_id] = nil
+  local job = worker.job
+  worker.job = nil
+  worker.jobs_run = worker.jobs_run + 1
+  if job and job.on_done then
+    job.on_done(result)
+  end
+  if self.recycle_after > 0 and worker.jobs_run >= self.recycle_after then
+    -- the replacement is spawned once the worker has exited
+    self:_retire(worker)
+  end
+  self:_dispatch()
+end
+
+---@param profile Profile
+---@return Pool
+M.start = function(profile)
+  if M.pool and M.pool.running then
+    return M.pool
+  end
+  M.pool = Pool.create(profile)
+  M.pool:start()
+  return M.pool
+end
+
+M.stop = function()
+  if M.pool then
+    M.pool:stop()
+    M.pool = nil
+  end
+end
+
+---@return Pool?
+M.get = function()
+  if M.pool and M.pool.running then
+    return M.pool
+  end
+  return nil
+end
+
+return M
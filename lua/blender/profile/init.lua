@@ -13,6 +13,8 @@ local notify = require 'blender.notify'
 ---@field extra_args? string[] # Extra arguments to pass to the command
 ---@field enable_dap? boolean # Whether to enable debugging with DAP
 ---@field watch? boolean # Whether to watch for changes and reload the addon
+---@field fast_start? boolean # Whether to defer non-essential startup work until Blender's window is up
+---@field prewarm? boolean # Whether to compile add-ons and import their dependencies in background threads
 
 ---@class Profile : ProfileParams
 ---@field cmd string[]
@@ -44,6 +46,8 @@ function Profile.create(params)
     extra_args = { params.extra_args, 'table', true },
     enable_dap = { params.enable_dap, 'boolean', true },
     watch = { params.watch, 'boolean', true },
+    fast_start = { params.fast_start, 'boolean', true },
+    prewarm = { params.prewarm, 'boolean', true },
     env = { params.env, 'table', true },
   }
   local cmd = type(params.cmd) == 'table' and params.cmd --[[ @as string[] ]]
@@ -71,6 +75,8 @@ function Profile.create(params)
     extra_args = params.extra_args,
     enable_dap = params.enable_dap,
     watch = params.watch,
+    fast_start = params.fast_start,
+    prewarm = params.prewarm,
     env = params.env or {},
   }, { __index = Profile })
 end
@@ -170,7 +176,53 @@ function Profile:dap_enabled()
   return config.dap.enabled
 end
 
-function Profile:launch()
+---@param extra? table<string, string> # Additional environment variables
+---@return table<string, string>
+function Profile:get_env(extra)
+  return vim.tbl_extend('force', vim.fn.environ(), self.env, {
+    BLENDER_NVIM_ENABLE_DAP = self:dap_enabled() and 'yes' or 'no',
+    BLENDER_NVIM_FAST_START = self:fast_start_enabled() and 'yes' or 'no',
+    BLENDER_NVIM_PREWARM = self:prewarm_enabled() and 'yes' or 'no',
+    BLENDER_NVIM_LOG_LEVEL = config.log.level,
+    BLENDER_NVIM_TRACK_MEMORY = config.memory.track and 'yes' or 'no',
+    BLENDER_NVIM_MEMORY_FRAMES = tostring(config.memory.frames),
+    BLENDER_NVIM_ADDONS_TO_LOAD = vim.json.encode(self:get_paths().path_mappings),
+    BLENDER_NVIM_RPC_SOCKET = rpc.get_server():get_socket(),
+  }, extra or {})
+end
+
+---Get the command to start a headless Blender worker, see `blender.pool`
+---@return string[]|nil
+function Profile:get_worker_cmd()
+  local args = self:get_launch_args()
+  if not args then
+    return
+  end
+  ---@type string[]
+  local worker_cmd = {}
+  vim.list_extend(worker_cmd, self.cmd)
+  -- --background must come before --python for Blender to honor it
+  table.insert(worker_cmd, '--background')
+  vim.list_extend(worker_cmd, args)
+  return worker_cmd
+end
+
+function Profile:fast_start_enabled()
+  if self.fast_start ~= nil then
+    return self.fast_start
+  end
+  return config.startup.fast
+end
+
+function Profile:prewarm_enabled()
+  if self.prewarm ~= nil then
+    return self.prewarm
+  end
+  return config.startup.prewarm
+end
+
+---@param opts? { allow_concurrent?: boolean } # launch even if other Blender sessions are running
+function Profile:launch(opts)
   local launch_cmd = self:get_full_cmd()
   if not launch_cmd then
     return
@@ -178,14 +230,10 @@ function Profile:launch()
   local task = Task.create {
     cmd = launch_cmd,
     cwd = vim.fn.getcwd(),
-    env = vim.tbl_extend('force', vim.fn.environ(), self.env, {
-      BLENDER_NVIM_ENABLE_DAP = self:dap_enabled() and 'yes' or 'no',
-      BLENDER_NVIM_ADDONS_TO_LOAD = vim.json.encode(self:get_paths().path_mappings),
-      BLENDER_NVIM_RPC_SOCKET = rpc.get_server():get_socket(),
-    }),
+    env = self:get_env(),
     profile = self,
   }
-  manager.start_task(task)
+  manager.start_task(task, opts)
   if self.watch or (self.watch == nil and config.watch.enabled) then
     task:watch(self:get_watch_patterns())
   end
@@ -0,0 +1,90 @@
+local notify = require 'blender.notify'
+
+---@class ChangeFeedParams
+---@field id_types? string[] # Only report these ID types, e.g. { 'Object', 'Mesh' } (default: all)
+---@field interval? number # Minimum seconds between messages (default and minimum: 1/30)
+---@field properties? string[] # Properties to watch through msgbus, e.g. { 'Object.location' }
+
+---@class ChangedId
+---@field id_type string # e.g. 'Object', 'Mesh'
+---@field name string
+---@field changed ('transform' | 'geometry' | 'shading')[] # empty for other updates
+
+---@class ChangedProperty
+---@field id_type string
+---@field property string
+
+---@class ChangeSet
+---@field ids ChangedId[]
+---@field properties ChangedProperty[] # msgbus doesn't say which ID changed, only the property
+---@field truncated boolean # more IDs changed than fit in one message
+---@field missed integer # messages dropped by Blender since the previous one; re-query when > 0
+
+---@alias ChangeFeedHandler fun(changes: ChangeSet)
+
+---@class ChangeFeedSubscription
+---@field client RpcClient
+---@field handler ChangeFeedHandler
+---@field seq integer
+
+local M = {
+  ---@type table<integer, ChangeFeedSubscription>
+  subscriptions = {},
+}
+
+---Subscribe to changes of Blender data
+---@param client RpcClient
+---@param params ChangeFeedParams
+---@param handler ChangeFeedHandler
+---@return integer? # the subscription id
+M.subscribe = function(client, params, handler)
+  local ok, result = pcall(client.request, client, 'subscribe_changes', params)
+  if not ok then
+    notify('Failed to subscribe to Blender changes: ' .. tostring(result), 'ERROR')
+    return
+  end
+  M.subscriptions[result.subscription] = { client = client, handler = handler, seq = 0 }
+  return result.subscription
+end
+
+---@param subscription_id integer
+M.unsubscribe = function(subscription_id)
+  local subscription = M.subscriptions[subscription_id]
+  if not subscription then
+    return
+  end
+  M.subscriptions[subscription_id] = nil
+  subscription.client:notify('unsubscribe_changes', { subscription = subscription_id })
+end
+
+---Forget the subscriptions of a client, e.g. when its Blender exits
+---@param client RpcClient
+M.clear = function(client)
+  for id, subscription in pairs(M.subscriptions) do
+    if subscription.client == client then
+      M.subscriptions[id] = nil
+    end
+  end
+end
+
+---@class RpcChangesParams : ChangeSet
+---@field subscription integer
+---@field seq integer
+
+---@param params RpcChangesParams
+M.on_changes = function(params)
+  local subscription = M.subscriptions[params.subscription]
+  if not subscription then
+    return
+  end
+  local missed = params.seq - subscription.seq - 1
+  subscription.seq = params.seq
+  subscription.handler {
+    ids = params.ids,
+    properties = params.properties,
+    truncated = params.truncated,
+    missed = missed,
+  }
+end
+
+return M
@@ -1,3 +1,5 @@
+local config = require 'blender.config'
+
 ---@class RpcClientParams
 ---@field python_exe string
 ---@field blender_path string
@@ -5,6 +7,7 @@
 ---@field scripts_folder string
 ---@field path_mappings unknown[]
 ---@field channel_id number
+---@field dap_available? boolean # Whether the debugger can be started with start_debugger()
 
 ---@class RpcClient : RpcClientParams
 local RpcClient = {}
@@ -19,14 +22,16 @@ function RpcClient.create(params)
     scripts_folder = params.scripts_folder,
     path_mappings = params.path_mappings,
     channel_id = params.channel_id,
+    dap_available = params.dap_available,
   }, { __index = RpcClient })
   return self
 end
 
 ---@param name string
 ---@param ... any
+---@return any
 function RpcClient:request(name, ...)
-  vim.fn.rpcrequest(self.channel_id, name, ...)
+  return vim.fn.rpcrequest(self.channel_id, name, ...)
 end
 
 ---@param name string
@@ -35,7 +40,22 @@ function RpcClient:notify(name, ...)
   vim.fn.rpcnotify(self.channel_id, name, ...)
 end
 
-function RpcClient:reload_addon()
+---@class RpcDapStartResult
+---@field host string
+---@field port integer
+---@field attached boolean # whether a debug client is already attached
+
+---Start Blender's debugpy listener, if it isn't already, and return its address
+---@return RpcDapStartResult
+function RpcClient:start_debugger()
+  return self:request('dap_start', {})
+end
+
+---@alias RpcProfileMode 'cprofile' | 'sample'
+
+---@param opts? { profile?: RpcProfileMode } # profile enabling the add-on, including its register()
+function RpcClient:reload_addon(opts)
+  opts = opts or {}
   return self:notify('reload', {
     names = vim
       .iter(self.path_mappings)
@@ -43,7 +63,103 @@ function RpcClient:reload_addon()
         return vim.fn.fnamemodify(mapping.load, ':t')
       end)
       :totable(),
+    incremental = config.reload.incremental,
+    profile = opts.profile,
   })
 end
 
+---@class RpcWatchFilesResult
+---@field backend 'inotify' | 'poll'
+---@field paths string[] # The add-on source directories being watched
+
+---Watch the add-on sources from inside Blender, reloading the add-ons when they change
+---`debounce` is the seconds without changes before reloading, `data_files` glob patterns of non-Python files to watch
+---@param opts? { debounce?: number, data_files?: string[] }
+---@return RpcWatchFilesResult
+function RpcClient:watch_files(opts)
+  return self:request('watch_files', {
+    incremental = config.reload.incremental,
+    debounce = opts and opts.debounce,
+    data_files = opts and opts.data_files,
+  })
+end
+
+function RpcClient:unwatch_files()
+  return self:notify('unwatch_files', {})
+end
+
+---@class RpcRunSourceParams
+---@field source string # The code to run
+---@field path? string # The file the code was taken from, used for tracebacks and breakpoints
+---@field name? string # Name used for the pseudo-filename when there is no path
+---@field first_line? integer # Line number of the first line of the code in the file
+---@field profile? RpcProfileMode # Profile the script and send back its hottest functions
+
+---@param params RpcRunSourceParams
+function RpcClient:run_source(params)
+  return self:notify('run_source', params)
+end
+
+---Cancel a running script. Without an id, every generator script is cancelled
+---and a plain script that is still running is interrupted.
+---@param script_id? integer
+function RpcClient:cancel(script_id)
+  return self:notify('cancel', { script = script_id })
+end
+
+---@alias RpcLogLevel 'debug' | 'info' | 'warn' | 'error'
+
+---Set the level of Blender.nvim's own log messages in Blender, or just get it
+---@param level? RpcLogLevel
+---@return { level: RpcLogLevel }
+function RpcClient:log_level(level)
+  return self:request('log_level', { level = level })
+end
+
+---@class RpcMemoryStatus
+---@field enabled boolean
+---@field traced integer # bytes currently traced by tracemalloc
+---@field peak integer
+
+---Start or stop tracking memory growth across reloads and script runs, or just
+---get the tracking status
+---@param enabled? boolean
+---@param frames? integer # Stack frames stored per allocation
+---@return RpcMemoryStatus
+function RpcClient:memory_tracking(enabled, frames)
+  return self:request('memory_tracking', { enabled = enabled, frames = frames })
+end
+
+---@alias RpcQueryOp '==' | '!=' | '<' | '<=' | '>' | '>=' | 'in' | 'contains' | 'startswith' | 'endswith' | 'glob'
+
+---@class RpcQueryParams
+---@field path string # Data path of a collection relative to bpy.data, e.g. 'objects' or 'scenes["Scene"].view_layers'
+---@field filter? { [1]: string, [2]: RpcQueryOp, [3]: any }[] # Field, operator and value; every filter must match
+---@field fields? string[] # Data paths to return for each item (default: { 'name' })
+---@field order_by? string # Field to sort by, prefixed with '-' for descending
+---@field offset? integer # Number of matching items to skip (default: 0)
+---@field limit? integer # Maximum number of items to return (default: 100)
+---@field count? boolean # Also return the total number of matching items
+
+---@class RpcQueryResult
+---@field path string
+---@field items table<string, any>[]
+---@field offset integer
+---@field next_offset? integer # Offset of the next page, nil on the last page
+---@field total? integer # Set when counting or sorting
+
+---@param params RpcQueryParams
+---@return RpcQueryResult
+function RpcClient:query(params)
+  return self:request('query', params)
+end
+
+---Subscribe to changes of Blender data, see blender.rpc.changes
+---@param params ChangeFeedParams
+---@param handler ChangeFeedHandler
+---@return integer? # the subscription id
+function RpcClient:subscribe_changes(params, handler)
+  return require('blender.rpc.changes').subscribe(self, params, handler)
+end
+
 return RpcClient
@@ -0,0 +1,218 @@
+local notify = require 'blender.notify'
+
+---@class DataStreamParams
+---@field id_type string # bpy.data collection, e.g. 'meshes', 'images'
+---@field name string # Name of the ID in the collection
+---@field path? string # Data path relative to the ID, e.g. 'vertices'
+---@field attribute? string # Attribute of each collection item to read, e.g. 'co'
+---@field chunk_size? integer # Bytes per chunk
+
+---@class DataStreamInfo
+---@field stream_id integer
+---@field dtype 'float32' | 'int32' | 'bool'
+---@field shape integer[]
+---@field nbytes integer
+
+---@class DataStreamHandlers
+---@field on_ready? fun(info: DataStreamInfo)
+---@field on_chunk fun(chunk: string, seq: integer) # chunk is the raw bytes of the buffer slice
+---@field on_done? fun()
+---@field on_error? fun(message: string)
+
+---@class DataChannel # The connection to one Blender session's data channel
+---@field address string
+---@field pipe uv.uv_pipe_t | uv.uv_tcp_t
+---@field unpacker function # keeps partial frames between reads
+---@field pending integer # chunks handed to vim.schedule but not yet delivered
+---@field paused boolean
+---@field streams table<integer, true> # streams that were announced on this channel
+
+local M = {
+  ---@type table<integer, DataStreamHandlers>
+  streams = {},
+  ---@type table<integer, DataChannel> # by session
+  channels = {},
+}
+
+-- Stop reading from the socket while this many chunks are waiting to be
+-- delivered; the Blender side then blocks on send, which is the backpressure.
+local max_pending = 4
+
+local next_stream_id = 1
+
+---@param session integer
+---@param channel DataChannel
+local function reader(session, channel)
+  local read_cb
+  read_cb = function(err, data)
+    if err or not data then
+      if M.channels[session] == channel then
+        M.close(err or 'Data channel closed', session)
+      end
+      return
+    end
+    local pos = 1
+    while pos <= #data do
+      local frame
+      frame, pos = channel.unpacker(data, pos)
+      if frame == nil then
+        break
+      end
+      local stream_id, seq, last, chunk = frame[1], frame[2], frame[3], frame[4]
+      local handlers = M.streams[stream_id]
+      if last then
+        M.streams[stream_id] = nil
+        channel.streams[stream_id] = nil
+      end
+      if handlers then
+        channel.pending = channel.pending + 1
+        vim.schedule(function()
+          channel.pending = channel.pending - 1
+          handlers.on_chunk(chunk, seq)
+          if last and handlers.on_done then
+            handlers.on_done()
+          end
+          if channel.paused and channel.pending < max_pending and M.channels[session] == channel then
+            channel.paused = false
+            channel.pipe:read_start(read_cb)
+          end
+        end)
+      end
+    end
+    if channel.pending >= max_pending then
+      channel.paused = true
+      channel.pipe:read_stop()
+    end
+  end
+  return read_cb
+end
+
+---@param channel DataChannel
+local function close_pipe(channel)
+  channel.pipe:read_stop()
+  if not channel.pipe:is_closing() then
+    channel.pipe:close()
+  end
+end
+
+---@param session integer
+---@param family 'unix' | 'tcp'
+---@param address string
+---@return DataChannel
+local function connect(session, family, address)
+  local current = M.channels[session]
+  if current and current.address == address then
+    return current
+  end
+  if current then
+    -- Blender restarted its data channel, the old one is gone
+    M.close(nil, session)
+  end
+  ---@type DataChannel
+  local channel = {
+    address = address,
+    pipe = family == 'unix' and assert(vim.uv.new_pipe(false)) or assert(vim.uv.new_tcp()),
+    unpacker = vim.mpack.Unpacker(),
+    pending = 0,
+    paused = false,
+    streams = {},
+  }
+  M.channels[session] = channel
+  local on_connect = function(err)
+    if err then
+      if M.channels[session] == channel then
+        M.close(err, session)
+      end
+      return
+    end
+    channel.pipe:read_start(reader(session, channel))
+  end
+  if family == 'unix' then
+    channel.pipe:connect(address, on_connect)
+  else
+    local host, port = address:match '^(.*):(%d+)$'
+    channel.pipe:connect(host, tonumber(port), on_connect)
+  end
+  return channel
+end
+
+---Close the data channel of a session, or of every session, failing the
+---streams in progress on it
+---@param reason? string
+---@param session? integer
+M.close = function(reason, session)
+  local failed = {}
+  for key, channel in pairs(M.channels) do
+    if session == nil or key == session then
+      close_pipe(channel)
+      M.channels[key] = nil
+      for stream_id in pairs(channel.streams) do
+        failed[#failed + 1] = M.streams[stream_id]
+        M.streams[stream_id] = nil
+      end
+    end
+  end
+  if session == nil then
+    -- including the streams that Blender hasn't announced yet
+    for _, handlers in pairs(M.streams) do
+      failed[#failed + 1] = handlers
+    end
+    M.streams = {}
+  end
+  if reason then
+    vim.schedule(function()
+      for _, handlers in ipairs(failed) do
+        if handlers.on_error then
+          handlers.on_error(reason)
+        end
+      end
+    end)
+  end
+end
+
+---Stream a bpy property from Blender as raw binary chunks
+---@param client RpcClient
+---@param params DataStreamParams
+---@param handlers DataStreamHandlers
+---@return integer # the stream id
+M.stream = function(client, params, handlers)
+  local stream_id = next_stream_id
+  next_stream_id = next_stream_id + 1
+  M.streams[stream_id] = handlers
+  client:notify('data_stream', vim.tbl_extend('force', params, { stream_id = stream_id }))
+  return stream_id
+end
+
+---@class RpcDataStreamReadyParams : DataStreamInfo
+---@field family 'unix' | 'tcp'
+---@field address string
+---@field session? integer
+
+---@param params RpcDataStreamReadyParams
+M.on_ready = function(params)
+  local handlers = M.streams[params.stream_id]
+  local channel = connect(params.session or 0, params.family, params.address)
+  if handlers then
+    channel.streams[params.stream_id] = true
+  end
+  if handlers and handlers.on_ready then
+    handlers.on_ready(params)
+  end
+end
+
+---@param stream_id integer
+---@param message string
+M.on_error = function(stream_id, message)
+  local handlers = M.streams[stream_id]
+  M.streams[stream_id] = nil
+  for _, channel in pairs(M.channels) do
+    channel.streams[stream_id] = nil
+  end
+  if handlers and handlers.on_error then
+    handlers.on_error(message)
+  else
+    notify('Data stream failed: ' .. message, 'ERROR')
+  end
+end
+
+return M
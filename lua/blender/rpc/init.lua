@@ -49,7 +49,12 @@ end
 M.handlers = {}
 
 ---@class RpcMessage
----@field type 'setup' | 'setup_debugpy' | 'addon_updated' | 'enable_failure' | 'disable_failure'
+---@field session? integer # The Blender session (task id) the message came from
+---@field type 'setup' | 'setup_debugpy' | 'addons_updated' | 'enable_failure' | 'disable_failure' | 'job_done' | 'startup_complete' | 'data_stream_ready' | 'data_stream_error' | 'messages_dropped' | 'trace_exported' | 'trace_export_failure' | 'profile_result' | 'addons_loaded' | 'changes' | 'script_progress' | 'script_done' | 'dap_detached' | 'output' | 'test_result' | 'memory_report'
+
+---@class RpcStartupTimings
+---@field stages table<string, number> # seconds spent in each startup stage
+---@field total number
 
 ---@class RpcSetupParams : RpcMessage
 ---@field type 'setup'
@@ -58,8 +63,12 @@ M.handlers = {}
 ---@field blender_version string
 ---@field scripts_folder string
 ---@field path_mappings unknown[]
----@field task_id string
+---@field task_id number
+---@field session number
 ---@field channel_id number
+---@field worker boolean
+---@field dap boolean # whether the debugger can be started on demand
+---@field startup_timings RpcStartupTimings
 
 ---@param params RpcSetupParams
 M.handlers.setup = function(params)
@@ -79,17 +88,21 @@ M.handlers.setup = function(params)
     scripts_folder = params.scripts_folder,
     path_mappings = params.path_mappings,
     channel_id = params.channel_id,
+    dap_available = params.dap,
   }
-  local running_task = manager.get_running_task()
-  if not running_task then
-    notify('No running Blender task', 'ERROR')
+  if params.worker then
+    local pool = require('blender.pool').get()
+    if not pool or not pool:attach(params.task_id, rpc_client) then
+      notify('Received setup message for an unknown worker: ' .. params.task_id, 'ERROR')
+    end
     return
   end
-  if running_task.id ~= params.task_id then
+  local task = manager.get_task(params.task_id)
+  if not task or task.status ~= 'running' then
     notify('Received setup message for an unknown task: ' .. params.task_id, 'ERROR')
     return
   end
-  running_task:attach_client(rpc_client)
+  task:attach_client(rpc_client)
 end
 
 ---@class RpcSetupDebugpyParams : RpcMessage
@@ -103,24 +116,135 @@ M.handlers.setup_debugpy = function(params)
     host = { params.host, 'string' },
     port = { params.port, 'number' },
   }
-  local running_task = manager.get_running_task()
-  --TODO: Add task_id to the message
-  -- if running_task and running_task.id == task_id then
-  if running_task then
-    running_task:attach_debugger {
+  local task = params.session and manager.get_task(params.session) or manager.get_running_task()
+  if task then
+    task:attach_debugger {
       host = params.host,
       port = params.port,
     }
   end
 end
 
----@class RpcAddonUpdatedParams : RpcMessage
----@field type 'addon_updated'
+---@class RpcDapDetachedParams : RpcMessage
+---@field type 'dap_detached'
+
+---@param params RpcDapDetachedParams
+M.handlers.dap_detached = function(params)
+  local task = params.session and manager.get_task(params.session)
+  if task then
+    task:detach_debugger()
+  end
+end
+
+---@class RpcOutputChunk
+---@field source 'script' | 'addon' | 'internal'
+---@field level 'debug' | 'info' | 'warn' | 'error'
+---@field text string
+
+---@class RpcOutputParams : RpcMessage
+---@field type 'output'
+---@field chunks RpcOutputChunk[]
+---@field dropped integer # characters dropped from Blender's output buffer since the last message
 
----@param params RpcAddonUpdatedParams
-M.handlers.addon_updated = function(params)
-  local _ = params
-  notify('Addon updated', 'TRACE')
+---@param params RpcOutputParams
+M.handlers.output = function(params)
+  local task = params.session and manager.get_task(params.session)
+  if not task then
+    local pool = require('blender.pool').get()
+    local worker = pool and params.session and pool.workers[params.session]
+    task = worker and worker.task
+  end
+  if task then
+    task:write_output(params.chunks, params.dropped)
+  end
+end
+
+---@class RpcAddonReloadResult
+---@field name string
+---@field ok boolean
+---@field duration number
+---@field reloaded_modules number
+---@field restored_modules number # modules whose state was kept through the snapshot hooks
+---@field stage? 'disable' | 'enable'
+---@field error? string
+
+---@class RpcAddonsUpdatedParams : RpcMessage
+---@field type 'addons_updated'
+---@field addons RpcAddonReloadResult[]
+---@field duration number
+---@field changed? string[] # Files that triggered the reload, when Blender watches them (at most 50)
+---@field changed_count? integer # Unset when the watcher overflowed
+---@field overflow? boolean # More files changed than the watcher could track, so every addon was reloaded
+---@field latency? number # Seconds from Blender noticing the first change to the end of the reload
+
+---@param params RpcAddonsUpdatedParams
+M.handlers.addons_updated = function(params)
+  local timings = {}
+  for _, addon in ipairs(params.addons) do
+    if addon.ok then
+      local restored = (addon.restored_modules or 0) > 0 and (', %d restored'):format(addon.restored_modules) or ''
+      table.insert(
+        timings,
+        ('%s (%d modules%s, %.0fms)'):format(addon.name, addon.reloaded_modules, restored, addon.duration * 1000)
+      )
+    else
+      notify(('Failed to %s the Blender addon %s: %s'):format(addon.stage, addon.name, addon.error), 'ERROR')
+    end
+  end
+  if #timings > 0 then
+    local message = ('Addon updated in %.0fms: %s'):format(params.duration * 1000, table.concat(timings, ', '))
+    if params.overflow then
+      message = message
+        .. ('\nToo many files changed to track, reloaded %.0fms after the first change'):format(
+          (params.latency or 0) * 1000
+        )
+    elseif params.changed_count then
+      message = message
+        .. ('\n%d file%s changed, reloaded %.0fms after the first change'):format(
+          params.changed_count,
+          params.changed_count == 1 and '' or 's',
+          (params.latency or 0) * 1000
+        )
+    end
+    notify(message, 'TRACE')
+  end
+end
+
+---@class RpcAddonPrewarmTimings
+---@field compile number # seconds spent writing bytecode caches
+---@field imports number # seconds spent importing external dependencies
+---@field wait number # seconds the enable step waited for the prewarm to finish
+---@field imported string[]
+---@field failed string[]
+
+---@class RpcAddonLoadResult
+---@field name string
+---@field ok boolean
+---@field enable number # seconds spent enabling the add-on
+---@field prewarm? RpcAddonPrewarmTimings
+
+---@class RpcAddonsLoadedParams : RpcMessage
+---@field type 'addons_loaded'
+---@field addons RpcAddonLoadResult[]
+---@field duration number
+
+---@param params RpcAddonsLoadedParams
+M.handlers.addons_loaded = function(params)
+  local timings = {}
+  for _, addon in ipairs(params.addons) do
+    local timing = ('%s (enable %.0fms'):format(addon.name, addon.enable * 1000)
+    if addon.prewarm and addon.prewarm.compile then
+      timing = timing
+        .. (', prewarm %.0fms, waited %.0fms'):format(
+          (addon.prewarm.compile + addon.prewarm.imports) * 1000,
+          addon.prewarm.wait * 1000
+        )
+    end
+    table.insert(timings, timing .. ')')
+  end
+  if #timings > 0 then
+    notify(('Add-ons loaded in %.0fms: %s'):format(params.duration * 1000, table.concat(timings, ', ')), 'TRACE')
+  end
 end
 
 ---@class RpcEnableFailureParams : RpcMessage
@@ -141,16 +265,325 @@ M.handlers.disable_failure = function(params)
   notify('Failed to disable the Blender addon: ' .. params.message, 'ERROR')
 end
 
+---@class RpcStartupCompleteParams : RpcMessage
+---@field type 'startup_complete'
+---@field startup_timings RpcStartupTimings
+
+---@param params RpcStartupCompleteParams
+M.handlers.startup_complete = function(params)
+  local stages = {}
+  for name, duration in pairs(params.startup_timings.stages) do
+    table.insert(stages, ('%s=%.0fms'):format(name, duration * 1000))
+  end
+  table.sort(stages)
+  notify(
+    ('Blender started in %.0fms (%s)'):format(params.startup_timings.total * 1000, table.concat(stages, ', ')),
+    'TRACE'
+  )
+end
+
+---@param params RpcDataStreamReadyParams
+M.handlers.data_stream_ready = function(params)
+  require('blender.rpc.data').on_ready(params)
+end
+
+---@class RpcDataStreamErrorParams : RpcMessage
+---@field type 'data_stream_error'
+---@field stream_id integer
+---@field message string
+
+---@param params RpcDataStreamErrorParams
+M.handlers.data_stream_error = function(params)
+  require('blender.rpc.data').on_error(params.stream_id, params.message)
+end
+
+---@param params RpcChangesParams
+M.handlers.changes = function(params)
+  require('blender.rpc.changes').on_changes(params)
+end
+
+---@class RpcScriptProgressParams : RpcMessage
+---@field type 'script_progress' | 'script_done'
+---@field script integer
+---@field path string
+---@field name string
+---@field state 'running' | 'done' | 'cancelled' | 'failed'
+---@field progress? number # 0 to 1, as last yielded by the script
+---@field message? string # as last yielded by the script
+---@field elapsed number # seconds
+---@field error? string
+
+---@param params RpcScriptProgressParams
+M.handlers.script_progress = function(params)
+  local text = ('[Blender.nvim] %s'):format(params.name)
+  if params.progress then
+    text = text .. (' %3d%%'):format(math.floor(params.progress * 100))
+  end
+  if params.message then
+    text = text .. ' ' .. params.message
+  end
+  -- transient, so that frequent updates don't fill the message history
+  vim.api.nvim_echo({ { text } }, false, {})
+end
+
+---@param params RpcScriptProgressParams
+M.handlers.script_done = function(params)
+  if params.state == 'failed' then
+    notify(('%s failed:\n%s'):format(params.name, params.error or ''), 'ERROR')
+  elseif params.state == 'cancelled' then
+    notify(('%s cancelled after %.1fs'):format(params.name, params.elapsed), 'WARN')
+  else
+    notify(('%s finished in %.1fs'):format(params.name, params.elapsed), 'INFO')
+  end
+end
+
+---@class RpcJobDoneParams : RpcMessage, PoolJobResult
+---@field type 'job_done'
+
+---@class RpcTestResultParams : RpcMessage, TestResult
+---@field type 'test_result'
+---@field run integer
+
+---@param params RpcTestResultParams
+M.handlers.test_result = function(params)
+  require('blender.test').on_result(params)
+end
+
+---@class RpcMemoryGrowth
+---@field file string
+---@field line integer
+---@field size_diff integer # bytes
+---@field count_diff integer # allocated blocks
+---@field size integer
+
+---@class RpcStaleModule
+---@field module string
+---@field modules integer # old module objects still alive
+---@field functions integer
+---@field classes integer
+---@field count integer
+---@field new integer # how many more than before the reload or run
+---@field holders? string[] # What keeps the old objects alive, e.g. 'bpy.app.handlers.depsgraph_update_post'
+
+---@class RpcMemoryReportParams : RpcMessage
+---@field type 'memory_report'
+---@field label string # e.g. 'reload my_addon' or 'run script.py'
+---@field duration number
+---@field traced_before integer # bytes
+---@field traced_after integer
+---@field growth RpcMemoryGrowth[] # Allocation sites that grew the most
+---@field stale RpcStaleModule[]
+
+---@param params RpcMemoryReportParams
+M.handlers.memory_report = function(params)
+  local items = {}
+  for _, stale in ipairs(params.stale) do
+    if stale.new > 0 then
+      table.insert(items, {
+        text = ('%s: %d stale objects (%d modules, %d functions, %d classes) held by %s'):format(
+          stale.module,
+          stale.count,
+          stale.modules,
+          stale.functions,
+          stale.classes,
+          #(stale.holders or {}) > 0 and table.concat(stale.holders, ', ') or 'unknown'
+        ),
+        type = 'W',
+        user_data = stale,
+      })
+    end
+  end
+  for _, site in ipairs(params.growth) do
+    table.insert(items, {
+      filename = site.file,
+      lnum = site.line,
+      type = 'I',
+      text = ('+%.1f KiB in %+d blocks'):format(site.size_diff / 1024, site.count_diff),
+      user_data = site,
+    })
+  end
+  vim.fn.setqflist({}, ' ', { title = 'Blender memory: ' .. params.label, items = items })
+
+  local new_stale = 0
+  for _, stale in ipairs(params.stale) do
+    new_stale = new_stale + math.max(stale.new, 0)
+  end
+  local message = ('%s: %+.2f MiB traced'):format(
+    params.label,
+    (params.traced_after - params.traced_before) / (1024 * 1024)
+  )
+  if new_stale > 0 then
+    message = message .. (', %d new stale objects from previous imports'):format(new_stale)
+  end
+  notify(message .. '\nDetails are in the quickfix list', new_stale > 0 and 'WARN' or 'INFO')
+end
+
+---@param params RpcJobDoneParams
+M.handlers.job_done = function(params)
+  local pool = require('blender.pool').get()
+  if pool then
+    pool:job_done(params)
+  end
+end
+
+---@class RpcMessagesDroppedParams : RpcMessage
+---@field type 'messages_dropped'
+---@field count integer
+
+---@param params RpcMessagesDroppedParams
+M.handlers.messages_dropped = function(params)
+  notify(('Blender dropped %d low-priority messages'):format(params.count), 'WARN')
+end
+
+---@class RpcTraceExportedParams : RpcMessage
+---@field type 'trace_exported'
+---@field path string
+---@field format 'chrome' | 'json'
+---@field count integer
+
+---@param params RpcTraceExportedParams
+M.handlers.trace_exported = function(params)
+  notify(('Exported %d RPC traces to %s'):format(params.count, params.path), 'INFO')
+end
+
+---@class RpcTraceExportFailureParams : RpcMessage
+---@field type 'trace_export_failure'
+---@field message string
+
+---@param params RpcTraceExportFailureParams
+M.handlers.trace_export_failure = function(params)
+  notify('Failed to export RPC traces: ' .. params.message, 'ERROR')
+end
+
+---@class RpcProfileFunction
+---@field name string
+---@field file string # source path, or '~' for built-in functions
+---@field line integer
+---@field calls integer # calls (cprofile) or samples (sample)
+---@field self number # seconds spent in the function itself
+---@field cumulative number # seconds including the functions it called
+
+---@class RpcProfileResultParams : RpcMessage
+---@field type 'profile_result'
+---@field label string
+---@field mode 'cprofile' | 'sample'
+---@field duration number
+---@field path? string # the saved .pstats file
+---@field functions RpcProfileFunction[] # hottest first
+
+---@param params RpcProfileResultParams
+M.handlers.profile_result = function(params)
+  local items = {}
+  for _, fn in ipairs(params.functions) do
+    local text = ('%8.2fms self %8.2fms total %7d %s  %s'):format(
+      fn.self * 1000,
+      fn.cumulative * 1000,
+      fn.calls,
+      params.mode == 'sample' and 'samples' or 'calls',
+      fn.name
+    )
+    if vim.fn.filereadable(fn.file) == 1 then
+      table.insert(items, { filename = fn.file, lnum = fn.line, text = text })
+    else
+      table.insert(items, { text = fn.file .. ': ' .. text })
+    end
+  end
+  vim.fn.setqflist({}, ' ', { title = 'Blender profile: ' .. params.label, items = items })
+  local message = ('Profiled %s (%.0fms), hottest functions are in the quickfix list'):format(
+    params.label,
+    params.duration * 1000
+  )
+  if params.path then
+    message = message .. '\nStats saved to ' .. params.path
+  end
+  notify(message, 'INFO')
+end
+
 ---@param msg RpcMessage
-M.handle = function(msg)
+local dispatch = function(msg)
   local handler = M.handlers[msg.type]
   if not handler then
     notify('Received unknown RPC message type: "' .. msg.type .. '"', 'ERROR')
     return
   end
+  -- an error must not stop the messages queued after this one
+  local ok, err = pcall(handler, msg)
+  if not ok then
+    notify(('Failed to handle the RPC message "%s": %s'):format(msg.type, err), 'ERROR')
+  end
+end
+
+---Handle a single message sent by Blender
+---@param msg RpcMessage
+---@param session? integer
+M.handle = function(msg, session)
+  if not M.handlers[msg.type] then
+    notify('Received unknown RPC message type: "' .. msg.type .. '"', 'ERROR')
+    return
+  end
+  msg.session = msg.session or session
   vim.schedule(function()
-    handler(msg)
+    dispatch(msg)
   end)
 end
 
+-- Messages waiting to be handled, queued per session so that one Blender
+-- sending a burst of messages doesn't hold up the others. Handled messages
+-- are cleared from the front, so the length operator can't be used on items:
+-- they live between the head and tail indexes.
+---@type table<integer, { items: table<integer, RpcMessage>, head: integer, tail: integer }>
+local queues = {}
+---@type integer[] # sessions with queued messages, in round-robin order
+local ready = {}
+local draining = false
+-- Messages handled per session before moving on to the next one
+local slice = 64
+
+local drain
+drain = function()
+  local sessions = ready
+  ready = {}
+  for _, session in ipairs(sessions) do
+    local queue = queues[session]
+    local last = math.min(queue.head + slice - 1, queue.tail)
+    while queue.head <= last do
+      local msg = queue.items[queue.head]
+      queue.items[queue.head] = nil
+      queue.head = queue.head + 1
+      dispatch(msg)
+    end
+    if queue.head > queue.tail then
+      queues[session] = nil
+    else
+      table.insert(ready, session)
+    end
+  end
+  draining = #ready > 0
+  if draining then
+    vim.schedule(drain)
+  end
+end
+
+---Handle a batch of messages sent together by Blender
+---@param msgs RpcMessage[]
+---@param session? integer
+M.handle_batch = function(msgs, session)
+  local key = session or 0
+  local queue = queues[key]
+  if not queue then
+    queue = { items = {}, head = 1, tail = 0 }
+    queues[key] = queue
+    table.insert(ready, key)
+  end
+  for _, msg in ipairs(msgs) do
+    msg.session = msg.session or session
+    queue.tail = queue.tail + 1
+    queue.items[queue.tail] = msg
+  end
+  if not draining then
+    draining = true
+    vim.schedule(drain)
+  end
+end
+
 return M
@@ -33,8 +33,9 @@ local augroup = vim.api.nvim_create_augroup('blender.task', { clear = true })
 ---@field env table
 
 ---@class TaskWatchStatus
----@field autocmd_id integer
----@field pattern string[]
+---@field backend 'neovim' | 'blender'
+---@field autocmd_id? integer # set when Neovim watches for buffer writes
+---@field pattern string[] # patterns, or the directories Blender watches
 
 ---@class Task : TaskParams
 ---@field id integer
@@ -147,6 +148,29 @@ function Task:_handle_output(data)
   end, 10)
 end
 
+-- Terminal colors of Blender's output, by level
+local output_colors = {
+  debug = '\27[2m',
+  warn = '\27[33m',
+  error = '\27[31m',
+}
+
+---Write output captured in Blender, see RpcOutputParams
+---@param chunks RpcOutputChunk[]
+---@param dropped? integer # characters Blender dropped before they could be sent
+function Task:write_output(chunks, dropped)
+  local parts = {}
+  if dropped and dropped > 0 then
+    table.insert(parts, ('\27[33m[Blender.nvim] %d characters of output dropped\27[0m\r\n'):format(dropped))
+  end
+  for _, chunk in ipairs(chunks) do
+    local text = chunk.text:gsub('\r?\n', '\r\n')
+    local color = output_colors[chunk.level]
+    table.insert(parts, color and (color .. text .. '\27[0m') or text)
+  end
+  self:_handle_output { table.concat(parts) }
+end
+
 --- Based on Overseer's jobstart strategy implementation:
 --- https://github.com/stevearc/overseer.nvim/blob/b04b0b105c07b4f02b3073ea3a98d6eca90bf152/lua/overseer/strategy/jobstart.lua#L48
 ---Copyright (c) 2024 Steven Arcangeli
@@ -192,6 +216,9 @@ function Task:start()
         self.exit_code = code
         self._job_id = nil
         self.debugger_attached = false
+        if self.client then
+          require('blender.rpc.changes').clear(self.client)
+        end
         if code == 0 then
           notify('Task completed successfully', 'TRACE')
         else
@@ -248,6 +275,33 @@ end
 function Task:attach_client(client)
   self.client = client
   self:_dispatch { 'change', 'client_attach' }
+  if client.dap_available and not require('blender.config').dap.lazy then
+    vim.schedule(function()
+      self:start_debugger()
+    end)
+  end
+end
+
+---Start the debugger in Blender, if needed, and attach to it
+function Task:start_debugger()
+  if not self.client then
+    notify("Can't start debugger: No RPC client attached to the task", 'ERROR')
+    return
+  end
+  if not self.client.dap_available then
+    notify('Debugging is not enabled for this Blender session', 'ERROR')
+    return
+  end
+  if self.debugger_attached then
+    notify('Debugger is already attached', 'INFO')
+    return
+  end
+  local ok, result = pcall(self.client.start_debugger, self.client)
+  if not ok then
+    notify('Failed to start debugger: ' .. tostring(result), 'ERROR')
+    return
+  end
+  self:attach_debugger { host = result.host, port = result.port }
 end
 
 ---@param params { host: string, port: number }
@@ -292,7 +346,17 @@ function Task:get_dap_repl_buf()
   return dap.get_fallback_repl_buf()
 end
 
---TODO: Detect client/debugger detach
+---Called when Blender reports that the debug client went away
+function Task:detach_debugger()
+  if not self.debugger_attached then
+    return
+  end
+  self.debugger_attached = false
+  notify('Debugger detached', 'TRACE')
+  self:_dispatch 'change'
+end
+
+--TODO: Detect client detach
 
 ---Watch for changes, sending a reload command to the client when a
 ---buffer matching the pattern is written.
@@ -316,6 +380,14 @@ function Task:watch(pattern)
     notify('Cannot setup watch for ' .. self.status .. ' task', 'WARN')
     return
   end
+  if require('blender.config').watch.backend == 'blender' then
+    self.watch_status = { backend = 'blender', pattern = pattern_list }
+    self:once('exit', function()
+      self.watch_status = nil
+    end)
+    self:_watch_in_blender()
+    return
+  end
   --TODO: Make event(s) configurable
   local autocmd_id = vim.api.nvim_create_autocmd('BufWritePost', {
     group = augroup,
@@ -333,6 +405,7 @@ function Task:watch(pattern)
     self:unwatch()
   end)
   self.watch_status = {
+    backend = 'neovim',
     autocmd_id = autocmd_id,
     pattern = pattern_list,
   }
@@ -340,12 +413,48 @@ function Task:watch(pattern)
   self:_dispatch 'change'
 end
 
+---Let Blender watch the add-on sources itself, which also catches changes made
+---outside of Neovim, like a git checkout, and skips the round-trip for each change
+function Task:_watch_in_blender()
+  if self.watch_status == nil or self.status ~= 'running' then
+    return
+  end
+  if not self.client then
+    self:once('client_attach', function()
+      vim.schedule(function()
+        self:_watch_in_blender()
+      end)
+    end)
+    return
+  end
+  local watch_config = require('blender.config').watch
+  local ok, result = pcall(self.client.watch_files, self.client, {
+    debounce = watch_config.debounce,
+    data_files = watch_config.data_files,
+  })
+  if not ok then
+    self.watch_status = nil
+    notify('Failed to watch for changes in Blender: ' .. tostring(result), 'ERROR')
+    return
+  end
+  self.watch_status.pattern = result.paths
+  local paths = table.concat(result.paths, ', ')
+  notify(('Blender is watching for changes in %s (%s)'):format(paths, result.backend), 'TRACE')
+  self:_dispatch 'change'
+end
+
 function Task:unwatch()
   if self.watch_status == nil then
     notify('Not watching for changes', 'WARN')
     return
   end
-  vim.api.nvim_del_autocmd(self.watch_status.autocmd_id)
+  if self.watch_status.backend == 'blender' then
+    if self.client and self.status == 'running' then
+      self.client:unwatch_files()
+    end
+  else
+    vim.api.nvim_del_autocmd(self.watch_status.autocmd_id)
+  end
   self.watch_status = nil
   notify('Stopped watching for changes', 'TRACE')
   self:_dispatch 'change'
@@ -0,0 +1,236 @@
+local notify = require 'blender.notify'
+
+---@alias TestOutcome 'passed' | 'failed' | 'error' | 'skipped' | 'expected_failure' | 'unexpected_success'
+
+---@class TestResult
+---@field id string # Dotted unittest id, e.g. 'my_addon.tests.test_ops.TestOps.test_apply'
+---@field outcome TestOutcome
+---@field duration number # seconds
+---@field message? string # The end of the traceback, or the reason a test was skipped
+---@field file? string # Where a failing test failed, in the add-on sources
+---@field line? integer
+
+---@class TestRunOpts
+---@field pattern? string # Test file pattern (default: 'test*.py')
+---@field start? string # Directory to discover tests in, relative to the add-on (default: the whole add-on)
+---@field filter? string # Only run tests whose id contains this string
+
+---@class TestRun
+---@field id integer
+---@field total integer
+---@field results TestResult[]
+---@field counts table<TestOutcome, integer>
+---@field shards integer
+---@field shards_left integer
+---@field started_at integer # vim.uv.hrtime()
+---@field private _seen table<string, boolean>
+
+local M = {
+  ---@type TestRun?
+  run = nil,
+  ---Duration of each test in its last run, used to balance the shards
+  ---@type table<string, number>
+  durations = {},
+}
+
+-- Assumed duration of tests that haven't run yet, in seconds
+local default_duration = 0.05
+-- Slowest tests listed in the report
+local slowest_count = 10
+
+local next_run_id = 1
+
+---The test class of a test id: tests of a class go to the same shard, so that
+---its setUpClass() runs once
+---@param id string
+local function group_of(id)
+  return id:match '^(.*)%.[^.]+$' or id
+end
+
+---Split tests into at most `count` shards of about the same total duration,
+---assigning the longest groups first to the shard that has the least so far
+---@param tests string[]
+---@param count integer
+---@return string[][]
+M.shard = function(tests, count)
+  local groups, order = {}, {}
+  for _, id in ipairs(tests) do
+    local key = group_of(id)
+    if not groups[key] then
+      groups[key] = { tests = {}, duration = 0 }
+      table.insert(order, key)
+    end
+    table.insert(groups[key].tests, id)
+    groups[key].duration = groups[key].duration + (M.durations[id] or default_duration)
+  end
+  table.sort(order, function(a, b)
+    return groups[a].duration > groups[b].duration
+  end)
+  local shards = {}
+  for i = 1, math.min(count, #order) do
+    shards[i] = { tests = {}, duration = 0 }
+  end
+  for _, key in ipairs(order) do
+    local lightest = shards[1]
+    for _, shard in ipairs(shards) do
+      if shard.duration < lightest.duration then
+        lightest = shard
+      end
+    end
+    vim.list_extend(lightest.tests, groups[key].tests)
+    lightest.duration = lightest.duration + groups[key].duration
+  end
+  return vim.tbl_map(function(shard)
+    return shard.tests
+  end, shards)
+end
+
+---@param run TestRun
+local function echo_progress(run)
+  local failed = (run.counts.failed or 0) + (run.counts.error or 0)
+  local text = ('[Blender.nvim] Tests: %d/%d'):format(#run.results, run.total)
+  if failed > 0 then
+    text = text .. (', %d failed'):format(failed)
+  end
+  -- transient, so that frequent updates don't fill the message history
+  vim.api.nvim_echo({ { text, failed > 0 and 'ErrorMsg' or nil } }, false, {})
+end
+
+---@param run TestRun
+---@param result TestResult
+local function add_result(run, result)
+  run._seen[result.id] = true
+  table.insert(run.results, result)
+  run.counts[result.outcome] = (run.counts[result.outcome] or 0) + 1
+  M.durations[result.id] = result.duration
+end
+
+---@param run TestRun
+local function finish(run)
+  M.run = nil
+  local elapsed = (vim.uv.hrtime() - run.started_at) / 1e9
+  local items = {}
+  for _, result in ipairs(run.results) do
+    if result.outcome == 'failed' or result.outcome == 'error' or result.outcome == 'unexpected_success' then
+      table.insert(items, {
+        filename = result.file,
+        lnum = result.line or 0,
+        type = 'E',
+        text = ('%s [%s] %s'):format(result.id, result.outcome, (result.message or ''):match '[^\n]*$'),
+        user_data = result,
+      })
+    end
+  end
+  vim.fn.setqflist({}, ' ', { title = 'Blender tests', items = items })
+
+  local summary = {}
+  for _, outcome in ipairs { 'passed', 'failed', 'error', 'skipped', 'expected_failure', 'unexpected_success' } do
+    if run.counts[outcome] then
+      table.insert(summary, ('%d %s'):format(run.counts[outcome], outcome:gsub('_', ' ')))
+    end
+  end
+  local slowest = vim.list_slice(run.results, 1, #run.results)
+  table.sort(slowest, function(a, b)
+    return a.duration > b.duration
+  end)
+  local lines = {
+    ('Ran %d tests in %.1fs on %d workers: %s'):format(#run.results, elapsed, run.shards, table.concat(summary, ', ')),
+    'Slowest tests:',
+  }
+  for i = 1, math.min(slowest_count, #slowest) do
+    table.insert(lines, ('  %7.0fms  %s'):format(slowest[i].duration * 1000, slowest[i].id))
+  end
+  if #items > 0 then
+    table.insert(lines, 'Failures are in the quickfix list')
+  end
+  notify(table.concat(lines, '\n'), #items > 0 and 'ERROR' or 'INFO')
+end
+
+---@param run TestRun
+---@param shard string[]
+---@param result PoolJobResult
+local function on_shard_done(run, shard, result)
+  if M.run ~= run then
+    return
+  end
+  if not result.ok then
+    -- the worker crashed or the shard was cancelled: whatever didn't report failed
+    for _, id in ipairs(shard) do
+      if not run._seen[id] then
+        add_result(run, { id = id, outcome = 'error', duration = 0, message = result.error })
+      end
+    end
+  end
+  run.shards_left = run.shards_left - 1
+  if run.shards_left == 0 then
+    finish(run)
+  end
+end
+
+---Discover the add-on's tests on a worker, then run them sharded across the pool
+---@param pool Pool
+---@param opts? TestRunOpts
+M.start = function(pool, opts)
+  opts = opts or {}
+  if M.run then
+    notify('Tests are already running', 'WARN')
+    return
+  end
+  ---@type TestRun
+  local run = {
+    id = next_run_id,
+    total = 0,
+    results = {},
+    counts = {},
+    shards = 0,
+    shards_left = 0,
+    started_at = vim.uv.hrtime(),
+    _seen = {},
+  }
+  next_run_id = next_run_id + 1
+  M.run = run
+  pool:submit({ discover = { pattern = opts.pattern, start = opts.start } }, function(result)
+    if M.run ~= run then
+      return
+    end
+    if not result.ok then
+      M.run = nil
+      notify('Failed to discover tests: ' .. tostring(result.error), 'ERROR')
+      return
+    end
+    for _, err in ipairs(result.errors or {}) do
+      add_result(run, { id = err.id, outcome = 'error', duration = 0, message = err.message })
+    end
+    local tests = vim.tbl_filter(function(id)
+      return not opts.filter or id:find(opts.filter, 1, true) ~= nil
+    end, result.tests or {})
+    run.total = #tests + #run.results
+    if #tests == 0 then
+      M.run = nil
+      notify('No tests found', #run.results > 0 and 'ERROR' or 'WARN')
+      return
+    end
+    local shards = M.shard(tests, pool.size)
+    run.shards = #shards
+    run.shards_left = #shards
+    notify(('Running %d tests on %d workers'):format(#tests, #shards), 'TRACE')
+    for _, shard in ipairs(shards) do
+      pool:submit({ tests = shard, test_run = run.id }, function(shard_result)
+        on_shard_done(run, shard, shard_result)
+      end)
+    end
+  end)
+end
+
+---Handle a result streamed by a worker as soon as a test finished
+---@param result TestResult|{ run: integer }
+M.on_result = function(result)
+  local run = M.run
+  if not run or result.run ~= run.id then
+    return
+  end
+  add_result(run, result)
+  echo_progress(run)
+end
+
+return M
@@ -0,0 +1,14 @@
+"""Installs the stub ``bpy`` modules of the benchmarks, so that blender_nvim can
+be imported outside of Blender"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+root = Path(__file__).parent.parent
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from benchmarks import stubs  # noqa: E402
+
+stubs.install(tempfile.mkdtemp(prefix="blender-nvim-tests-"), background=True)
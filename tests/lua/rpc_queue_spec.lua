@@ -0,0 +1,91 @@
+-- Run with plenary.nvim:
+--   nvim --headless -c 'PlenaryBustedDirectory tests/lua'
+
+local stubs = {
+  ['blender.manager'] = {},
+  ['blender.rpc.client'] = {},
+  ['blender.notify'] = function() end,
+}
+
+describe('rpc message queue', function()
+  local rpc, scheduled, handled, schedule, originals
+
+  ---Run the callbacks passed to vim.schedule, at most `steps` of them
+  ---@param steps? integer
+  local run_scheduled = function(steps)
+    steps = steps or math.huge
+    while #scheduled > 0 and steps > 0 do
+      table.remove(scheduled, 1)()
+      steps = steps - 1
+    end
+  end
+
+  ---@param session integer
+  ---@param from integer
+  ---@param to integer
+  local batch = function(session, from, to)
+    local msgs = {}
+    for i = from, to do
+      msgs[#msgs + 1] = { type = 'test_msg', i = i }
+    end
+    rpc.handle_batch(msgs, session)
+  end
+
+  before_each(function()
+    originals = {}
+    for name, stub in pairs(stubs) do
+      originals[name] = package.loaded[name]
+      package.loaded[name] = stub
+    end
+    originals['blender.rpc'] = package.loaded['blender.rpc']
+    package.loaded['blender.rpc'] = nil
+    scheduled = {}
+    schedule = vim.schedule
+    vim.schedule = function(fn)
+      scheduled[#scheduled + 1] = fn
+    end
+    rpc = require 'blender.rpc'
+    handled = {}
+    rpc.handlers.test_msg = function(msg)
+      handled[#handled + 1] = { msg.session, msg.i }
+    end
+  end)
+
+  after_each(function()
+    vim.schedule = schedule
+    for name, module in pairs(originals) do
+      package.loaded[name] = module
+    end
+  end)
+
+  it('handles every message in order when batches arrive while draining', function()
+    batch(1, 1, 100)
+    -- the first slice leaves the front of the queue cleared
+    run_scheduled(1)
+    batch(1, 101, 300)
+    run_scheduled(1)
+    batch(1, 301, 310)
+    run_scheduled()
+    assert.are.equal(310, #handled)
+    for i, entry in ipairs(handled) do
+      assert.are.same({ 1, i }, entry)
+    end
+  end)
+
+  it('takes turns between sessions', function()
+    batch(1, 1, 100)
+    batch(2, 1, 1)
+    run_scheduled()
+    assert.are.same({ 2, 1 }, handled[65])
+    assert.are.same({ 1, 65 }, handled[66])
+    assert.are.equal(101, #handled)
+  end)
+
+  it('starts over once a session queue is empty', function()
+    batch(1, 1, 3)
+    run_scheduled()
+    batch(1, 4, 5)
+    run_scheduled()
+    assert.are.same({ { 1, 1 }, { 1, 2 }, { 1, 3 }, { 1, 4 }, { 1, 5 } }, handled)
+  end)
+end)
@@ -0,0 +1,48 @@
+import socket
+import time
+
+import pytest
+
+from blender_nvim.data_channel import DataChannel
+
+
+def connect(channel):
+    if channel.family == "unix":
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(channel.address)
+    else:
+        host, port = channel.address.rsplit(":", 1)
+        client = socket.create_connection((host, int(port)))
+    client.settimeout(5)
+    return client
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def channel():
+    channel = DataChannel()
+    yield channel
+    channel.close()
+
+
+def test_second_reader_is_rejected_while_the_first_is_open(channel):
+    first = connect(channel)
+    assert channel._connected.wait(5)
+    accepted = channel._conn
+    second = connect(channel)
+    # closed by Blender straight away
+    assert second.recv(1) == b""
+    assert channel._conn is accepted
+    first.close()
+    third = connect(channel)
+    wait_for(lambda: channel._conn is not accepted)
+    channel.submit(1, b"abc")
+    assert third.recv(64).endswith(b"abc")
+    second.close()
+    third.close()
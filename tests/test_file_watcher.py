@@ -0,0 +1,49 @@
+import queue
+import time
+
+from blender_nvim.file_watcher import FileWatcher
+
+
+def test_change_is_reported_with_the_time_it_was_first_seen(tmp_path):
+    calls: "queue.Queue" = queue.Queue()
+    watcher = FileWatcher(
+        [str(tmp_path)],
+        lambda changed, first: calls.put((changed, first, time.monotonic())),
+        debounce=0.3,
+    )
+    watcher.start()
+    try:
+        time.sleep(0.1)
+        written = time.monotonic()
+        path = tmp_path / "module.py"
+        path.write_text("X = 1\n")
+        changed, first, reported = calls.get(timeout=5)
+    finally:
+        watcher.stop()
+    assert str(path) in changed
+    # taken when the change arrived, before waiting out the debounce
+    assert written <= first
+    assert reported - first >= watcher.debounce
+
+
+def test_only_sources_and_data_files_are_reported(tmp_path):
+    calls: "queue.Queue" = queue.Queue()
+    watcher = FileWatcher(
+        [str(tmp_path)],
+        lambda changed, first: calls.put(changed),
+        debounce=0.1,
+        patterns=["*.py", "*.json"],
+    )
+    watcher.start()
+    try:
+        time.sleep(0.1)
+        (tmp_path / "__pycache__").mkdir()
+        (tmp_path / "__pycache__" / "module.cpython-311.pyc").write_bytes(b"")
+        (tmp_path / ".module.py.swp").write_text("")
+        (tmp_path / "notes.txt").write_text("")
+        (tmp_path / "settings.json").write_text("{}")
+        (tmp_path / "module.py").write_text("X = 1\n")
+        changed = calls.get(timeout=5)
+    finally:
+        watcher.stop()
+    assert changed == {str(tmp_path / "settings.json"), str(tmp_path / "module.py")}
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from blender_nvim.outbox import Outbox, register_low_priority
+
+register_low_priority("test_progress", lambda message: message["id"])
+register_low_priority("test_log")
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+        self.tags = []
+        self.delivered = threading.Event()
+
+    def __call__(self, batch, tags, done):
+        self.batches.append(batch)
+        self.tags.append(tags)
+        self.delivered.set()
+        if done is not None:
+            done.set()
+
+
+@pytest.fixture
+def outbox():
+    recorder = Recorder()
+    box = Outbox(recorder)
+    box.recorder = recorder  # type: ignore
+    yield box
+    box.close()
+
+
+def test_messages_sent_together_arrive_in_one_batch_in_order(outbox):
+    for i in range(50):
+        outbox.put({"type": "test", "i": i})
+    assert outbox.recorder.delivered.wait(1.0)
+    time.sleep(outbox.window * 4)
+    assert outbox.recorder.batches == [[{"type": "test", "i": i} for i in range(50)]]
+
+
+def test_flush_delivers_pending_messages_and_waits(outbox):
+    outbox.window = 10.0
+    outbox.put({"type": "test", "i": 1})
+    outbox.put({"type": "test", "i": 2})
+    assert outbox.flush()
+    assert outbox.recorder.batches == [
+        [{"type": "test", "i": 1}, {"type": "test", "i": 2}]
+    ]
+    assert len(outbox) == 0
+    # nothing pending, nothing delivered
+    assert outbox.flush()
+    assert len(outbox.recorder.batches) == 1
+
+
+def test_low_priority_message_replaces_pending_one_with_same_key(outbox):
+    outbox.window = 10.0
+    outbox.put({"type": "test_progress", "id": 1, "progress": 0.1})
+    outbox.put({"type": "test", "i": 1})
+    outbox.put({"type": "test_progress", "id": 2, "progress": 0.5})
+    outbox.put({"type": "test_progress", "id": 1, "progress": 0.2})
+    outbox.flush()
+    assert outbox.recorder.batches == [
+        [
+            {"type": "test_progress", "id": 1, "progress": 0.2},
+            {"type": "test", "i": 1},
+            {"type": "test_progress", "id": 2, "progress": 0.5},
+        ]
+    ]
+
+
+def test_full_outbox_drops_low_priority_messages_and_reports_them(outbox):
+    outbox.window = 10.0
+    outbox.max_messages = 3
+    outbox.put({"type": "test_log", "i": 0})
+    outbox.put({"type": "test", "i": 1})
+    outbox.put({"type": "test", "i": 2})
+    # incoming low-priority messages are dropped when full
+    outbox.put({"type": "test_log", "i": 3})
+    # other messages make room by dropping the oldest low-priority one
+    outbox.put({"type": "test", "i": 4})
+    outbox.flush()
+    assert outbox.recorder.batches == [
+        [
+            {"type": "test", "i": 1},
+            {"type": "test", "i": 2},
+            {"type": "test", "i": 4},
+            {"type": "messages_dropped", "count": 2},
+        ]
+    ]
+    outbox.put({"type": "test", "i": 5})
+    outbox.flush()
+    assert outbox.recorder.batches[1] == [{"type": "test", "i": 5}]
+
+
+def test_tags_are_delivered_with_their_batch_even_when_merged_or_dropped(outbox):
+    outbox.window = 10.0
+    outbox.max_messages = 2
+    outbox.put({"type": "test_progress", "id": 1, "progress": 0.1}, ("a",))
+    outbox.put({"type": "test_progress", "id": 1, "progress": 0.2}, ("b",))
+    outbox.put({"type": "test", "i": 1}, ("c",))
+    outbox.put({"type": "test_log", "i": 2}, ("d",))
+    outbox.flush()
+    outbox.put({"type": "test", "i": 3}, ("e",))
+    outbox.flush()
+    assert outbox.recorder.tags == [("a", "b", "c", "d"), ("e",)]
@@ -0,0 +1,16 @@
+import cProfile
+import pstats
+
+from blender_nvim import profiling
+
+
+def test_profiles_saved_together_get_their_own_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "profile_dir", str(tmp_path))
+    profiler = cProfile.Profile()
+    profiler.enable()
+    profiler.disable()
+    profiler.create_stats()
+    paths = {profiling.save_stats("reload my_addon", profiler.stats) for _ in range(3)}
+    assert len(paths) == 3
+    for path in paths:
+        pstats.Stats(path)
@@ -0,0 +1,111 @@
+import types
+
+import bpy
+import pytest
+
+from benchmarks import stubs
+from blender_nvim.query import QueryError, parse_path, run_query
+
+
+class Object(stubs.ID):
+    def __init__(self, name, parent=None, location=(0.0, 0.0, 0.0), hide=False):
+        self.name = name
+        self.parent = parent
+        self.location = list(location)
+        self.hide_viewport = hide
+
+
+@pytest.fixture
+def objects(monkeypatch):
+    root = Object("Root")
+    items = stubs.PropCollection(
+        [
+            Object("Cube", parent=root, location=(2.0, 0.0, 0.0)),
+            Object("Camera", location=(0.0, 5.0, 0.0), hide=True),
+            root,
+            Object("Cone", parent=Object("Base"), location=(1.0, 0.0, 0.0)),
+            Object("Light", location=(-3.0, 0.0, 0.0)),
+        ]
+    )
+    monkeypatch.setattr(bpy, "data", types.SimpleNamespace(objects=items))
+    return items
+
+
+def names(result):
+    return [item["name"] for item in result["items"]]
+
+
+def test_parse_path_splits_attributes_and_subscripts():
+    assert parse_path("""scenes["Sc\\"ene"].objects[0]['a'].name""") == [
+        ("attr", "scenes"),
+        ("key", 'Sc"ene'),
+        ("attr", "objects"),
+        ("index", 0),
+        ("key", "a"),
+        ("attr", "name"),
+    ]
+    with pytest.raises(QueryError):
+        parse_path("objects.__class__()")
+
+
+def test_filters_must_all_match(objects):
+    result = run_query(
+        {
+            "path": "objects",
+            "filter": [["name", "startswith", "C"], ["hide_viewport", "==", False]],
+            "fields": ["name", "location[0]"],
+        }
+    )
+    assert result["items"] == [
+        {"name": "Cube", "location[0]": 2.0},
+        {"name": "Cone", "location[0]": 1.0},
+    ]
+    assert result["next_offset"] is None
+
+
+def test_pages_follow_each_other(objects):
+    first = run_query({"path": "objects", "limit": 2})
+    assert names(first) == ["Cube", "Camera"]
+    assert first["next_offset"] == 2
+    second = run_query({"path": "objects", "limit": 2, "offset": 2})
+    assert names(second) == ["Root", "Cone"]
+    last = run_query({"path": "objects", "limit": 2, "offset": 4})
+    assert names(last) == ["Light"]
+    assert last["next_offset"] is None
+
+
+@pytest.mark.parametrize(
+    "offset, limit, page",
+    [(0, 2, ["Cube", "Camera"]), (2, 10, ["Cone"]), (10, 2, [])],
+)
+def test_count_is_the_number_of_matches_whatever_the_page(objects, offset, limit, page):
+    result = run_query(
+        {
+            "path": "objects",
+            "filter": [["name", "glob", "C*"]],
+            "offset": offset,
+            "limit": limit,
+            "count": True,
+        }
+    )
+    assert names(result) == page
+    assert result["total"] == 3
+
+
+def test_order_by_value_and_descending(objects):
+    result = run_query({"path": "objects", "order_by": "-location[0]", "limit": 3})
+    assert names(result) == ["Cube", "Cone", "Camera"]
+    assert result["total"] == 5
+    assert result["next_offset"] == 3
+
+
+def test_order_by_pointer_sorts_by_name(objects):
+    result = run_query({"path": "objects", "order_by": "parent"})
+    # objects without a parent come first
+    assert names(result)[:3] == ["Camera", "Root", "Light"]
+    assert names(result)[3:] == ["Cone", "Cube"]
+
+
+def test_unknown_collection_is_an_error(objects):
+    with pytest.raises(QueryError):
+        run_query({"path": "meshes"})
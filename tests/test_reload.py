@@ -0,0 +1,160 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+from blender_nvim.reload import (
+    AddonGraph,
+    SubmoduleReattacher,
+    find_imports,
+    purge_modules,
+)
+
+
+def write(path, source):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fs:
+        fs.write(textwrap.dedent(source))
+
+
+def bump(path, source):
+    """Rewrite a module with a different size, so its stat changes"""
+    write(path, source)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def addon(tmp_path, monkeypatch):
+    """An addon whose root loads ``ops`` dynamically, like auto_load does"""
+    name = f"graph_addon_{abs(hash(tmp_path)) % 10**8}"
+    package = tmp_path / name
+    write(
+        str(package / "__init__.py"),
+        """
+        import importlib
+        from . import utils
+        ops = importlib.import_module(__name__ + ".ops")
+        """,
+    )
+    write(str(package / "utils.py"), "VALUE = 1\n")
+    write(str(package / "ops.py"), "from .utils import VALUE\n")
+    write(str(package / "panels.py"), "from . import ops\n")
+    write(str(package / "standalone.py"), "X = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    __import__(f"{name}.panels")
+    __import__(f"{name}.standalone")
+    yield name, package
+    for module in [m for m in sys.modules if m.split(".")[0] == name]:
+        del sys.modules[module]
+
+
+def test_find_imports_resolves_relative_and_absolute_imports():
+    source = textwrap.dedent("""
+        import pkg.a
+        from . import b
+        from .c import thing
+        from .. import outside
+        import os
+        """)
+    found = find_imports("pkg.sub.mod", False, source.encode(), "pkg")
+    assert found == {
+        "pkg",
+        "pkg.a",
+        "pkg.outside",
+        "pkg.sub",
+        "pkg.sub.b",
+        "pkg.sub.c",
+        "pkg.sub.c.thing",
+    }
+
+
+def test_find_imports_depends_on_imported_submodules_only():
+    source = textwrap.dedent("""
+        from . import b
+        from .c import thing
+        from . import value
+        """)
+    modules = {"pkg", "pkg.sub", "pkg.sub.b", "pkg.sub.c"}
+    found = find_imports("pkg.sub.mod", False, source.encode(), "pkg", modules)
+    # value isn't a module, it must come from pkg.sub itself
+    assert found == {
+        "pkg.sub",
+        "pkg.sub.b",
+        "pkg.sub.c",
+        "pkg.sub.c.thing",
+        "pkg.sub.value",
+    }
+
+
+def test_unchanged_addon_reloads_nothing(addon):
+    name, _ = addon
+    graph = AddonGraph(name)
+    graph.snapshot()
+    assert graph.modules_to_reload() == []
+
+
+def test_changed_module_reloads_its_importers_and_the_package(addon):
+    name, package = addon
+    graph = AddonGraph(name)
+    graph.snapshot()
+    bump(str(package / "utils.py"), "VALUE = 22\n")
+    # ops and panels import utils statically, the package imports ops through
+    # importlib and must be re-imported regardless
+    assert graph.modules_to_reload() == sorted(
+        [name, f"{name}.ops", f"{name}.panels", f"{name}.utils"]
+    )
+
+
+def test_dynamically_imported_module_reloads_the_package(addon):
+    name, package = addon
+    graph = AddonGraph(name)
+    graph.snapshot()
+    bump(str(package / "ops.py"), "from .utils import VALUE\nEXTRA = 1\n")
+    assert graph.modules_to_reload() == sorted([name, f"{name}.ops", f"{name}.panels"])
+
+
+def test_touched_but_identical_module_is_not_reloaded(addon):
+    name, package = addon
+    graph = AddonGraph(name)
+    graph.snapshot()
+    path = str(package / "standalone.py")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert graph.modules_to_reload() == []
+
+
+def test_untracked_loaded_module_is_reloaded(addon):
+    name, package = addon
+    graph = AddonGraph(name)
+    graph.snapshot()
+    write(str(package / "late.py"), "Y = 1\n")
+    __import__(f"{name}.late")
+    assert graph.modules_to_reload() == [name, f"{name}.late"]
+
+
+def test_sibling_import_does_not_depend_on_the_package(addon):
+    name, package = addon
+    write(str(package / "sibling.py"), "from . import standalone\n")
+    __import__(f"{name}.sibling")
+    graph = AddonGraph(name)
+    graph.snapshot()
+    # the package imports utils, but sibling only binds the standalone module
+    bump(str(package / "utils.py"), "VALUE = 22\n")
+    assert f"{name}.sibling" not in graph.modules_to_reload()
+
+
+def test_kept_submodule_is_reachable_through_reimported_package(addon):
+    name, package = addon
+    kept = sys.modules[f"{name}.standalone"]
+    graph = AddonGraph(name)
+    graph.snapshot()
+    bump(str(package / "utils.py"), "VALUE = 22\n")
+    purge_modules(graph.modules_to_reload())
+    with SubmoduleReattacher(name).installed():
+        __import__(name)
+    root = __import__(f"{name}.standalone")
+    assert root is not kept
+    assert root.standalone is kept
+    assert root.utils.VALUE == 22
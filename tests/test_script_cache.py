@@ -0,0 +1,37 @@
+import linecache
+import traceback
+
+import pytest
+
+from blender_nvim.script_cache import ScriptCache, source_lines
+
+
+def test_selection_of_a_real_file_only_shadows_it_while_running(tmp_path):
+    path = tmp_path / "addon_module.py"
+    path.write_text("def f():\n    return 1\n\n\ndef g():\n    return 2\n")
+    cache = ScriptCache()
+    entry = cache.get_source(str(path), "print('selection')\n", first_line=5)
+    assert linecache.getline(str(path), 1) == "def f():\n"
+    with source_lines(entry):
+        assert linecache.getline(str(path), 1) == "\n"
+        assert linecache.getline(str(path), 5) == "print('selection')\n"
+    assert linecache.getline(str(path), 1) == "def f():\n"
+    assert linecache.getline(str(path), 5) == "def g():\n"
+
+
+def test_buffer_without_a_file_keeps_its_lines_for_later_tracebacks():
+    cache = ScriptCache()
+    entry = cache.get_source("<nvim:buffer-7>", "x = 1\nraise ValueError(x)\n")
+    with pytest.raises(ValueError) as excinfo:
+        exec(entry.code, {})
+    text = "".join(traceback.format_exception(excinfo.type, excinfo.value, excinfo.tb))
+    assert 'File "<nvim:buffer-7>", line 2' in text
+    assert "raise ValueError(x)" in text
+
+
+def test_selection_keeps_its_line_numbers():
+    cache = ScriptCache()
+    entry = cache.get_source("<nvim:buffer-8>", "y = 2\nraise KeyError(y)\n", 10)
+    with pytest.raises(KeyError) as excinfo:
+        exec(entry.code, {})
+    assert excinfo.tb.tb_next.tb_lineno == 11
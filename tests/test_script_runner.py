@@ -0,0 +1,19 @@
+import sys
+
+from blender_nvim.operators.script_runner import run_code
+
+
+def test_temporary_main_is_removed_when_there_was_none(monkeypatch):
+    monkeypatch.delitem(sys.modules, "__main__")
+    code = compile(
+        "import sys\nseen = sys.modules['__main__'].__file__", "script.py", "exec"
+    )
+    result = run_code(code, "script.py", {})
+    assert result["seen"] == "script.py"
+    assert "__main__" not in sys.modules
+
+
+def test_previous_main_is_restored():
+    main = sys.modules["__main__"]
+    run_code(compile("X = 1", "script.py", "exec"), "script.py", {})
+    assert sys.modules["__main__"] is main
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from blender_nvim.script_tasks import ScriptCancelled, ScriptTasks
+
+
+@pytest.fixture
+def tasks(monkeypatch):
+    tasks = ScriptTasks()
+    # ticks are driven by the tests
+    monkeypatch.setattr(tasks, "_schedule", lambda: None)
+    return tasks
+
+
+def steps(log, name):
+    while True:
+        log.append(name)
+        yield
+
+
+def test_tasks_take_turns_when_slices_run_out(tasks):
+    tasks.slice_budget = 0.0
+    log = []
+    for name in "abc":
+        tasks.start(name, steps(log, name), {})
+    for _ in range(6):
+        tasks._tick()
+    assert log == list("abcabc")
+    tasks.cancel()
+    for _ in range(3):
+        tasks._tick()
+    assert tasks.active() == []
+
+
+def test_interrupt_raises_in_running_script(tasks):
+    started = threading.Event()
+
+    def interrupt():
+        started.wait()
+        while not tasks.interrupt():
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=interrupt)
+    thread.start()
+    with pytest.raises(ScriptCancelled):
+        with tasks.interruptible():
+            started.set()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                pass
+    thread.join()
+    assert not tasks._running and not tasks._interrupted
+
+
+def test_loading_a_file_closes_generator_scripts(tasks):
+    closed = []
+
+    def script(name):
+        try:
+            while True:
+                yield
+        finally:
+            closed.append(name)
+
+    tasks.slice_budget = 0.0
+    tasks.start("a", script("a"), {})
+    tasks.start("b", script("b"), {})
+    tasks._tick()
+    tasks._tick()
+    tasks.close_all()
+    assert sorted(closed) == ["a", "b"]
+    assert tasks.active() == []
@@ -0,0 +1,68 @@
+import json
+
+from blender_nvim.tracing import Tracer
+
+
+def stages(trace):
+    return [stage for stage, _ in trace.marks]
+
+
+def test_trace_is_recorded_once_its_own_messages_are_delivered():
+    tracer = Tracer()
+    first = tracer.start("request", "first")
+    second = tracer.start("request", "second")
+    first_tags = tracer.on_send([first])
+    second_tags = tracer.on_send([second])
+    tracer.finish(first)
+    tracer.finish(second)
+    # delivering another trace's message leaves this one waiting
+    tracer.on_deliver(second_tags)
+    assert "second" in tracer.stats()
+    assert "first" not in tracer.stats()
+    assert stages(second) == ["received", "send", "finished", "delivered"]
+    tracer.on_deliver(first_tags)
+    assert stages(first) == ["received", "send", "finished", "delivered"]
+    assert tracer.stats()["first"]["total"]["count"] == 1
+
+
+def test_trace_waits_for_all_of_its_messages():
+    tracer = Tracer()
+    trace = tracer.start("request", "reload")
+    with tracer.activate(trace):
+        tags = tracer.on_send()
+        more = tracer.on_send()
+    tracer.on_deliver(tags)
+    tracer.finish(trace)
+    assert tracer.stats() == {}
+    tracer.on_deliver(more)
+    assert stages(trace) == ["received", "send", "finished", "delivered"]
+
+
+def test_trace_without_messages_is_recorded_on_finish():
+    tracer = Tracer()
+    trace = tracer.start("notification", "ping")
+    tracer.finish(trace)
+    assert stages(trace) == ["received", "finished"]
+    assert tracer.stats()["ping"]["total"]["count"] == 1
+
+
+def test_chrome_export_has_one_integer_track_per_handler(tmp_path):
+    tracer = Tracer()
+    for name in ("reload", "query", "reload"):
+        tracer.finish(tracer.start("request", name))
+    path = tmp_path / "trace.json"
+    assert tracer.export(str(path)) == 3
+    events = json.loads(path.read_text())["traceEvents"]
+    names = {
+        event["args"]["name"]: event["tid"]
+        for event in events
+        if event["ph"] == "M" and event["name"] == "thread_name"
+    }
+    assert sorted(names) == ["query", "reload"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert all(isinstance(event["tid"], int) for event in spans)
+    assert [event["tid"] for event in spans] == [
+        names["reload"],
+        names["query"],
+        names["reload"],
+    ]